@@ -0,0 +1,391 @@
+"""
+Headless batch mode for Reggie. Validates every level in a folder with the
+checks of the diagnostic tool, checks that saving them round-trips, and
+optionally re-saves them. Usage:
+
+    python reggie.py -batch <folder> [options]
+    python batch.py <folder> [options]
+
+Run with --help for the options. The report is written as JSON.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+################################################################################
+################################################################################
+################################################################################
+
+# Messages of the dialogs that would have been shown while processing the
+# current level
+Messages = []
+
+# The diagnostic tool of this worker process, created on first use
+DiagTool = None
+
+
+def RecordMessage(parent, title, text, *args, **kwargs):
+    """
+    Replaces the QMessageBox functions in the worker processes, as there is no
+    one to show the dialogs to. Their messages are added to the report.
+    """
+    from PyQt6 import QtWidgets
+
+    Messages.append(f'{title}: {text}')
+    return QtWidgets.QMessageBox.StandardButton.Ok
+
+
+def FindLevels(folder, recursive=False):
+    """
+    Returns the paths of all level files in a folder
+    """
+    import globals_
+
+    found = []
+    for root, dirs, files in os.walk(folder):
+        dirs.sort()
+
+        for fn in sorted(files):
+            if fn.endswith(globals_.FileExtentions):
+                found.append(os.path.join(root, fn))
+
+        if not recursive:
+            break
+
+    return found
+
+
+def DecompressLevel(data):
+    """
+    Decompresses level data the same way LoadLevel does. Returns the data and
+    the name of the compression that was used ('' if it wasn't compressed).
+    """
+    from libs import lh, lz77
+
+    if (data[0] & 0xF0) == 0x40:  # If LH-compressed
+        return lh.UncompressLH(data), 'LH'
+    elif not data.startswith(b"U\xAA8-"):  # If LZ-compressed
+        return lz77.UncompressLZ77(data), 'LZ'
+
+    return data, ''
+
+
+def CompressLevel(data, compression):
+    """
+    Compresses level data with the compression DecompressLevel found
+    """
+    from libs import lh, lz77
+
+    if compression == 'LH':
+        return lh.CompressLH(data)
+    elif compression == 'LZ':
+        compressed = lz77.CompressLZ77(data)
+        if compressed is None:
+            raise ValueError(f'level is too large to be LZ-compressed ({len(data)} bytes)')
+
+        return compressed
+
+    return data
+
+
+def InitWorker(settings_file, tmp_dir, gamedef, stage_path, texture_path):
+    """
+    Prepares a worker process: starts Qt without a window and loads the
+    translation, theme and gamedef, like main() does
+    """
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    from PyQt6 import QtCore, QtWidgets
+
+    import globals_
+    import spritelib as SLib
+    from gamedef import LoadGameDef
+    from misc import module_path, SetGamePaths
+    from sprites_common import LoadBasics
+    from translation import LoadTranslation
+    from ui import LoadNumberFont, LoadTheme
+    from src.data.common.loaders import LoadOverrides
+
+    # Nothing can be shown, so record the messages instead
+    QtWidgets.QMessageBox.warning = RecordMessage
+    QtWidgets.QMessageBox.information = RecordMessage
+    QtWidgets.QMessageBox.critical = RecordMessage
+    QtWidgets.QMessageBox.question = RecordMessage
+
+    globals_.app = QtWidgets.QApplication([])
+
+    path = module_path()
+    if path is not None:
+        os.chdir(path)
+
+    # Work on a copy of the settings, so that the workers don't overwrite the
+    # user's settings (or each other's)
+    worker_settings = os.path.join(tmp_dir, f'settings-{os.getpid()}.ini')
+    if os.path.isfile(settings_file):
+        shutil.copy2(settings_file, worker_settings)
+
+    globals_.settings = QtCore.QSettings(worker_settings, QtCore.QSettings.Format.IniFormat)
+
+    LoadTranslation()
+    LoadTheme()
+    LoadNumberFont()
+    LoadOverrides()
+
+    SLib.OutlineColor = globals_.theme.color('smi')
+    SLib.main()
+
+    if not LoadGameDef(gamedef):
+        # A custom gamedef that is used for the first time needs game paths
+        # before it can be loaded
+        SetGamePaths(stage_path, texture_path)
+        LoadGameDef(gamedef)
+
+    SetGamePaths(stage_path, texture_path)
+    LoadBasics()
+
+
+def LoadAllAreas(level):
+    """
+    Loads every area of a level in turn, and yields each one while it is the
+    current area. Areas keep their saved data when another area is loaded.
+    """
+    import globals_
+
+    for area in level.areas:
+        if area is not globals_.Area:
+            previous = globals_.Area
+            saved = previous.save()
+            level.changeArea(area.areanum)
+            previous.set_data(*saved)
+
+        yield area
+
+
+def ProcessLevel(filename, save_path):
+    """
+    Validates a level and checks that saving it round-trips. If save_path is
+    set, the re-saved level is written there. Returns the report for the level.
+    """
+    global DiagTool
+
+    import globals_
+    from src.data.level.nsmbw_level import NSMBWLevel
+    from src.ui.dialogs.diagnostic_tool import DiagnosticToolDialog
+
+    del Messages[:]
+
+    report = {
+        'file': filename,
+        'compression': None,
+        'areas': [],
+        'result': 'error',
+        'identical': False,
+        'stable': False,
+        'saved': None,
+        'messages': Messages,
+        'error': None,
+        'time': 0,
+    }
+    start = time.perf_counter()
+
+    try:
+        with open(filename, 'rb') as f:
+            data, report['compression'] = DecompressLevel(f.read())
+
+        level = NSMBWLevel()
+        if not level.load(data, 1):
+            raise ValueError('not a level archive')
+
+        globals_.Level = level
+
+        if DiagTool is None:
+            DiagTool = DiagnosticToolDialog()
+
+        result = DiagnosticToolDialog.Result.NO_ERROR
+        for area in LoadAllAreas(level):
+            problems = []
+            for _, description, func, critical in DiagTool.check_functions:
+                if not func('c'):
+                    continue
+
+                problems.append({'check': func.__name__, 'description': description, 'critical': critical})
+
+                if critical:
+                    result = DiagnosticToolDialog.Result.CRITICAL
+                elif result == DiagnosticToolDialog.Result.NO_ERROR:
+                    result = DiagnosticToolDialog.Result.WARNING
+
+            unknown = getattr(area, 'unknown_sprite_ids', None)
+            report['areas'].append({
+                'area': area.areanum,
+                'problems': problems,
+                'unknown_sprites': sorted(unknown) if unknown else [],
+            })
+
+        saved = level.save()
+
+        # Saving the re-saved level again must not change it
+        check = NSMBWLevel()
+        check.load(saved, 1)
+        globals_.Level = check
+        for _ in LoadAllAreas(check):
+            pass
+
+        report['identical'] = saved == data
+        report['stable'] = check.save() == saved
+        report['result'] = result.name.lower()
+
+        if save_path is not None:
+            if not report['stable']:
+                raise ValueError('saving the level does not round-trip, not writing it')
+
+            saved = CompressLevel(saved, report['compression'])
+
+            os.makedirs(os.path.dirname(save_path) or '.', exist_ok=True)
+            tmp = f'{save_path}.{os.getpid()}.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(saved)
+
+            os.replace(tmp, save_path)
+            report['saved'] = save_path
+
+    except Exception:
+        report['result'] = 'error'
+        report['error'] = traceback.format_exc()
+
+    report['messages'] = list(Messages)
+    report['time'] = round(time.perf_counter() - start, 3)
+    return report
+
+
+def main(argv=None):
+    """
+    Entry point of the batch mode. Returns the exit code: 0 if no level has
+    critical problems or errors, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(
+        prog='reggie.py -batch',
+        description='Validates and re-saves all levels in a folder without opening the editor.',
+    )
+    parser.add_argument('folder', help='folder containing the levels (usually the Stage folder)')
+    parser.add_argument('-r', '--recursive', action='store_true', help='also process levels in subfolders')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='number of worker processes')
+    parser.add_argument('-o', '--output', help='write the re-saved levels to this folder')
+    parser.add_argument('--in-place', action='store_true', help='overwrite the levels with their re-saved versions')
+    parser.add_argument('--report', help='write the JSON report to this file instead of stdout')
+    parser.add_argument('--gamedef', help='gamedef to load (defaults to the last one used in the editor)')
+    parser.add_argument('--texture', help='Texture folder (defaults to <folder>/Texture or the editor setting)')
+    args = parser.parse_args(argv)
+
+    if args.output and args.in_place:
+        parser.error('--output and --in-place cannot be combined')
+
+    folder = os.path.abspath(args.folder)
+    if not os.path.isdir(folder):
+        parser.error(f'{args.folder} is not a folder')
+
+    # Paths are resolved before the workers change to the Reggie folder
+    output = os.path.abspath(args.output) if args.output else None
+    report_file = os.path.abspath(args.report) if args.report else None
+
+    texture = args.texture
+    if texture is None and os.path.isdir(os.path.join(folder, 'Texture')):
+        texture = os.path.join(folder, 'Texture')
+    texture = os.path.abspath(texture) if texture else None
+
+    from PyQt6 import QtCore
+
+    # Only imported for its side effects: importing misc first would import
+    # globals_ -> reggie -> misc, and fail on the partially initialized misc
+    import globals_  # noqa: F401
+    from misc import module_path
+
+    path = module_path()
+    if path is not None:
+        os.chdir(path)
+
+    settings_file = os.path.abspath('settings.ini')
+
+    gamedef = args.gamedef
+    if gamedef is None or texture is None:
+        settings = QtCore.QSettings(settings_file, QtCore.QSettings.Format.IniFormat)
+        if gamedef is None:
+            gamedef = settings.value('LastGameDef')
+        if texture is None:
+            texture = settings.value('TextureGamePath')
+
+    if not texture or not os.path.isdir(texture):
+        parser.error('no Texture folder found, please pass one with --texture')
+
+    levels = FindLevels(folder, args.recursive)
+
+    jobs = []
+    for filename in levels:
+        if args.in_place:
+            save_path = filename
+        elif output is not None:
+            save_path = os.path.join(output, os.path.relpath(filename, folder))
+        else:
+            save_path = None
+
+        jobs.append((filename, save_path))
+
+    reports = []
+    start = time.perf_counter()
+
+    with tempfile.TemporaryDirectory(prefix='reggie-batch-') as tmp:
+        # Qt can't be used in forked processes, so the workers are spawned
+        executor = ProcessPoolExecutor(
+            max_workers=max(1, min(args.jobs, len(jobs))),
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=InitWorker,
+            initargs=(settings_file, tmp, gamedef, folder, texture),
+        )
+
+        with executor:
+            futures = {executor.submit(ProcessLevel, *job): job[0] for job in jobs}
+
+            for i, future in enumerate(as_completed(futures), 1):
+                report = future.result()
+                reports.append(report)
+                print(f'[{i}/{len(jobs)}] {os.path.relpath(report["file"], folder)}: {report["result"]}', file=sys.stderr)
+
+    reports.sort(key=lambda report: report['file'])
+
+    summary = {}
+    for report in reports:
+        summary[report['result']] = summary.get(report['result'], 0) + 1
+
+    result = {
+        'folder': folder,
+        'gamedef': gamedef,
+        'levels': len(reports),
+        'summary': summary,
+        'unstable': [report['file'] for report in reports if report['result'] != 'error' and not report['stable']],
+        'time': round(time.perf_counter() - start, 3),
+        'reports': reports,
+    }
+
+    if report_file is not None:
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    else:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+
+    if summary.get('critical') or summary.get('error') or result['unstable']:
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
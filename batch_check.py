@@ -0,0 +1,70 @@
+"""
+Regression check for the batch mode. Runs it on the training level, which
+has locations, stored uncompressed, LZ-compressed and LH-compressed, and
+checks that every copy is processed without errors and saves stably. Usage:
+
+    python batch_check.py [batch options, e.g. --texture <folder>]
+
+Exits with 1 if a level fails.
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+import batch
+
+Level = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reggieextras', 'TrainingLevel.arc')
+
+
+def main(argv=None):
+    """
+    Runs the check. Extra arguments are passed on to the batch mode.
+    """
+    from libs import lh, lz77
+
+    argv = sys.argv[1:] if argv is None else argv
+
+    with open(Level, 'rb') as f:
+        data = f.read()
+
+    levels = {
+        '01-01.arc': data,
+        '01-02.arc.LZ': lz77.CompressLZ77(data),
+        '01-03.arc.LH': lh.CompressLH(data),
+    }
+
+    with tempfile.TemporaryDirectory(prefix='reggie-batch-check-') as folder:
+        for fn, level in levels.items():
+            with open(os.path.join(folder, fn), 'wb') as f:
+                f.write(level)
+
+        report_file = os.path.join(folder, 'report.json')
+        batch.main([folder, '--report', report_file, *argv])
+
+        with open(report_file, encoding='utf-8') as f:
+            reports = json.load(f)['reports']
+
+    failed = 0
+    for report in reports:
+        fn = os.path.basename(report['file'])
+
+        if report['result'] == 'error':
+            print(f'{fn}: error\n{report["error"]}')
+            failed += 1
+        elif not report['stable']:
+            print(f'{fn}: saving does not round-trip')
+            failed += 1
+        else:
+            print(f'{fn}: ok ({report["compression"] or "uncompressed"})')
+
+    if len(reports) != len(levels):
+        print(f'expected {len(levels)} reports, got {len(reports)}')
+        failed += 1
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
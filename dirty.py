@@ -3,6 +3,8 @@ from PyQt6 import QtCore, QtGui
 import globals_
 
 def SetDirty(noautosave=False):
+    globals_.ChangeCount += 1
+
     if globals_.DirtyOverride > 0:
         return
 
@@ -2,6 +2,7 @@ import os
 import sys
 import importlib.util
 import functools
+import types
 from xml.etree import ElementTree as etree
 
 from PyQt6 import QtWidgets
@@ -11,6 +12,7 @@ from dirty import setting, setSetting
 from sprites_common import LoadBasics
 
 import globals_
+import profiler
 import spritelib as SLib
 import sprites
 
@@ -62,6 +64,7 @@ class ReggieGameDefinition:
         self.version = '2'
 
         self.sprites = sprites
+        self.imageClasses = None  # see getImageClasses
 
         self.files = {
             'bga': gdf(os.path.join('reggiedata', 'bga.txt'), False),
@@ -392,19 +395,35 @@ class ReggieGameDefinition:
 
     def getImageClasses(self):
         """
-        Gets all image classes
+        Gets all image classes, including those of the base definitions. They
+        are merged once and returned as a read-only mapping, until
+        clearImageClasses is called.
         """
-        if not self.custom:
-            return self.sprites.ImageClasses
+        if self.imageClasses is not None:
+            return self.imageClasses
 
-        if self.base is not None:
-            images = dict(self.base.getImageClasses())
+        if not self.custom:
+            images = self.sprites.ImageClasses
         else:
-            images = {}
+            if self.base is not None:
+                images = dict(self.base.getImageClasses())
+            else:
+                images = {}
 
-        if hasattr(self.sprites, 'ImageClasses'):
-            images.update(self.sprites.ImageClasses)
-        return images
+            if hasattr(self.sprites, 'ImageClasses'):
+                images.update(self.sprites.ImageClasses)
+
+        self.imageClasses = types.MappingProxyType(images)
+        return self.imageClasses
+
+    def clearImageClasses(self):
+        """
+        Clears the merged image classes of this definition and its bases
+        """
+        self.imageClasses = None
+
+        if self.base is not None:
+            self.base.clearImageClasses()
 
 
 def getAvailableGameDefs():
@@ -456,12 +475,17 @@ def LoadGameDef(name=None, dlg=None):
     try:
 
         # Load the globals_.gamedef
+        profiler.Step('Loading game patch')
         if dlg:
             dlg.setLabelText(globals_.trans.string('Gamedefs', 1))  # Loading game patch...
 
         globals_.gamedef = ReggieGameDefinition(name)
         globals_.gamedef.__init2__()
 
+        # Base definitions are shared between loads, so their merged image
+        # classes are rebuilt as well
+        globals_.gamedef.clearImageClasses()
+
         if globals_.gamedef.custom and (not globals_.settings.contains(f'StageGamePath_{globals_.gamedef.name}')):
             # First-time usage of this globals_.gamedef. Have the
             # user pick a stage folder so we can load stages
@@ -504,6 +528,7 @@ def LoadGameDef(name=None, dlg=None):
             dlg.setValue(1)
 
         # Load spritedata.xml and spritecategories.xml
+        profiler.Step('Loading sprite data')
         if dlg:
             dlg.setLabelText(globals_.trans.string('Gamedefs', 8))  # Loading sprite data...
 
@@ -530,6 +555,7 @@ def LoadGameDef(name=None, dlg=None):
             dlg.setValue(2)
 
         # Load BgA/BgB names
+        profiler.Step('Loading background names')
         if dlg:
             dlg.setLabelText(globals_.trans.string('Gamedefs', 9))  # Loading background names...
 
@@ -543,6 +569,7 @@ def LoadGameDef(name=None, dlg=None):
             dlg.setValue(3)
 
         # Reload tilesets
+        profiler.Step('Reloading tilesets')
         if dlg:
             dlg.setLabelText(globals_.trans.string('Gamedefs', 10))  # Reloading tilesets...
 
@@ -556,6 +583,7 @@ def LoadGameDef(name=None, dlg=None):
             dlg.setValue(4)
 
         # Load sprites.py
+        profiler.Step('Loading sprite image data')
         if dlg:
             dlg.setLabelText(globals_.trans.string('Gamedefs', 11))  # Loading sprite image data...
 
@@ -569,18 +597,11 @@ def LoadGameDef(name=None, dlg=None):
             SLib.SpriteImagesLoaded.clear()
             LoadBasics()
 
+            # setImageObj loads the images of every sprite type the first
+            # time it is used. Image files that did not change are taken from
+            # SLib.FileCache.
             spriteClasses = globals_.gamedef.getImageClasses()
 
-            for s in globals_.Area.sprites:
-                if s.sprite_num in SLib.SpriteImagesLoaded:
-                    continue
-                if s.sprite_num not in spriteClasses:
-                    continue
-
-                spriteClasses[s.sprite_num].loadImages()
-
-                SLib.SpriteImagesLoaded.add(s.sprite_num)
-
             for s in globals_.Area.sprites:
                 if s.sprite_num in spriteClasses:
                     s.setImageObj(spriteClasses[s.sprite_num])
@@ -612,6 +633,7 @@ def LoadGameDef(name=None, dlg=None):
             dlg.setValue(5)
 
         # Reload the sprite-picker text
+        profiler.Step('Applying sprite image data')
         if dlg:
             dlg.setLabelText(globals_.trans.string('Gamedefs', 12))  # Applying sprite image data...
 
@@ -623,6 +645,7 @@ def LoadGameDef(name=None, dlg=None):
             dlg.setValue(6)
 
         # Load entrance names
+        profiler.Step('Loading entrance names')
         if dlg:
             dlg.setLabelText(globals_.trans.string('Gamedefs', 16))  # Loading entrance names...
 
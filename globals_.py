@@ -90,6 +90,7 @@ UseRoundedRectangles = True
 
 # Level
 Area: AreaType = AreaType.DummyArea()
+ChangeCount = 0 # incremented by every SetDirty call, even if the level is already dirty
 Dirty = False
 DirtyOverride = 0
 EnablePadding = False
@@ -115,6 +116,7 @@ Overrides: list[TilesetTile | None] = [] # 320 tiles, this is put into Tiles usu
 Overrides_safe: list[TilesetTile | None] = []
 OVERRIDE_UNKNOWN = 0
 Tiles: list[TilesetTile | None] = [] # 0x200 tiles per tileset, plus 64 for each type of override
+TilesAnimated: set[int] = set() # indices of the animated tiles in Tiles
 TilesetAnimTimer: QtCore.QTimer | None = None
 TilesetFilesLoaded: list[str | None] = [None for _ in range(4)] # should always have exactly 4 entries
 TilesetInfo: dict[str, dict[int, RandTileSelection]] = {}
@@ -123,6 +125,7 @@ TilesetNames: list[TilesetCategory] = [TilesetCategory() for _ in range(4)] # sh
 # Sprites
 NumSprites = 0
 ResetDataWhenHiding = False
+SpriteRenderGeneration = 0 # incremented when the cached sprite renders may be outdated, e.g. when the tiles change
 SpriteCategories: list[SpriteCategory] = []
 Sprites: list[SpriteDefinition] = []
 
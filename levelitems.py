@@ -1,7 +1,10 @@
 from PyQt6 import QtCore, QtGui, QtWidgets
+import math
 import os
 import random
 import base64
+import itertools
+from collections import OrderedDict
 from typing import cast
 
 import spritelib as SLib
@@ -13,6 +16,27 @@ from dirty import SetDirty
 from src.ui.actions.undo.move_item import MoveItemUndoAction
 from src.ui.actions.undo.simultaneous import SimultaneousUndoAction
 
+# The sprites that have a cached render (see SpriteItem.paint), least recently
+# used first, with the size of their render in bytes. The least recently used
+# renders are dropped once the budget is exceeded.
+SpriteRenders: 'OrderedDict[SpriteItem, int]' = OrderedDict()
+SpriteRenderBudget = 128 * 1024 * 1024  # bytes
+SpriteRenderSize = 0
+
+
+def ClearSpriteRenders():
+    """
+    Throws away all cached sprite renders, e.g. when another level is loaded
+    """
+    global SpriteRenderSize
+
+    for sprite in SpriteRenders:
+        sprite.renderCache = None
+
+    SpriteRenders.clear()
+    SpriteRenderSize = 0
+
+
 class InstanceDefinition:
     """
     ABC for a definition of an instance of a LevelEditorItem class, used for persistence and comparisons
@@ -273,6 +297,7 @@ class LevelEditorItem(QtWidgets.QGraphicsItem):
     dragoffsety = 0
     objx, objy = 0, 0
     BoundingRect = QtCore.QRectF(0, 0, 24, 24)
+    itemIds = itertools.count(1)
 
     def __init__(self):
         """
@@ -281,6 +306,8 @@ class LevelEditorItem(QtWidgets.QGraphicsItem):
         QtWidgets.QGraphicsItem.__init__(self)
         self.setFlag(self.GraphicsItemFlag.ItemSendsGeometryChanges, True)
 
+        # Stable id of this item, used to find it again (see Area.GetItemById)
+        self.itemId = next(LevelEditorItem.itemIds)
         self.listitem: ListWidgetItem_SortsByOther | None = None
 
     def __lt__(self, other):
@@ -525,8 +552,9 @@ class ObjectItem(LevelEditorItem):
         self.TLGrabbed = self.TRGrabbed = self.BLGrabbed = self.BRGrabbed = False
         self.MTGrabbed = self.MLGrabbed = self.MBGrabbed = self.MRGrabbed = False
 
-        self.setFlag(self.GraphicsItemFlag.ItemIsMovable, not globals_.ObjectsFrozen)
-        self.setFlag(self.GraphicsItemFlag.ItemIsSelectable, not globals_.ObjectsFrozen)
+        # Every flag change goes through itemChange, so set them at once
+        if not globals_.ObjectsFrozen:
+            self.setFlags(self.flags() | self.GraphicsItemFlag.ItemIsMovable | self.GraphicsItemFlag.ItemIsSelectable)
 
         self.UpdateRects()
 
@@ -564,11 +592,20 @@ class ObjectItem(LevelEditorItem):
 
     def UpdateTooltip(self):
         """
-        Updates the tooltip
+        Marks the tooltip as outdated. Large areas have a lot of objects, so the
+        tooltip is only created when it is about to be shown, by
+        LevelScene.helpEvent.
+        """
+        self.tooltipOutdated = True
+
+    def CreateTooltip(self):
+        """
+        Creates the tooltip
         """
         self.setToolTip(
             globals_.trans.string('Objects', 0, '[tileset]', self.tileset + 1, '[obj]', self.object_num, '[width]', self.width,
                          '[height]', self.height, '[layer]', self.layer))
+        self.tooltipOutdated = False
 
     def updateObjCache(self):
         """
@@ -576,6 +613,15 @@ class ObjectItem(LevelEditorItem):
         """
         self.objdata = RenderObject(self.tileset, self.object_num, self.width, self.height)
         self.randomise()
+        self.invalidateTiles()
+
+    def invalidateTiles(self):
+        """
+        Makes the scene re-render the tiles below this object
+        """
+        scene = self.scene()
+        if scene is not None:
+            scene.invalidateTileChunks(self.LevelRect)
 
     def isBottomRowSpecial(self):
         """
@@ -804,9 +850,29 @@ class ObjectItem(LevelEditorItem):
         Recreates the bounding and selection rects
         """
         self.prepareGeometryChange()
+
+        # The tiles at the old position need to be redrawn
+        scene = self.scene()
+        if scene is not None:
+            scene.invalidateTileChunks(self.LevelRect)
+
         self.BoundingRect = QtCore.QRectF(0, 0, 24 * self.width, 24 * self.height)
         self.SelectionRect = self.BoundingRect - QtCore.QMarginsF(0.5, 0.5, 0.5, 0.5)
 
+        # The resize grabbers are only needed for objects the mouse is over, so
+        # they are created when they are used
+        self.grabbersOutdated = True
+
+        self.LevelRect = QtCore.QRectF(self.objx, self.objy, self.width, self.height)
+
+        if scene is not None:
+            globals_.Area.object_grids[self.layer].move(self)
+            scene.invalidateTileChunks(self.LevelRect)
+
+    def UpdateGrabberRects(self):
+        """
+        Recreates the rects of the resize grabbers
+        """
         # Make sure the grabbers don't overlap
         size = min(4.8 + self.width * self.height * 0.01, min(self.width, self.height) * 24 / 3 - 1)
 
@@ -832,13 +898,17 @@ class ObjectItem(LevelEditorItem):
         self.GrabberRectMB_ = QtCore.QRectF(size, longheight + size, longwidth, size)
         self.GrabberRectMR_ = QtCore.QRectF(longwidth + size, size, size, longheight)
 
-        self.LevelRect = QtCore.QRectF(self.objx, self.objy, self.width, self.height)
+        self.grabbersOutdated = False
 
     def itemChange(self, change, value):
         """
         Makes sure positions don't go out of bounds and updates them as necessary
         """
-        if change == QtWidgets.QGraphicsItem.GraphicsItemChange.ItemPositionChange:
+        if change == QtWidgets.QGraphicsItem.GraphicsItemChange.ItemSceneHasChanged:
+            if value is not None:
+                value.invalidateTileChunks(self.LevelRect)
+
+        elif change == QtWidgets.QGraphicsItem.GraphicsItemChange.ItemPositionChange:
             scene = self.scene()
             if scene is None or globals_.mainWindow is None:
                 return value
@@ -858,7 +928,10 @@ class ObjectItem(LevelEditorItem):
             x = int(newpos.x() / 24)
             y = int(newpos.y() / 24)
             if x != self.objx or y != self.objy:
+                scene.invalidateTileChunks(self.LevelRect)
                 self.LevelRect.moveTo(x, y)
+                globals_.Area.object_grids[self.layer].move(self)
+                scene.invalidateTileChunks(self.LevelRect)
 
                 oldx = self.objx
                 oldy = self.objy
@@ -904,6 +977,9 @@ class ObjectItem(LevelEditorItem):
         if color is not None:
             painter.fillRect(self.SelectionRect, color)
 
+        if self.grabbersOutdated:
+            self.UpdateGrabberRects()
+
         is_grabbed = [
             self.TLGrabbed, self.TRGrabbed,
             self.BLGrabbed, self.BRGrabbed,
@@ -948,6 +1024,9 @@ class ObjectItem(LevelEditorItem):
                 globals_.mainWindow.scene.clearSelection()
                 self.setSelected(True)
 
+        if self.grabbersOutdated:
+            self.UpdateGrabberRects()
+
         self.TLGrabbed = self.GrabberRectTL.contains(event.pos())
         self.TRGrabbed = self.GrabberRectTR.contains(event.pos())
         self.BLGrabbed = self.GrabberRectBL.contains(event.pos())
@@ -999,6 +1078,9 @@ class ObjectItem(LevelEditorItem):
         if globals_.ObjectsFrozen or not event:
             return
 
+        if self.grabbersOutdated:
+            self.UpdateGrabberRects()
+
         TLHovered = self.GrabberRectTL.contains(event.pos())
         TRHovered = self.GrabberRectTR.contains(event.pos())
         BLHovered = self.GrabberRectBL.contains(event.pos())
@@ -1317,6 +1399,7 @@ class ObjectItem(LevelEditorItem):
         Delete the object from the level
         """
         globals_.Area.RemoveFromLayer(self)
+        self.invalidateTiles()
         scene = self.scene()
         if scene is not None:
             scene.update(self.x(), self.y(), self.BoundingRect.width(), self.BoundingRect.height())
@@ -1449,9 +1532,6 @@ class ZoneItem(LevelEditorItem):
         """
         Updates the zone's bounding rectangle
         """
-        if globals_.mainWindow is None:
-            return
-
         if hasattr(globals_.mainWindow, 'ZoomLevel'):
             grabberWidth = 480 / globals_.mainWindow.ZoomLevel
             if grabberWidth < 4.8:
@@ -2053,6 +2133,7 @@ class LocationItem(LevelEditorItem):
             sel_model.clearSelection()
 
         globals_.Area.locations.remove(self)
+        globals_.Area.ForgetItem(self)
         scene = self.scene()
         if scene is not None:
             scene.update(self.x(), self.y(), self.BoundingRect.width(), self.BoundingRect.height())
@@ -2093,6 +2174,11 @@ class SpriteItem(LevelEditorItem):
     instanceDef = InstanceDefinition_SpriteItem
     BoundingRect = QtCore.QRectF(0, 0, 24, 24)
     SelectionRect = QtCore.QRectF(0, 0, 23, 23)
+    lastSceneRegion: QtCore.QRectF | None = None  # see updateScene
+    renderCache: tuple | None = None  # (key, device rect, pixmap), see paint
+
+    # Renders with more device pixels than this are not cached
+    MaxCachedRenderArea = 1024 * 1024
 
     def __init__(self, sprite_num, x, y, data):
         """
@@ -2187,8 +2273,9 @@ class SpriteItem(LevelEditorItem):
         self.setZValue(26000)
         self.resetTransform()
 
-        if (self.sprite_num in globals_.gamedef.getImageClasses()) and (self.sprite_num not in SLib.SpriteImagesLoaded):
-            globals_.gamedef.getImageClasses()[self.sprite_num].loadImages()
+        image_classes = globals_.gamedef.getImageClasses()
+        if (self.sprite_num in image_classes) and (self.sprite_num not in SLib.SpriteImagesLoaded):
+            image_classes[self.sprite_num].loadImages()
             SLib.SpriteImagesLoaded.add(self.sprite_num)
 
         self.ImageObj = obj(self) if obj else SLib.SpriteImage(self)
@@ -2217,6 +2304,7 @@ class SpriteItem(LevelEditorItem):
             ))
 
         self.ImageObj.dataChanged()
+        self.dropRender()
 
         if globals_.SpriteImagesShown:
             self.UpdateRects()
@@ -2239,6 +2327,7 @@ class SpriteItem(LevelEditorItem):
         Creates all the rectangles for the sprite
         """
         self.prepareGeometryChange()
+        self.dropRender()
 
         # Get rects
         imgRect = QtCore.QRectF(
@@ -2500,28 +2589,152 @@ class SpriteItem(LevelEditorItem):
 
     def updateScene(self):
         """
-        Calls self.scene().update()
+        Repaints the region of the scene returned by ImageObj.sceneRegion(),
+        or the whole scene if the image doesn't declare one
         """
-        # Some of the more advanced painters need to update the whole scene
-        # and this is a convenient way to do it:
+        # Some of the more advanced painters need to update the scene outside
+        # of the sprite and this is a convenient way to do it:
         # self.parent.updateScene()
         scene = self.scene()
-        if scene is not None:
+        if scene is None:
+            return
+
+        region = self.ImageObj.sceneRegion()
+        if region is None:
             scene.update()
+        else:
+            # The region the image painted in before needs to be cleared
+            if self.lastSceneRegion is not None:
+                scene.update(self.lastSceneRegion)
+            scene.update(region)
+
+        self.lastSceneRegion = region
 
     def paint(self, painter: QtGui.QPainter | None, option: 'QtWidgets.QStyleOptionGraphicsItem | None'=None,
               widget: QtWidgets.QWidget | None=None, overrideGlobals=False):
         """
-        Paints the sprite
+        Paints the sprite. In the level view, the sprite is rendered into a
+        pixmap that is reused until the sprite or the zoom changes.
         """
         if not painter or not self.font:
             return
 
-        # Setup stuff
-        if option is not None:
+        transform = painter.worldTransform()
+
+        if option is None or not transform.isAffine():
+            self.paintSprite(painter, overrideGlobals)
+            return
+
+        # Split the transform into a whole pixel offset and the rest, so that
+        # scrolling the view does not invalidate the cached render
+        dx, dy = transform.dx(), transform.dy()
+        x, y = math.floor(dx), math.floor(dy)
+
+        # Images that paint tiles need to follow the tile animations
+        scene = self.scene()
+        if self.ImageObj.drawsTiles and scene is not None:
+            anim_tick = scene.animationTick
+        else:
+            anim_tick = 0
+
+        key = (
+            self.sprite_num, self.spritedata, self.isSelected(),
+            transform.m11(), transform.m12(), transform.m21(), transform.m22(), dx - x, dy - y,
+            painter.device().devicePixelRatioF(),
+            globals_.SpriteImagesShown, globals_.UseRoundedRectangles, globals_.Layer0Shown,
+            globals_.theme, globals_.SpriteRenderGeneration, anim_tick,
+        )
+
+        cache = self.renderCache
+        if cache is None or cache[0] != key:
+            self.dropRender()
+            cache = self.renderSprite(key, painter)
+            if cache is not None:
+                self.storeRender(cache)
+        else:
+            SpriteRenders.move_to_end(self)
+
+        if cache is None:
+            # Too large to be cached
             painter.setClipRect(option.exposedRect)
             painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing)
+            self.paintSprite(painter)
+            return
+
+        _, rect, pixmap = cache
+
+        painter.save()
+        painter.resetTransform()
+        painter.drawPixmap(x + rect.x(), y + rect.y(), pixmap)
+        painter.restore()
+
+    def renderSprite(self, key, painter):
+        """
+        Renders the sprite into a pixmap with the transform and device pixel
+        ratio in the render key. Returns the render cache entry, or None if the
+        render would be too large.
+        """
+        transform = QtGui.QTransform(*key[3:9])
+        ratio = key[9]
+
+        rect = transform.mapRect(self.BoundingRect).toAlignedRect()
+        if rect.isEmpty() or rect.width() * rect.height() * ratio * ratio > self.MaxCachedRenderArea:
+            return None
+
+        pixmap = QtGui.QPixmap(rect.size() * ratio)
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(QtCore.Qt.GlobalColor.transparent)
+
+        # Start with the state the view would paint the sprite with
+        pix_painter = QtGui.QPainter(pixmap)
+        pix_painter.setPen(painter.pen())
+        pix_painter.setBrush(painter.brush())
+        pix_painter.setFont(painter.font())
+        pix_painter.setRenderHints(painter.renderHints())
+
+        pix_painter.setTransform(transform * QtGui.QTransform.fromTranslate(-rect.x(), -rect.y()))
+        pix_painter.setClipRect(self.BoundingRect)
+        pix_painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing)
+        self.paintSprite(pix_painter)
+        pix_painter.end()
+
+        return key, rect, pixmap
+
+    def storeRender(self, cache):
+        """
+        Makes a render the cached render of the sprite, dropping the least
+        recently used renders if they no longer fit in the budget
+        """
+        global SpriteRenderSize
 
+        pixmap = cache[2]
+        cost = pixmap.width() * pixmap.height() * 4
+
+        self.renderCache = cache
+        SpriteRenders[self] = cost
+        SpriteRenderSize += cost
+
+        while SpriteRenderSize > SpriteRenderBudget and len(SpriteRenders) > 1:
+            sprite, cost = SpriteRenders.popitem(last=False)
+            sprite.renderCache = None
+            SpriteRenderSize -= cost
+
+    def dropRender(self):
+        """
+        Throws away the cached render of the sprite
+        """
+        global SpriteRenderSize
+
+        self.renderCache = None
+
+        cost = SpriteRenders.pop(self, None)
+        if cost is not None:
+            SpriteRenderSize -= cost
+
+    def paintSprite(self, painter, overrideGlobals=False):
+        """
+        Paints the sprite image and spritebox
+        """
         # Turn aux things on or off
         for aux in self.ImageObj.aux:
             aux = cast(SLib.AuxiliarySpriteItem, aux)
@@ -2586,6 +2799,7 @@ class SpriteItem(LevelEditorItem):
             return
 
         self.ImageObj.remove()
+        self.dropRender()
         globals_.mainWindow.UpdateFlag = True
         globals_.mainWindow.spriteList.takeSprite(self)
         globals_.mainWindow.UpdateFlag = False
@@ -2916,6 +3130,7 @@ class EntranceItem(LevelEditorItem):
             sel_model.clearSelection()
 
         globals_.Area.entrances.remove(self)
+        globals_.Area.ForgetItem(self)
         scene = self.scene()
         if scene is not None:
             scene.update(self.x(), self.y(), self.BoundingRect.width(), self.BoundingRect.height())
@@ -2985,10 +3200,24 @@ class Path:
         for node in self._nodes:
             self._scene.addItem(node)
 
-        if not self._has_line:
+        # The line may have been removed from the scene with the nodes
+        if not self._has_line or self._line_item.scene() is None:
             self._scene.addItem(self._line_item)
             self._has_line = True
 
+    def add_to_list(self):
+        """
+        Adds list items for all nodes to the path list
+        """
+        if globals_.mainWindow is None:
+            return
+
+        for node in self._nodes:
+            node.positionChanged = globals_.mainWindow.HandlePathPosChange
+            node.listitem = ListWidgetItem_SortsByOther(node, node.ListString())
+            globals_.mainWindow.pathList.addItem(node.listitem)
+            node.UpdateListItem()
+
     def set_id(self, new_id):
         """
         Changes the path's id and returns whether the path's id changed.
@@ -3096,9 +3325,6 @@ class Path:
         Adds a node to the path at the specified position. If no index is given,
         the node is appended to the end of the path.
         """
-        if globals_.mainWindow is None:
-            return
-
         if index is None:
             index = len(self._nodes)
 
@@ -3107,10 +3333,11 @@ class Path:
         self._nodes.insert(index, node)
         self._node_data.insert(index, Path.NodeData(speed, accel, delay))
 
-        if add_to_scene:
+        # Without a main window (in batch mode), the path has no scene
+        if add_to_scene and self._scene is not None:
             self._scene.addItem(node)
 
-        if add_to_list:
+        if add_to_list and globals_.mainWindow is not None:
             node.positionChanged = globals_.mainWindow.HandlePathPosChange
             globals_.mainWindow.pathList.addItem(node.listitem)
 
@@ -3119,7 +3346,7 @@ class Path:
             later_node.update_id(new_id)
 
         # Update line item
-        if not self._has_line:
+        if add_to_scene and not self._has_line and self._scene is not None:
             self._scene.addItem(self._line_item)
             self._has_line = True
 
@@ -3150,6 +3377,7 @@ class Path:
         # Remove node from internal lists
         del self._nodes[index]
         del self._node_data[index]
+        globals_.Area.ForgetItem(node)
 
         # Update ids of later nodes
         for new_id, later_node in enumerate(self._nodes[index:], index):
@@ -3596,6 +3824,7 @@ class CommentItem(LevelEditorItem):
 
         globals_.mainWindow.scene.removeItem(proxy)
         globals_.Area.comments.remove(self)
+        globals_.Area.ForgetItem(self)
 
         scene = self.scene()
         if scene is not None:
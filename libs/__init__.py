@@ -16,12 +16,21 @@ try:
 except ModuleNotFoundError:
     has_cython = False
 
-# Now use whether we have nsmblib and/or cython to do the actual imports.
+# Tileset images can also be decoded with NumPy, which decodes the whole image at
+# once instead of pixel by pixel.
+try:
+    import numpy
+    has_numpy = True
+except ModuleNotFoundError:
+    has_numpy = False
+
+# Now use whether we have nsmblib, cython and/or numpy to do the actual imports.
 
 lib_versions = {
     "cython": None,
     "nsmblib": None,
     "nsmblib-updated": None,
+    "numpy": None,
 }
 
 if has_nsmblib:
@@ -36,7 +45,9 @@ if has_nsmblib:
     # tileset. Reggie Next uses the "decodeRGB4A3" function for decoding tile
     # animations as well, which are a lot smaller. Thus, we need a non-nsmblib
     # fallback if the size of the image is not a full image.
-    if has_cython:
+    if has_numpy:
+        from . import tpl_np as _tpl
+    elif has_cython:
         from . import tpl_cy as _tpl
     else:
         from . import tpl as _tpl
@@ -64,17 +75,28 @@ if has_nsmblib:
 elif has_cython:
     from . import lz77 as lz77_py
     from . import lz77_cy as lz77
-    from . import tpl_cy as tpl
 
     # Fall back to python, since cython does not have this implemented
     lz77.CompressLZ77 = lz77_py.CompressLZ77
 
 else:
     from . import lz77
-    from . import tpl
 
-# For LH decompression, only cython or pure python can be used, so pick the best
-# available.
+# Without nsmblib, pick the fastest available tileset image decoder.
+if not has_nsmblib:
+    if has_numpy:
+        from . import tpl_np as tpl
+    elif has_cython:
+        from . import tpl_cy as tpl
+    else:
+        from . import tpl
+
+if has_numpy:
+    lib_versions["numpy"] = numpy.__version__
+    del numpy
+
+# For LH compression and decompression, only cython or pure python can be used,
+# so pick the best available.
 if has_cython:
     from . import lz77_huffman_cy as lh
 
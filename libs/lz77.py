@@ -98,107 +98,164 @@ def UncompressLZ77(inData):
 
     return bytes(outData)
 
-def CompressLZ77(inData):
+# Settings for each compression level: (maximum number of earlier positions
+# to try for every match, whether to check if waiting one byte gives a longer
+# match). Higher levels compress better, but are slower.
+CompressionLevels = {
+    1: (4, False),
+    2: (8, False),
+    3: (16, False),
+    4: (32, False),
+    5: (64, False),
+    6: (128, True),
+    7: (256, True),
+    8: (1024, True),
+    9: (4096, True),
+}
+DefaultCompressionLevel = 6
+
+WindowSize = 0x1000
+MaxMatchLength = 0xFFFF + 273
+
+# Matches at least this long are used right away, even if lazy matching is on
+LazyMatchLength = 32
+
+
+def FindMatches(inData, level=DefaultCompressionLevel, windowSize=WindowSize, maxMatchLength=MaxMatchLength):
+    """
+    Splits "inData" into literals and back-references. Yields an (offset, length)
+    tuple for every back-reference and (0, 0) for every literal byte.
+    This is also used by the LH compressor.
+    """
     dcsize = len(inData)
-    cbuffer = bytearray()
+    maxChain, lazy = CompressionLevels[level]
+
+    # Hash chains of all positions seen so far, keyed by the 3 bytes at that
+    # position. head maps a key to the last position with that key, and prev
+    # maps a position to the previous position with the same key.
+    head = {}
+    prev = [-1] * dcsize
+    hashEnd = dcsize - 2
+
+    def insert(pos):
+        if pos < hashEnd:
+            key = inData[pos] | (inData[pos + 1] << 8) | (inData[pos + 2] << 16)
+            prev[pos] = head.get(key, -1)
+            head[key] = pos
+
+    def search(pos):
+        # Returns the offset and length of the longest match at pos
+        if pos >= hashEnd:
+            return 0, 0
+
+        key = inData[pos] | (inData[pos + 1] << 8) | (inData[pos + 2] << 16)
+        cand = head.get(key, -1)
+        limit = pos - windowSize
+        maxLen = min(maxMatchLength, dcsize - pos)
+
+        bestOffs = bestLen = 0
+        chain = maxChain
+
+        while cand >= limit and cand >= 0 and chain:
+            chain -= 1
+
+            # Only look at the candidate if it could beat the best match
+            if bestLen == 0 or inData[cand + bestLen] == inData[pos + bestLen]:
+                length = 3
+                while length + 16 <= maxLen and \
+                        inData[cand + length:cand + length + 16] == inData[pos + length:pos + length + 16]:
+                    length += 16
+                while length < maxLen and inData[cand + length] == inData[pos + length]:
+                    length += 1
+
+                if length > bestLen:
+                    bestOffs, bestLen = pos - cand, length
+                    if length == maxLen:
+                        break
+
+            cand = prev[cand]
+
+        return bestOffs, bestLen
 
     src = 0
-    dest = 4
-
-    if dcsize > 0xFFFFFF:
-        return None
+    match = search(0)
 
-    cbuffer.append(0x11)
-    cbuffer.append(dcsize & 0xFF)
-    cbuffer.append((dcsize >> 8) & 0xFF)
-    cbuffer.append((dcsize >> 16) & 0xFF)
+    while src < dcsize:
+        matchLen = match[1]
+        insert(src)
 
-    flagrange = [7, 6, 5, 4, 3, 2, 1, 0]
+        nextMatch = None
+        if lazy and 0 < matchLen < LazyMatchLength:
+            # Emit a literal if the next byte starts a longer match
+            nextMatch = search(src + 1)
+            if nextMatch[1] > matchLen:
+                matchLen = 0
 
-    while src < dcsize:
-        flag = 0
-        flagpos = dest
-        cbuffer.append(flag)
-        dest += 1
-
-        for i in flagrange:
-            matchOffs, matchLen = CompressionSearch(inData, src, dcsize, 0x1000, 0xFFFF + 273)
-            if matchLen > 0:
-                flag |= (1 << i)
-
-                matchOffsM1 = matchOffs - 1
-                if matchLen <= 0x10:
-                    cbuffer.append((((matchLen - 1) & 0xF) << 4) | ((matchOffsM1 >> 8) & 0xF))
-                    cbuffer.append(matchOffsM1 & 0xFF)
-                    dest += 2
-                elif matchLen <= 0x110:
-                    matchLenM17 = matchLen - 17
-                    cbuffer.append((matchLenM17 & 0xFF) >> 4)
-                    cbuffer.append(((matchLenM17 & 0xF) << 4) | ((matchOffsM1 & 0xFFF) >> 8))
-                    cbuffer.append(matchOffsM1 & 0xFF)
-                    dest += 3
-                else:
-                    matchLenM273 = matchLen - 273
-                    cbuffer.append(0x10 | ((matchLenM273 >> 12) & 0xF))
-                    cbuffer.append((matchLenM273 >> 4) & 0xFF)
-                    cbuffer.append(((matchLenM273 & 0xF) << 4) | ((matchOffsM1 >> 8) & 0xF))
-                    cbuffer.append(matchOffsM1 & 0xFF)
-                    dest += 4
-
-                src += matchLen
-            else:
-                cbuffer.append(inData[src])
+        if matchLen:
+            yield match
 
-                src += 1
-                dest += 1
+            for pos in range(src + 1, src + matchLen):
+                insert(pos)
 
-            if src >= dcsize: break
+            src += matchLen
+            match = search(src)
+        else:
+            yield 0, 0
 
-        cbuffer[flagpos] = flag
+            src += 1
 
-    return cbuffer
+            if nextMatch is None:
+                match = search(src)
+            else:
+                match = nextMatch
 
-def CompressionSearch(data, offset, totalLength, windowSize=0x1000, maxMatchAmount=18):
-    """
-    Find the longest possible match (in the current window) of the
-    data in "data" (which has total length "length") at offset
-    "offset".
-    Return the offset of the match relative to "offset", and its
-    length.
-    This function is ported from ndspy.
-    """
 
-    if windowSize > offset:
-        windowSize = offset
-    start = offset - windowSize
+def CompressLZ77(inData, level=DefaultCompressionLevel):
+    dcsize = len(inData)
 
-    if windowSize < maxMatchAmount:
-        maxMatchAmount = windowSize
-    if (totalLength - offset) < maxMatchAmount:
-        maxMatchAmount = totalLength - offset
+    if dcsize > 0xFFFFFF:
+        return None
 
-    # Strategy: do a binary search of potential match sizes, to
-    # find the longest match that exists in the data.
+    cbuffer = bytearray()
+    cbuffer.append(0x11)
+    cbuffer.append(dcsize & 0xFF)
+    cbuffer.append((dcsize >> 8) & 0xFF)
+    cbuffer.append((dcsize >> 16) & 0xFF)
 
-    lower = 3
-    upper = maxMatchAmount
+    flagpos = 0
+    bit = 0
+    src = 0
 
-    recordMatchOffset = recordMatchLen = 0
-    while lower <= upper:
-        # Attempt to find a match at the middle length
-        matchLen = (lower + upper) // 2
-        match = data[offset : offset + matchLen]
-        matchOffset = data.rfind(match, start, offset)
+    for matchOffs, matchLen in FindMatches(inData, level):
+        if bit == 0:
+            flagpos = len(cbuffer)
+            cbuffer.append(0)
+            bit = 8
+
+        bit -= 1
+
+        if matchLen:
+            cbuffer[flagpos] |= 1 << bit
+
+            matchOffsM1 = matchOffs - 1
+            if matchLen <= 0x10:
+                cbuffer.append((((matchLen - 1) & 0xF) << 4) | ((matchOffsM1 >> 8) & 0xF))
+                cbuffer.append(matchOffsM1 & 0xFF)
+            elif matchLen <= 0x110:
+                matchLenM17 = matchLen - 17
+                cbuffer.append((matchLenM17 & 0xFF) >> 4)
+                cbuffer.append(((matchLenM17 & 0xF) << 4) | ((matchOffsM1 & 0xFFF) >> 8))
+                cbuffer.append(matchOffsM1 & 0xFF)
+            else:
+                matchLenM273 = matchLen - 273
+                cbuffer.append(0x10 | ((matchLenM273 >> 12) & 0xF))
+                cbuffer.append((matchLenM273 >> 4) & 0xFF)
+                cbuffer.append(((matchLenM273 & 0xF) << 4) | ((matchOffsM1 >> 8) & 0xF))
+                cbuffer.append(matchOffsM1 & 0xFF)
 
-        if matchOffset == -1:
-            # No such match -- any matches will be smaller than this
-            upper = matchLen - 1
+            src += matchLen
         else:
-            # Match found!
-            if matchLen > recordMatchLen:
-                recordMatchOffset, recordMatchLen = matchOffset, matchLen
-            lower = matchLen + 1
-
-    if recordMatchLen == 0:
-        return 0, 0
-    return offset - recordMatchOffset, recordMatchLen
\ No newline at end of file
+            cbuffer.append(inData[src])
+            src += 1
+
+    return cbuffer
@@ -0,0 +1,211 @@
+#!/usr/bin/python
+# -*- coding: latin-1 -*-
+
+# Reggie Next - New Super Mario Bros. Wii Level Editor
+# Milestone 4
+# Copyright (C) 2009-2020 Treeki, Tempus, angelsl, JasonP27, Kamek64,
+# MalStar1000, RoadrunnerWMC, AboodXD, John10v10, TheGrop, CLF78,
+# Zementblock, Danster64
+
+# This file is part of Reggie Next.
+
+# Reggie Next is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Reggie Next is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Reggie Next.  If not, see <http://www.gnu.org/licenses/>.
+
+
+
+
+# lz77_benchmark.py
+# Compares the LZ77 compressor in lz77.py with the one it replaced, which is
+# kept below for reference. Reports the compressed size and the time for each
+# compressor, and checks that every output decompresses to the input. Run it
+# from the Reggie folder with:
+#
+#     python -m libs.lz77_benchmark [file ...]
+#
+# Without arguments, the files in reggieextras and some random data are used.
+
+
+################################################################
+################################################################
+
+
+import os
+import sys
+import time
+from importlib import import_module
+
+# Import the module itself, since libs replaces 'lz77' with nsmblib wrappers
+# when nsmblib is installed
+lz77 = import_module('libs.lz77')
+
+
+DefaultFiles = (
+    os.path.join('reggieextras', 'TrainingLevel.arc'),
+    os.path.join('reggieextras', 'text_tileset', 'Pa0_jyotyu_text.arc'),
+)
+RandomDataSize = 20 * 1024
+Levels = (1, 6, 9)
+
+
+def CompressLZ77_Old(inData):
+    """
+    The compressor that lz77.CompressLZ77 replaced, which searches the window
+    with bytes.rfind at every position
+    """
+    dcsize = len(inData)
+    cbuffer = bytearray()
+
+    src = 0
+    dest = 4
+
+    if dcsize > 0xFFFFFF:
+        return None
+
+    cbuffer.append(0x11)
+    cbuffer.append(dcsize & 0xFF)
+    cbuffer.append((dcsize >> 8) & 0xFF)
+    cbuffer.append((dcsize >> 16) & 0xFF)
+
+    flagrange = [7, 6, 5, 4, 3, 2, 1, 0]
+
+    while src < dcsize:
+        flag = 0
+        flagpos = dest
+        cbuffer.append(flag)
+        dest += 1
+
+        for i in flagrange:
+            matchOffs, matchLen = CompressionSearch(inData, src, dcsize, 0x1000, 0xFFFF + 273)
+            if matchLen > 0:
+                flag |= (1 << i)
+
+                matchOffsM1 = matchOffs - 1
+                if matchLen <= 0x10:
+                    cbuffer.append((((matchLen - 1) & 0xF) << 4) | ((matchOffsM1 >> 8) & 0xF))
+                    cbuffer.append(matchOffsM1 & 0xFF)
+                    dest += 2
+                elif matchLen <= 0x110:
+                    matchLenM17 = matchLen - 17
+                    cbuffer.append((matchLenM17 & 0xFF) >> 4)
+                    cbuffer.append(((matchLenM17 & 0xF) << 4) | ((matchOffsM1 & 0xFFF) >> 8))
+                    cbuffer.append(matchOffsM1 & 0xFF)
+                    dest += 3
+                else:
+                    matchLenM273 = matchLen - 273
+                    cbuffer.append(0x10 | ((matchLenM273 >> 12) & 0xF))
+                    cbuffer.append((matchLenM273 >> 4) & 0xFF)
+                    cbuffer.append(((matchLenM273 & 0xF) << 4) | ((matchOffsM1 >> 8) & 0xF))
+                    cbuffer.append(matchOffsM1 & 0xFF)
+                    dest += 4
+
+                src += matchLen
+            else:
+                cbuffer.append(inData[src])
+
+                src += 1
+                dest += 1
+
+            if src >= dcsize: break
+
+        cbuffer[flagpos] = flag
+
+    return cbuffer
+
+
+def CompressionSearch(data, offset, totalLength, windowSize=0x1000, maxMatchAmount=18):
+    """
+    Find the longest possible match (in the current window) of the
+    data in "data" (which has total length "length") at offset
+    "offset".
+    Return the offset of the match relative to "offset", and its
+    length.
+    This function is ported from ndspy.
+    """
+
+    if windowSize > offset:
+        windowSize = offset
+    start = offset - windowSize
+
+    if windowSize < maxMatchAmount:
+        maxMatchAmount = windowSize
+    if (totalLength - offset) < maxMatchAmount:
+        maxMatchAmount = totalLength - offset
+
+    # Strategy: do a binary search of potential match sizes, to
+    # find the longest match that exists in the data.
+
+    lower = 3
+    upper = maxMatchAmount
+
+    recordMatchOffset = recordMatchLen = 0
+    while lower <= upper:
+        # Attempt to find a match at the middle length
+        matchLen = (lower + upper) // 2
+        match = data[offset : offset + matchLen]
+        matchOffset = data.rfind(match, start, offset)
+
+        if matchOffset == -1:
+            # No such match -- any matches will be smaller than this
+            upper = matchLen - 1
+        else:
+            # Match found!
+            if matchLen > recordMatchLen:
+                recordMatchOffset, recordMatchLen = matchOffset, matchLen
+            lower = matchLen + 1
+
+    if recordMatchLen == 0:
+        return 0, 0
+    return offset - recordMatchOffset, recordMatchLen
+
+
+def Measure(compress, data):
+    """
+    Compresses 'data', checks the round-trip and returns the compressed size
+    and the time it took
+    """
+    start = time.perf_counter()
+    out = compress(data)
+    elapsed = time.perf_counter() - start
+
+    if lz77.UncompressLZ77(bytes(out)) != data:
+        raise ValueError('Decompressing the output did not give the input back')
+
+    return len(out), elapsed
+
+
+def main(argv):
+    """
+    Runs the benchmark on the given files
+    """
+    inputs = []
+    for path in argv[1:] or DefaultFiles:
+        with open(path, 'rb') as f:
+            inputs.append((os.path.basename(path), f.read()))
+
+    if len(argv) < 2:
+        inputs.append(('random data', os.urandom(RandomDataSize)))
+
+    compressors = [('old', CompressLZ77_Old)]
+    compressors += [('level %d' % level, lambda data, level=level: lz77.CompressLZ77(data, level)) for level in Levels]
+
+    for name, data in inputs:
+        print('%s (%d bytes)' % (name, len(data)))
+
+        for cname, compress in compressors:
+            size, elapsed = Measure(compress, data)
+            print('  %-8s %8d bytes %8.3f s' % (cname, size, elapsed))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
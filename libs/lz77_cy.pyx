@@ -30,7 +30,6 @@
 ################################################################
 ################################################################
 
-from cpython cimport array
 from cython cimport view
 from libc.stdlib cimport malloc, free
 
@@ -40,7 +39,7 @@ ctypedef unsigned short u16
 ctypedef unsigned int u32
 
 
-cdef (u32, u32) GetUncompressedSize(u8 *inData):
+cdef (u32, u32) GetUncompressedSize(const u8 *inData):
     cdef u32 offset = 4
     cdef u32 outSize = inData[1] | (inData[2] << 8) | (inData[3] << 16)
 
@@ -52,15 +51,17 @@ cdef (u32, u32) GetUncompressedSize(u8 *inData):
 
 
 cpdef bytes UncompressLZ77(data):
+    # Read the data through a memoryview, so that memoryviews of archive files
+    # don't need to be converted to an array first
     cdef:
-        array.array dataArr = array.array('B', data)
-        u8 *inData = dataArr.data.as_uchars
+        const u8[::1] dataView = data
+        const u8 *inData = &dataView[0]
 
     if inData[0] != 0x11:
         return bytes(data)
 
     cdef:
-        u32 inLength, outLength, offset, outIndex, copylen
+        u32 inLength, outLength, offset, outIndex, copylen, i
         u8 flags, x, first, second, third, fourth
         u16 pos
         u8 *outData
@@ -71,47 +72,51 @@ cpdef bytes UncompressLZ77(data):
 
     try:
         outIndex = 0
-        while outIndex < outLength and offset < inLength:
-            flags = inData[offset]
-            offset += 1
 
-            for x in range(7, -1, -1):
-                if outIndex >= outLength or offset >= inLength:
-                    break
+        # Nothing in here touches Python objects, so other threads can run
+        # while a file is being decompressed
+        with nogil:
+            while outIndex < outLength and offset < inLength:
+                flags = inData[offset]
+                offset += 1
 
-                if flags & (1 << x):
-                    first = inData[offset]
-                    offset += 1
+                for x in range(7, -1, -1):
+                    if outIndex >= outLength or offset >= inLength:
+                        break
 
-                    second = inData[offset]
-                    offset += 1
+                    if flags & (1 << x):
+                        first = inData[offset]
+                        offset += 1
 
-                    if first < 32:
-                        third = inData[offset]
+                        second = inData[offset]
                         offset += 1
 
-                        if first >= 16:
-                            fourth = inData[offset]
+                        if first < 32:
+                            third = inData[offset]
                             offset += 1
 
-                            pos = (((third & 0xF) << 8) | fourth) + 1
-                            copylen = ((second << 4) | ((first & 0xF) << 12) | (third >> 4)) + 273
+                            if first >= 16:
+                                fourth = inData[offset]
+                                offset += 1
 
-                        else:
-                            pos = (((second & 0xF) << 8) | third) + 1
-                            copylen = (((first & 0xF) << 4) | (second >> 4)) + 17
+                                pos = (((third & 0xF) << 8) | fourth) + 1
+                                copylen = ((second << 4) | ((first & 0xF) << 12) | (third >> 4)) + 273
 
-                    else:
-                        pos = (((first & 0xF) << 8) | second) + 1
-                        copylen = (first >> 4) + 1
+                            else:
+                                pos = (((second & 0xF) << 8) | third) + 1
+                                copylen = (((first & 0xF) << 4) | (second >> 4)) + 17
 
-                    for _ in range(copylen):
-                        outData[outIndex] = outData[outIndex - pos]; outIndex += 1
+                        else:
+                            pos = (((first & 0xF) << 8) | second) + 1
+                            copylen = (first >> 4) + 1
 
-                else:
-                    outData[outIndex] = inData[offset]
-                    offset += 1
-                    outIndex += 1
+                        for i in range(copylen):
+                            outData[outIndex] = outData[outIndex - pos]; outIndex += 1
+
+                    else:
+                        outData[outIndex] = inData[offset]
+                        offset += 1
+                        outIndex += 1
 
         return bytes(<u8[:outLength]>outData)
 
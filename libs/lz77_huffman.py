@@ -24,15 +24,18 @@
 
 
 # lz77_huffman.py
-# Pure-Python decompressing functions for LH-compressed files
+# Pure-Python compressing and decompressing functions for LH-compressed files
 
 
 ################################################################
 ################################################################
 
 import ctypes
+import heapq
 import sys
 
+from .lz77 import DefaultCompressionLevel, FindMatches
+
 u8 = ctypes.c_ubyte
 u32 = ctypes.c_uint
 
@@ -117,7 +120,7 @@ def UncompressLH(inData: bytes) -> bytes:
     inBuf = inBuf[4:]
 
     if outSize.value == 0:
-        outSize = inBuf[0] | (inBuf[1] << 8) | (inBuf[2] << 16) | (inBuf[3] << 24)
+        outSize = u32(inBuf[0] | (inBuf[1] << 8) | (inBuf[2] << 16) | (inBuf[3] << 24))
         inBuf = inBuf[4:]
 
     # Make a buffer to store the decompressed file
@@ -229,3 +232,242 @@ def UncompressLH(inData: bytes) -> bytes:
         outIndex.value += r7.value & 0xFFFF
 
     return bytes(outBuf)
+
+
+# The LZ77 parameters of the LH format
+LHWindowSize = 0x8000
+LHMaxMatchLength = 0xFF + 3
+
+
+def buildHuffmanTree(freqs: list):
+    """
+    Builds a Huffman tree for the symbol frequencies in 'freqs'. Leaves are
+    symbols, and other nodes are (child0, child1) tuples. The root is never a
+    leaf.
+    """
+    heap = [(freq, sym, sym) for sym, freq in enumerate(freqs) if freq]
+
+    # The root needs two children, so add unused symbols if needed
+    for sym in range(2):
+        if len(heap) >= 2:
+            break
+
+        if not freqs[sym]:
+            heap.append((0, sym, sym))
+
+    heapq.heapify(heap)
+    order = len(freqs)
+
+    while len(heap) > 1:
+        freq0, _, node0 = heapq.heappop(heap)
+        freq1, _, node1 = heapq.heappop(heap)
+        heapq.heappush(heap, (freq0 + freq1, order, (node0, node1)))
+        order += 1
+
+    return heap[0][2]
+
+
+def getHuffmanCodes(root, num_symbols: int) -> list:
+    """
+    Returns a list of (code, code length) tuples for every symbol in the tree
+    """
+    codes = [(0, 0)] * num_symbols
+    stack = [(root, 0, 0)]
+
+    while stack:
+        node, code, length = stack.pop()
+
+        for bit, child in enumerate(node):
+            if isinstance(child, int):
+                codes[child] = ((code << 1) | bit, length + 1)
+            else:
+                stack.append((child, (code << 1) | bit, length + 1))
+
+    return codes
+
+
+def makeHuffmanTable(root, offset_bits: int) -> list:
+    """
+    Lays out a Huffman tree as the table of entries the decompressor expects.
+    Each node stores the offset (in entry pairs, minus 1) to the pair holding
+    its children, so the children of every node have to be placed less than
+    1 << 'offset_bits' pairs after it. Nodes are placed depth-first, unless
+    that would make another node miss this limit.
+    """
+    max_offset = 1 << offset_bits
+    leaf_flags = (2 << offset_bits, 1 << offset_bits)
+
+    entries = [0, 0]  # entry 0 is never used, entry 1 is the root
+    pending = [(root, 1)]  # nodes whose children were not placed yet
+
+    while pending:
+        pair = len(entries) >> 1
+
+        choice = len(pending) - 1
+        for i, (_, idx) in enumerate(pending[:-1]):
+            if (idx >> 1) + max_offset < pair + 1 + i:
+                choice = 0
+                break
+
+        node, idx = pending.pop(choice)
+        offset = pair - (idx >> 1) - 1
+
+        if offset >= max_offset:
+            raise ValueError("Huffman tree is too large to be stored")
+
+        flags = offset
+        entries += (0, 0)
+
+        for bit, child in enumerate(node):
+            if isinstance(child, int):
+                entries[pair * 2 + bit] = child
+                flags |= leaf_flags[bit]
+            else:
+                pending.append((child, pair * 2 + bit))
+
+        entries[idx] = flags
+
+    return entries[1:]
+
+
+def getHuffmanTableSize(entries: list, entry_size: int) -> int:
+    """
+    Returns the size in bytes of a stored Huffman table. The size always is a
+    multiple of 4, and loadLHPiece has to stop reading exactly at the end.
+    """
+    header_size = 1 if entry_size <= 8 else 2
+    size = (header_size + (len(entries) * entry_size + 7) // 8 + 3) & ~3
+
+    while True:
+        bytes_read = header_size
+        queue_size = 0
+        read_entries = 0
+
+        while bytes_read < size:
+            if queue_size < entry_size:
+                needed = (entry_size - queue_size + 7) >> 3
+                bytes_read += needed
+                queue_size += needed << 3
+
+            queue_size -= entry_size
+            read_entries += 1
+
+        if bytes_read == size and read_entries >= len(entries):
+            return size
+
+        size += 4
+
+
+def writeHuffmanTable(outData: bytearray, entries: list, entry_size: int):
+    """
+    Appends a Huffman table to 'outData'
+    """
+    size = getHuffmanTableSize(entries, entry_size)
+    start = len(outData)
+
+    if entry_size <= 8:
+        outData.append((size >> 2) - 1)
+    else:
+        outData += ((size >> 2) - 1).to_bytes(2, 'little')
+
+    bits = 0
+    bits_size = 0
+    for entry in entries:
+        bits = (bits << entry_size) | entry
+        bits_size += entry_size
+
+        while bits_size >= 8:
+            bits_size -= 8
+            outData.append((bits >> bits_size) & 0xFF)
+
+        bits &= (1 << bits_size) - 1
+
+    if bits_size:
+        outData.append((bits << (8 - bits_size)) & 0xFF)
+
+    outData += bytes(size - (len(outData) - start))
+
+
+def CompressLH(inData: bytes, level: int = DefaultCompressionLevel) -> bytes:
+    """
+    Compresses data with LH compression. Higher levels (1-9) compress better,
+    but are slower.
+    """
+    inSize = len(inData)
+
+    # Split the data into literals and back-references, and count how often
+    # every length and offset symbol is used
+    tokens = list(FindMatches(inData, level, LHWindowSize, LHMaxMatchLength))
+
+    lengthFreqs = [0] * 0x200
+    offsetFreqs = [0] * 0x11
+
+    src = 0
+    for matchOffs, matchLen in tokens:
+        if matchLen:
+            lengthFreqs[0x100 | (matchLen - 3)] += 1
+            offsetFreqs[(matchOffs - 1).bit_length()] += 1
+            src += matchLen
+        else:
+            lengthFreqs[inData[src]] += 1
+            src += 1
+
+    lengthTree = buildHuffmanTree(lengthFreqs)
+    offsetTree = buildHuffmanTree(offsetFreqs)
+    lengthCodes = getHuffmanCodes(lengthTree, 0x200)
+    offsetCodes = getHuffmanCodes(offsetTree, 0x11)
+
+    # Header
+    outData = bytearray()
+    if 0 < inSize <= 0xFFFFFF:
+        outData += (0x40 | (inSize << 8)).to_bytes(4, 'little')
+    else:
+        outData += (0x40).to_bytes(4, 'little')
+        outData += inSize.to_bytes(4, 'little')
+
+    writeHuffmanTable(outData, makeHuffmanTable(lengthTree, 7), 9)
+    writeHuffmanTable(outData, makeHuffmanTable(offsetTree, 3), 5)
+
+    # The compressed data itself
+    append = outData.append
+    bits = 0
+    bits_size = 0
+
+    src = 0
+    for matchOffs, matchLen in tokens:
+        if matchLen:
+            code, length = lengthCodes[0x100 | (matchLen - 3)]
+            bits = (bits << length) | code
+            bits_size += length
+
+            matchOffsM1 = matchOffs - 1
+            offsetBits = matchOffsM1.bit_length()
+            code, length = offsetCodes[offsetBits]
+            bits = (bits << length) | code
+            bits_size += length
+
+            # The highest bit of the offset is implied by its bit count
+            if offsetBits > 1:
+                bits = (bits << (offsetBits - 1)) | (matchOffsM1 & ((1 << (offsetBits - 1)) - 1))
+                bits_size += offsetBits - 1
+
+            src += matchLen
+        else:
+            code, length = lengthCodes[inData[src]]
+            bits = (bits << length) | code
+            bits_size += length
+
+            src += 1
+
+        while bits_size >= 8:
+            bits_size -= 8
+            append((bits >> bits_size) & 0xFF)
+
+        bits &= (1 << bits_size) - 1
+
+    if bits_size:
+        append((bits << (8 - bits_size)) & 0xFF)
+
+    outData += bytes(-len(outData) & 3)
+
+    return bytes(outData)
@@ -25,7 +25,7 @@
 
 
 # lz77_huffman_cy.pyx
-# LH (LZ77+Huffman) decompressor in Cython.
+# LH (LZ77+Huffman) compressor and decompressor in Cython.
 # Decompiled from NSMBW and simplified by hand
 
 # Previously influenced by the sead::SZSDecompressor decompilation:
@@ -42,7 +42,17 @@ from cython.operator cimport postdecrement
 from libc.stdint cimport  int8_t,  int16_t,  int32_t,  int64_t
 from libc.stdint cimport uint8_t, uint16_t, uint32_t, uint64_t, uintptr_t
 from libc.stdlib cimport malloc, free
-from libc.string cimport memcpy
+from libc.string cimport memcpy, memset
+
+from libs.lz77 import CompressionLevels, DefaultCompressionLevel
+from libs.lz77_huffman import (
+    LHMaxMatchLength,
+    LHWindowSize,
+    buildHuffmanTree,
+    getHuffmanCodes,
+    makeHuffmanTable,
+    writeHuffmanTable,
+)
 
 ctypedef   int8_t s8
 ctypedef  uint8_t u8
@@ -324,3 +334,238 @@ cpdef bytes UncompressLH(src):
         raise RuntimeError("Failed to uncompress entire LH source data! Error code: %d" % res)
 
     return dstArr.tobytes()
+
+
+cdef enum:
+    # Matches at least this long are used right away, even if lazy matching
+    # is on
+    LAZY_MATCH_LENGTH = 32
+    HASH_BITS = 15
+
+
+cdef inline u32 LHCompressor_hash(const u8* src):
+    return ((<u32>src[0] << 10) ^ (<u32>src[1] << 5) ^ src[2]) & ((1 << HASH_BITS) - 1)
+
+
+cdef inline u32 BitLength(u32 x):
+    cdef u32 n = 0
+
+    while x:
+        x >>= 1
+        n += 1
+
+    return n
+
+
+cdef struct BitWriter:
+    u64 bitStream
+    u32 bitStreamLen
+
+
+cdef inline void BitWriter_write(BitWriter* this, bytearray outData, u64 bits, u8 nBits):
+    # Huffman codes are never near 57 bits long, so this can't overflow
+    this.bitStream = this.bitStream << nBits | bits
+    this.bitStreamLen += nBits
+
+    while this.bitStreamLen >= 8:
+        this.bitStreamLen -= 8
+        outData.append(<u8>(this.bitStream >> this.bitStreamLen))
+
+
+cdef struct MatchFinder:
+    const u8* src
+    u32 srcSize
+    s32* head
+    s32* prev
+    u32 maxChain
+
+
+cdef inline void MatchFinder_insert(MatchFinder* this, u32 pos):
+    cdef u32 key
+
+    if pos + 2 < this.srcSize:
+        key = LHCompressor_hash(this.src + pos)
+        this.prev[pos] = this.head[key]
+        this.head[key] = <s32>pos
+
+
+cdef inline u32 MatchFinder_search(MatchFinder* this, u32 pos, u32* matchOffs):
+    # Returns the length of the longest match at pos, and stores its offset in
+    # matchOffs
+    cdef:
+        const u8* src = this.src
+        s32 cand
+        s64 limit = <s64>pos - LHWindowSize
+        u32 maxLen, length
+        u32 bestLen = 0
+        u32 chain = this.maxChain
+
+    if pos + 2 >= this.srcSize:
+        return 0
+
+    maxLen = this.srcSize - pos
+    if maxLen > LHMaxMatchLength:
+        maxLen = LHMaxMatchLength
+
+    cand = this.head[LHCompressor_hash(src + pos)]
+
+    while cand >= 0 and cand >= limit and chain:
+        chain -= 1
+
+        # Only look at the candidate if it could beat the best match
+        if src[cand + bestLen] == src[pos + bestLen]:
+            length = 0
+            while length < maxLen and src[cand + length] == src[pos + length]:
+                length += 1
+
+            # Hash collisions can give matches that are too short
+            if length >= 3 and length > bestLen:
+                bestLen = length
+                matchOffs[0] = pos - cand
+                if length == maxLen:
+                    break
+
+        cand = this.prev[cand]
+
+    return bestLen
+
+
+cpdef bytes CompressLH(src, int level=DefaultCompressionLevel):
+    cdef:
+        array.array srcArr = array.array('B', src)
+        const u8* srcp = srcArr.data.as_uchars
+        u32 srcSize = <u32>len(src)
+
+        MatchFinder finder
+        bint lazy
+
+        # Literals are stored as length 0, with the byte as the offset
+        u16* tokenLens = <u16*>malloc((srcSize + 1) * sizeof(u16))
+        u16* tokenOffs = <u16*>malloc((srcSize + 1) * sizeof(u16))
+        u32 numTokens = 0
+
+        u32 lengthFreqs[0x200]
+        u32 offsetFreqs[0x11]
+        u64 lengthCodes[0x200]
+        u8 lengthCodeLens[0x200]
+        u64 offsetCodes[0x11]
+        u8 offsetCodeLens[0x11]
+
+        u32 pos, i, matchLen, nextLen, matchOffs, nextOffs, offsetBits, sym
+        BitWriter writer
+        bytearray outData
+
+    finder.src = srcp
+    finder.srcSize = srcSize
+    finder.head = <s32*>malloc((1 << HASH_BITS) * sizeof(s32))
+    finder.prev = <s32*>malloc((srcSize + 1) * sizeof(s32))
+    maxChain, lazy = CompressionLevels[level]
+    finder.maxChain = maxChain
+
+    writer.bitStream = 0
+    writer.bitStreamLen = 0
+
+    try:
+        memset(finder.head, 0xFF, (1 << HASH_BITS) * sizeof(s32))
+        memset(lengthFreqs, 0, sizeof(lengthFreqs))
+        memset(offsetFreqs, 0, sizeof(offsetFreqs))
+
+        # Split the data into literals and back-references
+        pos = 0
+        matchOffs = 0
+        matchLen = MatchFinder_search(&finder, 0, &matchOffs)
+
+        while pos < srcSize:
+            MatchFinder_insert(&finder, pos)
+
+            nextLen = 0
+            if lazy and 0 < matchLen < LAZY_MATCH_LENGTH:
+                # Emit a literal if the next byte starts a longer match
+                nextLen = MatchFinder_search(&finder, pos + 1, &nextOffs)
+                if nextLen > matchLen:
+                    matchLen = 0
+                else:
+                    nextLen = 0
+
+            if matchLen:
+                tokenLens[numTokens] = <u16>matchLen
+                tokenOffs[numTokens] = <u16>(matchOffs - 1)
+                lengthFreqs[0x100 | (matchLen - 3)] += 1
+                offsetFreqs[BitLength(matchOffs - 1)] += 1
+
+                for i in range(pos + 1, pos + matchLen):
+                    MatchFinder_insert(&finder, i)
+
+                pos += matchLen
+                matchLen = MatchFinder_search(&finder, pos, &matchOffs)
+
+            else:
+                tokenLens[numTokens] = 0
+                tokenOffs[numTokens] = srcp[pos]
+                lengthFreqs[srcp[pos]] += 1
+
+                pos += 1
+                if nextLen:
+                    matchLen = nextLen
+                    matchOffs = nextOffs
+                else:
+                    matchLen = MatchFinder_search(&finder, pos, &matchOffs)
+
+            numTokens += 1
+
+        # Build the Huffman tables
+        lengthTree = buildHuffmanTree(lengthFreqs)
+        offsetTree = buildHuffmanTree(offsetFreqs)
+
+        for sym, (code, length) in enumerate(getHuffmanCodes(lengthTree, 0x200)):
+            lengthCodes[sym] = code
+            lengthCodeLens[sym] = length
+
+        for sym, (code, length) in enumerate(getHuffmanCodes(offsetTree, 0x11)):
+            offsetCodes[sym] = code
+            offsetCodeLens[sym] = length
+
+        # Header
+        size = srcSize
+        outData = bytearray()
+        if 0 < size <= 0xFFFFFF:
+            outData += (0x40 | (size << 8)).to_bytes(4, 'little')
+        else:
+            outData += (0x40).to_bytes(4, 'little')
+            outData += size.to_bytes(4, 'little')
+
+        writeHuffmanTable(outData, makeHuffmanTable(lengthTree, 7), 9)
+        writeHuffmanTable(outData, makeHuffmanTable(offsetTree, 3), 5)
+
+        # The compressed data itself
+        for i in range(numTokens):
+            matchLen = tokenLens[i]
+
+            if matchLen:
+                sym = 0x100 | (matchLen - 3)
+                BitWriter_write(&writer, outData, lengthCodes[sym], lengthCodeLens[sym])
+
+                # The highest bit of the offset is implied by its bit count
+                matchOffs = tokenOffs[i]
+                offsetBits = BitLength(matchOffs)
+                BitWriter_write(&writer, outData, offsetCodes[offsetBits], offsetCodeLens[offsetBits])
+
+                if offsetBits > 1:
+                    BitWriter_write(&writer, outData, matchOffs & ((1 << (offsetBits - 1)) - 1), offsetBits - 1)
+
+            else:
+                sym = tokenOffs[i]
+                BitWriter_write(&writer, outData, lengthCodes[sym], lengthCodeLens[sym])
+
+        if writer.bitStreamLen:
+            outData.append(<u8>(writer.bitStream << (8 - writer.bitStreamLen)))
+
+        outData += bytes(-len(outData) & 3)
+
+        return bytes(outData)
+
+    finally:
+        free(finder.head)
+        free(finder.prev)
+        free(tokenLens)
+        free(tokenOffs)
@@ -0,0 +1,77 @@
+#!/usr/bin/python
+# -*- coding: latin-1 -*-
+
+# Reggie Next - New Super Mario Bros. Wii Level Editor
+# Milestone 4
+# Copyright (C) 2009-2020 Treeki, Tempus, angelsl, JasonP27, Kamek64,
+# MalStar1000, RoadrunnerWMC, AboodXD, John10v10, TheGrop, CLF78,
+# Zementblock, Danster64
+
+# This file is part of Reggie Next.
+
+# Reggie Next is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Reggie Next is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Reggie Next.  If not, see <http://www.gnu.org/licenses/>.
+
+
+
+# tpl_np.py
+# TPL image data decoder using NumPy.
+# Decodes whole images at once instead of pixel by pixel.
+
+
+################################################################
+################################################################
+
+
+import numpy as np
+
+
+def PrepareRGB4A3LUT(hasA):
+    d = np.arange(0x8000, dtype=np.uint32)
+
+    # RGB4A3
+    if hasA:
+        alpha = d >> 12
+        alpha = alpha << 5 | alpha << 2 | alpha >> 1
+    else:
+        alpha = np.uint32(0xFF)
+    red = ((d >> 8) & 0xF) * 17
+    green = ((d >> 4) & 0xF) * 17
+    blue = (d & 0xF) * 17
+    rgb4a3 = blue | (green << 8) | (red << 16) | (alpha << 24)
+
+    # RGB555
+    red = d >> 10
+    red = red << 3 | red >> 2
+    green = (d >> 5) & 0x1F
+    green = green << 3 | green >> 2
+    blue = d & 0x1F
+    blue = blue << 3 | blue >> 2
+    rgb555 = blue | (green << 8) | (red << 16) | 0xFF000000
+
+    return np.concatenate((rgb4a3, rgb555)).astype('<u4')
+
+RGB4A3LUT         = PrepareRGB4A3LUT(True)
+RGB4A3LUT_NoAlpha = PrepareRGB4A3LUT(False)
+
+
+# 'src' must be RGB4A3 raw data
+def decodeRGB4A3(src, width, height, noAlpha):
+    LUT = RGB4A3LUT_NoAlpha if noAlpha else RGB4A3LUT
+
+    # The image is stored as 4x4 pixel blocks, row by row. Look up the colour
+    # of every pixel, then move the pixels of each block to their rows.
+    pixels = LUT[np.frombuffer(src, dtype='>u2', count=width * height)]
+    blocks = pixels.reshape(height // 4, width // 4, 4, 4)
+
+    return blocks.transpose(0, 2, 1, 3).tobytes()
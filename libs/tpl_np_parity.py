@@ -0,0 +1,75 @@
+#!/usr/bin/python
+# -*- coding: latin-1 -*-
+
+# Reggie Next - New Super Mario Bros. Wii Level Editor
+# Milestone 4
+# Copyright (C) 2009-2020 Treeki, Tempus, angelsl, JasonP27, Kamek64,
+# MalStar1000, RoadrunnerWMC, AboodXD, John10v10, TheGrop, CLF78,
+# Zementblock, Danster64
+
+# This file is part of Reggie Next.
+
+# Reggie Next is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Reggie Next is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Reggie Next.  If not, see <http://www.gnu.org/licenses/>.
+
+
+
+
+# tpl_np_parity.py
+# Checks that the NumPy decoder in tpl_np.py gives the same output as the
+# pure Python decoder in tpl.py. Run it from the Reggie folder with:
+#
+#     python -m libs.tpl_np_parity
+
+
+################################################################
+################################################################
+
+
+import os
+import sys
+from importlib import import_module
+
+# Import the modules themselves, since libs replaces 'tpl' with nsmblib
+# wrappers when nsmblib is installed
+tpl = import_module('libs.tpl')
+tpl_np = import_module('libs.tpl_np')
+
+
+# (width, height) of the checked images: a full tileset texture and an
+# animation frame
+Sizes = ((1024, 256), (32, 32))
+
+
+def main():
+    """
+    Decodes random images with both decoders and compares the results
+    """
+    failed = False
+
+    for width, height in Sizes:
+        src = os.urandom(width * height * 2)
+
+        for noAlpha in (False, True):
+            expected = bytes(tpl.decodeRGB4A3(src, width, height, noAlpha))
+            result = bytes(tpl_np.decodeRGB4A3(src, width, height, noAlpha))
+
+            ok = result == expected
+            failed |= not ok
+            print('%dx%d, %s: %s' % (width, height, 'no alpha' if noAlpha else 'alpha', 'OK' if ok else 'MISMATCH'))
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import pickletools
+from collections import OrderedDict
 
 from PyQt6 import QtCore, QtGui, QtWidgets
 
@@ -7,15 +8,125 @@ from levelitems import ListWidgetItem_SortsByOther, PathItem, CommentItem, Sprit
 from ui import setOverrideCursor
 from dirty import SetDirty
 
+class TileChunk:
+    """
+    A cached, rendered chunk of a layer's tiles
+    """
+    __slots__ = ('pixmap', 'animCells', 'animRect', 'animTick')
+
+    def __init__(self, pixmap, animCells, animRect, animTick):
+        self.pixmap = pixmap
+        self.animCells = animCells    # [(tile, x, y)] of the animated tiles, in pixels
+        self.animRect = animRect      # bounding rect of the animated tiles in the scene
+        self.animTick = animTick      # animation tick the animated tiles were painted at
+
+
 class LevelScene(QtWidgets.QGraphicsScene):
     """
     GraphicsScene subclass for the level scene
     """
+    # The tiles are rendered in square chunks of this many tiles, which are
+    # cached as pixmaps until an object overlapping them changes. The cached
+    # pixmaps can use up to TileChunkBudget bytes; if the visible chunks need
+    # more than that, the tiles are drawn without the cache.
+    ChunkSize = 16
+    TileChunkBudget = 192 * 1024 * 1024
 
     def __init__(self, *args):
         QtWidgets.QGraphicsScene.__init__(self, *args)
         self.setBackgroundBrush(QtGui.QBrush(globals_.theme.color('bg')))
 
+        # {(layer, chunk x, chunk y): TileChunk}, least recently used first
+        self.tileChunks = OrderedDict()
+        self.tileChunkBytes = 0
+
+        # Keys of the chunks that contain no objects
+        self.emptyChunks = set()
+
+        # {key: rect of the animated tiles} of the chunks that were drawn
+        # without the cache
+        self.uncachedAnimRects = {}
+
+        # Incremented whenever the animated tiles advance to their next frame
+        self.animationTick = 0
+
+    def helpEvent(self, event):
+        """
+        Creates the tooltips of the items under the mouse that create them only
+        when needed, before Qt looks for a tooltip to show
+        """
+        if event is not None:
+            for item in self.items(event.scenePos()):
+                if getattr(item, 'tooltipOutdated', False):
+                    item.CreateTooltip()
+
+        QtWidgets.QGraphicsScene.helpEvent(self, event)
+
+    def detachItems(self):
+        """
+        Removes all items from the scene without deleting them, so they can be
+        added to the scene again later
+        """
+        for item in self.items():
+            if item.parentItem() is None:
+                self.removeItem(item)
+
+    def invalidateTileChunks(self, rect=None):
+        """
+        Throws away the cached tile chunks that overlap the given rect (in
+        tiles), or all cached chunks if no rect is given
+        """
+        if rect is None:
+            # Sprite images can show tiles as well
+            globals_.SpriteRenderGeneration += 1
+
+            self.tileChunks.clear()
+            self.tileChunkBytes = 0
+            self.emptyChunks.clear()
+            self.uncachedAnimRects.clear()
+            return
+
+        if not self.tileChunks and not self.emptyChunks and not self.uncachedAnimRects:
+            return
+
+        size = self.ChunkSize
+        x1 = int(rect.x()) // size
+        y1 = int(rect.y()) // size
+        x2 = int(rect.x() + rect.width() - 1) // size
+        y2 = int(rect.y() + rect.height() - 1) // size
+
+        drop = self.dropTileChunk
+        for layer in range(3):
+            for cy in range(y1, y2 + 1):
+                for cx in range(x1, x2 + 1):
+                    drop((layer, cx, cy))
+
+    def dropTileChunk(self, key):
+        """
+        Removes a chunk from the cache
+        """
+        self.emptyChunks.discard(key)
+        self.uncachedAnimRects.pop(key, None)
+
+        chunk = self.tileChunks.pop(key, None)
+        if chunk is not None:
+            self.tileChunkBytes -= chunk.pixmap.width() * chunk.pixmap.height() * 4
+
+    def advanceTileAnimations(self):
+        """
+        Schedules a repaint of only the parts of the scene that show animated
+        tiles. The cached chunks repaint their animated tiles when they are
+        drawn next.
+        """
+        self.animationTick += 1
+
+        for chunk in self.tileChunks.values():
+            if chunk.animRect is not None:
+                self.update(chunk.animRect)
+
+        for anim_rect in self.uncachedAnimRects.values():
+            self.update(anim_rect)
+
     def drawBackground(self, painter, rect):
         """
         Draws all visible tiles
@@ -23,89 +134,230 @@ class LevelScene(QtWidgets.QGraphicsScene):
         QtWidgets.QGraphicsScene.drawBackground(self, painter, rect)
         if not hasattr(globals_.Area, 'layers'): return
 
-        drawrect = QtCore.QRectF(rect.x() / 24, rect.y() / 24, rect.width() / 24 + 1, rect.height() / 24 + 1)
-        isect = drawrect.intersects
+        chunk_px = self.ChunkSize * 24
+        x1 = max(0, int(rect.x()) // chunk_px)
+        y1 = max(0, int(rect.y()) // chunk_px)
+        x2 = int(rect.x() + rect.width()) // chunk_px
+        y2 = int(rect.y() + rect.height()) // chunk_px
+
+        show = [globals_.Layer0Shown, globals_.Layer1Shown, globals_.Layer2Shown]
+        layers = [layer_idx for layer_idx in (2, 1, 0) if show[layer_idx]]
 
-        layer0 = []
-        layer1 = []
-        layer2 = []
+        # When the visible chunks don't fit in the cache, caching them would
+        # only throw away the chunks that were just rendered
+        visible_bytes = len(layers) * (x2 - x1 + 1) * (y2 - y1 + 1) * chunk_px * chunk_px * 4
+        if visible_bytes > self.TileChunkBudget:
+            get_chunk = self.getCachedTileChunk
+        else:
+            get_chunk = self.getTileChunk
 
-        x1 = 1024
-        y1 = 512
-        x2 = 0
-        y2 = 0
+        for layer_idx in layers:
+            for cy in range(y1, y2 + 1):
+                for cx in range(x1, x2 + 1):
+                    pixmap = get_chunk(painter, layer_idx, cx, cy)
+                    if pixmap is not None:
+                        painter.drawPixmap(cx * chunk_px, cy * chunk_px, pixmap)
+
+    def getTileChunk(self, painter, layer_idx, cx, cy):
+        """
+        Returns the pixmap of a tile chunk, rendering and caching it if it's
+        not cached. Returns None if the chunk contains no objects.
+        """
+        key = (layer_idx, cx, cy)
+        if key in self.emptyChunks:
+            return None
+
+        chunks = self.tileChunks
+
+        try:
+            chunk = chunks[key]
+        except KeyError:
+            tmap = self.getChunkTileMap(layer_idx, cx, cy)
+            if tmap is None:
+                self.emptyChunks.add(key)
+                return None
+
+            chunk = self.renderTileChunk(layer_idx, cx, cy, tmap)
+            chunks[key] = chunk
+            self.uncachedAnimRects.pop(key, None)
+            self.tileChunkBytes += chunk.pixmap.width() * chunk.pixmap.height() * 4
+
+            while self.tileChunkBytes > self.TileChunkBudget:
+                self.dropTileChunk(next(iter(chunks)))
+        else:
+            chunks.move_to_end(key)
+
+            if chunk.animCells and chunk.animTick != self.animationTick:
+                self.repaintAnimatedTiles(layer_idx, chunk)
+
+        return chunk.pixmap
+
+    def getCachedTileChunk(self, painter, layer_idx, cx, cy):
+        """
+        Returns the pixmap of a tile chunk if it's cached. Otherwise, the chunk
+        is painted directly and None is returned.
+        """
+        key = (layer_idx, cx, cy)
+        if key in self.emptyChunks:
+            return None
+
+        chunk = self.tileChunks.get(key)
+        if chunk is not None:
+            if chunk.animCells and chunk.animTick != self.animationTick:
+                self.repaintAnimatedTiles(layer_idx, chunk)
+
+            return chunk.pixmap
+
+        tmap = self.getChunkTileMap(layer_idx, cx, cy)
+        if tmap is None:
+            self.emptyChunks.add(key)
+            return None
+
+        chunk_px = self.ChunkSize * 24
+
+        painter.save()
+        painter.translate(cx * chunk_px, cy * chunk_px)
+        anim_cells = self.paintTileMap(painter, layer_idx, tmap)
+        painter.restore()
+
+        if anim_cells:
+            self.uncachedAnimRects[key] = self.animatedTilesRect(cx, cy, anim_cells)
+
+        return None
+
+    def repaintAnimatedTiles(self, layer_idx, chunk):
+        """
+        Paints the current frame of the animated tiles of a chunk over the
+        previous one
+        """
+        tiles = globals_.Tiles
+        show_collision = layer_idx == 1
+
+        painter = QtGui.QPainter(chunk.pixmap)
+        for tile, x, y in chunk.animCells:
+            painter.setCompositionMode(QtGui.QPainter.CompositionMode.CompositionMode_Source)
+            painter.fillRect(x, y, 24, 24, QtCore.Qt.GlobalColor.transparent)
+            painter.setCompositionMode(QtGui.QPainter.CompositionMode.CompositionMode_SourceOver)
+            painter.drawPixmap(x, y, tiles[tile].getCurrentTile(show_collision))
+        painter.end()
+
+        chunk.animTick = self.animationTick
+
+    def getChunkTileMap(self, layer_idx, cx, cy):
+        """
+        Returns the tile map of a single chunk of a layer, or None if the chunk
+        contains no objects
+        """
+        size = self.ChunkSize
+        left = cx * size
+        top = cy * size
+        right = left + size
+        bottom = top + size
+
+        odefs = globals_.ObjectDefinitions
+
+        # create the tilemap of this chunk
+        tmap = [[None] * size for _ in range(size)]
+        empty = True
+
+        for item in globals_.Area.object_grids[layer_idx].query(left, top, size, size):
+            empty = False
+
+            # Only look at the part of the object that is inside this chunk
+            objx = item.objx
+            objy = item.objy
+            startx = max(objx, left)
+            endx = min(objx + item.width, right)
+            starty = max(objy, top)
+            endy = min(objy + item.height, bottom)
+
+            rows = [row[startx - objx:endx - objx] for row in item.objdata[starty - objy:endy - objy]]
+            destx = startx - left
+
+            if odefs[item.tileset] is None or \
+                    odefs[item.tileset][item.object_num] is None:
+                # This is an unknown object, so place -1 in the tile map.
+                for i, row in enumerate(rows, starty - top):
+                    destrow = tmap[i]
+                    for j in range(destx, destx + len(row)):
+                        destrow[j] = -1
 
-        # iterate through each object
-        funcs = [layer0.append, layer1.append, layer2.append]
-        show = [globals_.Layer0Shown, globals_.Layer1Shown, globals_.Layer2Shown]
-        for layer, add, process in zip(globals_.Area.layers, funcs, show):
-            if not process:
                 continue
 
-            for item in layer:
-                if not isect(item.LevelRect):
-                    continue
+            # This is not an unkown object, so update the tile map normally.
+            for i, row in enumerate(rows, starty - top):
+                destrow = tmap[i]
+                for j, tile in enumerate(row, destx):
+                    if tile > 0:
+                        destrow[j] = tile
 
-                add(item)
-                x1 = min(x1, item.objx)
-                x2 = max(x2, item.objx + item.width)
-                y1 = min(y1, item.objy)
-                y2 = max(y2, item.objy + item.height)
+        if empty:
+            return None
 
-        width = x2 - x1
-        height = y2 - y1
+        return tmap
 
+    def paintTileMap(self, painter, layer_idx, tmap):
+        """
+        Paints the tiles of a chunk's tile map, and returns the animated tiles
+        as [(tile, x, y)]
+        """
         # Assigning global variables to local variables for performance
         tiles = globals_.Tiles
-        odefs = globals_.ObjectDefinitions
         unkn_tile = globals_.Overrides[globals_.OVERRIDE_UNKNOWN].getCurrentTile()
+        # Only show collisions on layer 1
+        show_collision = layer_idx == 1
+        anim_cells = []
+
+        desty = -24
+        for row in tmap:
+            desty += 24
+            destx = -24
+            for tile in row:
+                destx += 24
+                if tile == -1:
+                    # Draw unknown tiles
+                    painter.drawPixmap(destx, desty, unkn_tile)
+                elif tile is not None:
+                    tile_obj = tiles[tile]
+                    if tile_obj.isAnimated:
+                        anim_cells.append((tile, destx, desty))
+                    painter.drawPixmap(destx, desty, tile_obj.getCurrentTile(show_collision))
+
+        return anim_cells
+
+    def renderTileChunk(self, layer_idx, cx, cy, tmap):
+        """
+        Renders the tile map of a single chunk of a layer into a TileChunk
+        """
+        size = self.ChunkSize
 
-        # create and draw the tilemaps
-        for layer_idx, layer in enumerate([layer2, layer1, layer0]):
-            if not layer:
-                continue
+        pixmap = QtGui.QPixmap(size * 24, size * 24)
+        pixmap.fill(QtCore.Qt.GlobalColor.transparent)
+        painter = QtGui.QPainter(pixmap)
+        anim_cells = self.paintTileMap(painter, layer_idx, tmap)
+        painter.end()
 
-            tmap = [[None] * width for _ in range(height)]
+        if not anim_cells:
+            return TileChunk(pixmap, None, None, self.animationTick)
 
-            for item in layer:
-                startx = item.objx - x1
-                desty = item.objy - y1
+        # Remember where the animated tiles are, so only they are repainted
+        # when they advance to their next frame
+        anim_rect = self.animatedTilesRect(cx, cy, anim_cells)
 
-                if odefs[item.tileset] is None or \
-                        odefs[item.tileset][item.object_num] is None:
-                    # This is an unknown object, so place -1 in the tile map.
-                    for i, row in enumerate(item.objdata, desty):
-                        destrow = tmap[i]
-                        for j in range(startx, startx + len(row)):
-                            destrow[j] = -1
+        return TileChunk(pixmap, anim_cells, anim_rect, self.animationTick)
 
-                    continue
+    def animatedTilesRect(self, cx, cy, anim_cells):
+        """
+        Returns the bounding rect of the animated tiles of a chunk in the scene
+        """
+        chunk_x = cx * self.ChunkSize * 24
+        chunk_y = cy * self.ChunkSize * 24
 
-                # This is not an unkown object, so update the tile map normally.
-                for i, row in enumerate(item.objdata, desty):
-                    destrow = tmap[i]
-                    for j, tile in enumerate(row, startx):
-                        if tile > 0:
-                            destrow[j] = tile
-
-            painter.save()
-            painter.translate(x1 * 24, y1 * 24)
-
-            desty = -24
-            for row in tmap:
-                desty += 24
-                destx = -24
-                for tile in row:
-                    destx += 24
-                    if tile == -1:
-                        # Draw unknown tiles
-                        painter.drawPixmap(destx, desty, unkn_tile)
-                    elif tile is not None:
-                        # Only show collisions on layer 1 (i.e. layer_idx == 1)
-                        pixmap = tiles[tile].getCurrentTile(layer_idx == 1)
-                        painter.drawPixmap(destx, desty, pixmap)
-
-            painter.restore()
+        anim_rect = QtCore.QRectF()
+        for _, x, y in anim_cells:
+            anim_rect = anim_rect.united(QtCore.QRectF(chunk_x + x, chunk_y + y, 24, 24))
+
+        return anim_rect
 
     def getMainWindow(self):
         return globals_.mainWindow
@@ -296,7 +548,7 @@ class LevelViewWidget(QtWidgets.QGraphicsView):
 
                 stamp = globals_.mainWindow.stampChooser.currentlySelectedStamp()
                 if stamp is not None:
-                    objs = globals_.mainWindow.placeEncodedObjects(stamp.ReggieClip, False, clickedx, clickedy)
+                    objs = globals_.mainWindow.placeEncodedObjects(stamp.clip, False, clickedx, clickedy)
 
                     for obj in objs:
                         obj.dragstartx = obj.objx
@@ -0,0 +1,182 @@
+"""
+Phase timing for Reggie's startup. Enabled with --profile-startup; see
+ParseArgs for the options. Phases can be nested, and a phase can be split
+into steps with Step. When the profiler is not enabled, all functions
+return immediately.
+"""
+
+import json
+import os
+import platform
+import sys
+import time
+
+Enabled = False
+ReportPath = None
+CProfilePath = None
+
+# Timed phases and steps as [name, depth, start, duration], in start order
+Records = []
+
+_stack = []  # open records and whether they are steps
+_profile = None
+_startTime = 0.0
+
+DefaultReportPath = 'startup_profile.json'
+DefaultCProfilePath = 'startup_profile.prof'
+
+
+def ParseArgs(argv):
+    """
+    Removes the profiler options from 'argv' and starts the profiler if any
+    were given. The options are:
+
+        --profile-startup[=report.json]   time the startup phases
+        --profile-cprofile[=stats.prof]   also dump cProfile stats
+    """
+    report_path = cprofile_path = None
+
+    for arg in argv[1:]:
+        name, _, value = arg.partition('=')
+
+        if name == '--profile-startup':
+            report_path = value or DefaultReportPath
+        elif name == '--profile-cprofile':
+            cprofile_path = value or DefaultCProfilePath
+        else:
+            continue
+
+        argv.remove(arg)
+
+    if report_path is None and cprofile_path is None:
+        return
+
+    Start(report_path or DefaultReportPath, cprofile_path)
+
+
+def Start(report_path, cprofile_path=None):
+    """
+    Enables the profiler
+    """
+    global Enabled, ReportPath, CProfilePath, _profile, _startTime
+
+    Enabled = True
+    ReportPath = os.path.abspath(report_path)
+    CProfilePath = os.path.abspath(cprofile_path) if cprofile_path else None
+
+    Records.clear()
+    _stack.clear()
+    _startTime = time.perf_counter()
+
+    if CProfilePath is not None:
+        import cProfile
+        _profile = cProfile.Profile()
+        _profile.enable()
+
+
+def Begin(name, step=False):
+    """
+    Starts a phase
+    """
+    if not Enabled:
+        return
+
+    record = [name, len(_stack), time.perf_counter() - _startTime, None]
+    Records.append(record)
+    _stack.append((record, step))
+
+
+def End():
+    """
+    Ends the innermost phase, including its current step
+    """
+    if not Enabled or not _stack:
+        return
+
+    now = time.perf_counter() - _startTime
+
+    while _stack:
+        record, step = _stack.pop()
+        record[3] = now - record[2]
+
+        if not step:
+            break
+
+
+def Step(name):
+    """
+    Ends the current step of the innermost phase and starts the next one
+    """
+    if not Enabled:
+        return
+
+    if _stack and _stack[-1][1]:
+        record, _ = _stack.pop()
+        record[3] = time.perf_counter() - _startTime - record[2]
+
+    Begin(name, True)
+
+
+class Phase:
+    """
+    Context manager that times a phase
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        Begin(self.name)
+        return self
+
+    def __exit__(self, *exc_info):
+        End()
+
+
+def Finish(**info):
+    """
+    Ends all phases, writes the JSON report (and the cProfile stats), prints
+    a summary and disables the profiler. Keyword arguments are added to the
+    report.
+    """
+    global Enabled, _profile
+
+    if not Enabled:
+        return
+
+    if _profile is not None:
+        _profile.disable()
+        _profile.dump_stats(CProfilePath)
+        _profile = None
+
+    while _stack:
+        End()
+
+    total = time.perf_counter() - _startTime
+    Enabled = False
+
+    report = {
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'total': round(total, 6),
+        **info,
+        'phases': [
+            {'name': name, 'depth': depth, 'start': round(start, 6), 'duration': round(duration, 6)}
+            for name, depth, start, duration in Records
+        ],
+    }
+
+    try:
+        with open(ReportPath, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    except OSError as e:
+        print(f'[Warning] Could not write the startup profile ({e})')
+
+    print('Startup profile:')
+    for name, depth, _, duration in Records:
+        print(f'  {duration * 1000:9.1f} ms  {"  " * depth}{name}')
+    print(f'  {total * 1000:9.1f} ms  total')
+    print(f'Report written to {ReportPath}')
+
+    if CProfilePath is not None:
+        print(f'cProfile stats written to {CProfilePath}')
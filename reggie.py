@@ -78,11 +78,13 @@ for v, c in zip(version, pqt_min):
 
 # Local imports
 from src.data.common import archive
+from src.data.common.clipboard import ClipData, ClipMimeType, ClipToText, DecodeClip, EncodeClip, TextToClip
 import sprites
 import spritelib as SLib
 from sprites_common import LoadBasics
 
 import globals_
+import profiler
 
 ################################################################################
 ################################################################################
@@ -96,8 +98,8 @@ from misc import FilesAreMissing, module_path, IsNSMBLevel, SetGamePaths, areVal
 from misc2 import LevelScene, LevelViewWidget
 from dirty import setting, setSetting, SetDirty
 from gamedef import LoadGameDef
-from levelitems import LocationItem, ZoneItem, ObjectItem, SpriteItem, EntranceItem, ListWidgetItem_SortsByOther, PathItem, CommentItem, PathEditorLineItem, Path
-from src.data.common.loaders import UnloadTileset, LoadTileset, LoadOverrides
+from levelitems import ClearSpriteRenders, LocationItem, ZoneItem, ObjectItem, SpriteItem, EntranceItem, ListWidgetItem_SortsByOther, PathItem, CommentItem, PathEditorLineItem, Path
+from src.data.common.loaders import UnloadTileset, LoadTilesets, LoadOverrides, TilesetSignals
 from src.data.level.nsmbw_level import NSMBWLevel
 from src.data.stamp.stamp import Stamp
 from src.ui.widgets.sidelists.stamp_chooser import StampChooserWidget
@@ -301,12 +303,15 @@ class ReggieWindow(QtWidgets.QMainWindow):
         self.AutosaveTimer.start(20000)
 
         # Set up actions and menus
+        profiler.Step('SetupActionsAndMenus')
         self.SetupActionsAndMenus()
 
         # Set up the status bar
         self.setup_status_bar()
+        TilesetSignals.progress.connect(self.HandleTilesetProgress)
 
         # Create the various panels
+        profiler.Step('SetupDocksAndPanels')
         self.SetupDocksAndPanels()
 
         # Add menu action for the toolbar
@@ -325,6 +330,7 @@ class ReggieWindow(QtWidgets.QMainWindow):
         self.action_list['toolbar'] = act
 
         # now get stuff ready
+        profiler.Step('LoadLevel')
         loaded = False
         self.fileSavePath = None
 
@@ -1496,17 +1502,31 @@ class ReggieWindow(QtWidgets.QMainWindow):
         if clipboard is None:
             return
 
-        clip = clipboard.text()
-        if clip is not None and clip != '':
-            clip = str(clip).strip()
+        mime = clipboard.mimeData()
+        clip = None
 
-            if clip.startswith('ReggieClip|') and clip.endswith('|%'):
-                self.clipboard = clip.replace(' ', '').replace('\n', '').replace('\r', '').replace('\t', '')
+        if mime is not None:
+            if mime.hasFormat(ClipMimeType):
+                clip = DecodeClip(mime.data(ClipMimeType).data())
 
-                self.action_list['paste'].setEnabled(True)
-            else:
-                self.clipboard = None
-                self.action_list['paste'].setEnabled(False)
+            if clip is None and mime.hasText():
+                clip = TextToClip(mime.text())
+
+        self.clipboard = clip
+        self.action_list['paste'].setEnabled(clip is not None)
+
+    def SetClipboardData(self, clip):
+        """
+        Puts a ClipData on the system clipboard, in the binary and in the text
+        format
+        """
+        if self.systemClipboard is None:
+            return
+
+        mime = QtCore.QMimeData()
+        mime.setData(ClipMimeType, QtCore.QByteArray(EncodeClip(clip)))
+        mime.setText(ClipToText(clip))
+        self.systemClipboard.setMimeData(mime)
 
     def XScrollChange(self, pos):
         """
@@ -1640,7 +1660,7 @@ class ReggieWindow(QtWidgets.QMainWindow):
         """
         Handles the "Add Stamp" btn being clicked
         """
-        # Create a ReggieClip
+        # Create a clip
         selitems = self.scene.selectedItems()
         if not selitems: return
         clipboard_o = []
@@ -1666,7 +1686,7 @@ class ReggieWindow(QtWidgets.QMainWindow):
         if stamp is None or self.systemClipboard is None:
             return
 
-        self.systemClipboard.setText(stamp.ReggieClip)
+        self.SetClipboardData(stamp.clip)
 
     def handleStampsRemove(self):
         """
@@ -1695,11 +1715,12 @@ class ReggieWindow(QtWidgets.QMainWindow):
             try:
                 # Get data
                 name = filesplit[i]
-                rc = filesplit[i + 1]
+                clip = TextToClip(filesplit[i + 1])
             except IndexError:
                 break
 
-            self.stampChooser.addStamp(Stamp(rc, name))
+            if clip is not None:
+                self.stampChooser.addStamp(Stamp(clip, name))
 
     def handleStampsSave(self):
         """
@@ -1715,10 +1736,10 @@ class ReggieWindow(QtWidgets.QMainWindow):
         newdata += 'stamps\n'
         newdata += '------\n'
 
-        for stampobj in self.stampChooser.model.items:
+        for stampobj in self.stampChooser.model().items:
             newdata += '\n'
             newdata += stampobj.Name + '\n'
-            newdata += stampobj.ReggieClip + '\n'
+            newdata += ClipToText(stampobj.clip) + '\n'
 
         with open(fn, 'w', encoding='utf-8') as f:
             f.write(newdata)
@@ -1896,8 +1917,7 @@ class ReggieWindow(QtWidgets.QMainWindow):
                     self.action_list['cut'].setEnabled(False)
                 self.action_list['paste'].setEnabled(True)
                 self.clipboard = self.encodeObjects(clipboard_o, clipboard_s, clipboard_e, clipboard_l, clipboard_p)
-                if self.systemClipboard is not None:
-                    self.systemClipboard.setText(self.clipboard)
+                self.SetClipboardData(self.clipboard)
 
         if cutAction:
             self.level_overview.update()
@@ -1944,40 +1964,37 @@ class ReggieWindow(QtWidgets.QMainWindow):
 
     def encodeObjects(self, clipboard_o, clipboard_s, clipboard_e=None, clipboard_l=None, clipboard_p=None):
         """
-        Encode a set of level items into a string
+        Encode a set of level items into a ClipData
         """
-        convclip = ['ReggieClip']
+        clip = ClipData()
 
         # Objects
         clipboard_o.sort(key=lambda x: x.zValue())
 
         for item in clipboard_o:
-            convclip.append('0:%d:%d:%d:%d:%d:%d:%d' % (
-            item.tileset, item.object_num, item.layer, item.objx, item.objy, item.width, item.height))
+            clip.objects.append((item.tileset, item.object_num, item.layer, item.objx, item.objy, item.width, item.height))
 
-        # Sprites
+        # Sprites (the 7th byte of the sprite data is not copied)
         for item in clipboard_s:
             data = item.spritedata
-            convclip.append('1:%d:%d:%d:%d:%d:%d:%d:%d:%d:%d' % (
-            item.sprite_num, item.objx, item.objy, data[0], data[1], data[2], data[3], data[4], data[5], data[7]))
+            clip.sprites.append((item.sprite_num, item.objx, item.objy, bytes(data[:6]) + b'\0' + bytes(data[7:8])))
 
         # Entrances
         if clipboard_e is not None:
             for item in clipboard_e:
-                convclip.append('2:%d:%d:%d:%d:%d:%d:%d:%d:%d:%d:%d:%d' % (
-                item.objx, item.objy, item.entid, item.destarea, item.destentrance, item.enttype, item.entzone,
-                item.entsettings, item.entlayer, item.entpath, item.leave_level, item.cpdirection))
+                clip.entrances.append((
+                    item.objx, item.objy, item.entid, item.destarea, item.destentrance, item.enttype, item.entzone,
+                    item.entsettings, item.entlayer, item.entpath, item.leave_level, item.cpdirection))
 
         # Locations
         if clipboard_l is not None:
             for item in clipboard_l:
-                convclip.append('3:%d:%d:%d:%d:%d' % (
-                item.id, item.objx, item.objy, item.width, item.height))
+                clip.locations.append((item.id, int(item.objx), int(item.objy), int(item.width), int(item.height)))
 
         # Path Nodes
         if clipboard_p is not None:
             clipboard_p.sort(key=lambda x: (x.pathid, x.nodeid))
-            currPathID = 0
+            currPathID = None
 
             for item in clipboard_p:
                 # Get parent path
@@ -1990,34 +2007,31 @@ class ReggieWindow(QtWidgets.QMainWindow):
                 # Append a path object
                 if path is not None:
                     if currPathID != item.pathid:
-                        convclip.append('4:%d:%d' % (path._id, path._loops))
+                        clip.paths.append((path._id, path._loops))
                         currPathID = item.pathid
 
                     x, y, speed, accel, delay = path.get_node_data(item.nodeid)
-                    convclip.append('5:%d:%d:%d:%d:%f:%f:%d' % (
-                    item.pathid, item.nodeid, x, y, speed, accel, delay))
+                    clip.nodes.append((item.pathid, item.nodeid, x, y, speed, accel, delay))
 
-        convclip.append('%')
-        return '|'.join(convclip)
+        return clip
 
-    def placeEncodedObjects(self, encoded, select=True, xOverride=None, yOverride=None):
+    def placeEncodedObjects(self, clip, select=True, xOverride=None, yOverride=None):
         """
-        Decode and place a set of objects
+        Decode and place a set of objects from a ClipData (or a ReggieClip
+        string)
         """
         self.SelectionUpdateFlag = True
         self.scene.clearSelection()
         added = []
 
-        # Remove leading and trailing whitespace
-        encoded = encoded.strip()
+        if isinstance(clip, str):
+            clip = TextToClip(clip)
 
-        if not (encoded.startswith('ReggieClip|') and encoded.endswith('|%')):
+        if clip is None:
             self.SelectionUpdateFlag = False
             return added
 
-        clip = encoded.split('|')
-
-        if len(clip) > 300 + 2:
+        if len(clip) > 300:
             result = QtWidgets.QMessageBox.warning(self, 'Reggie', globals_.trans.string('MainWindow', 1),
                                                    QtWidgets.QMessageBox.StandardButton.Yes, QtWidgets.QMessageBox.StandardButton.No)
             if result == QtWidgets.QMessageBox.StandardButton.No:
@@ -2026,7 +2040,9 @@ class ReggieWindow(QtWidgets.QMainWindow):
 
         globals_.OverrideSnapping = True
 
-        layers, sprites, entrances, locations, paths, path_nodes = self.getEncodedObjects(encoded)
+        # The items are moved into place before they are added to the level, so
+        # the scene and the level only need to be updated once
+        layers, sprites, entrances, locations, paths, path_nodes = self.getEncodedObjects(clip, False)
 
         # Find the bounding box of all created objects
         bounding = QtCore.QRectF()
@@ -2070,31 +2086,67 @@ class ReggieWindow(QtWidgets.QMainWindow):
             yoffset = int(0 - y1 + (yOverride / 16) - (height / 2))
             ypixeloffset = yoffset * 16
 
-        # Center and select everything
+        # Center everything. Items that are not in a scene don't clamp their
+        # positions themselves, so that is done here.
+        globals_.DirtyOverride += 1
+
         for item in sprites:
-            item.setNewObjPos(item.objx + xpixeloffset, item.objy + ypixeloffset)
+            item.setNewObjPos(clamp(item.objx + xpixeloffset, 0, 16368), clamp(item.objy + ypixeloffset, 0, 8176))
             item.UpdateRects()
-            if select: item.setSelected(True)
 
         for layer in layers:
             for item in layer:
-                item.setPos((item.objx + xoffset) * 24, (item.objy + yoffset) * 24)
-                item.UpdateRects()
-                if select: item.setSelected(True)
+                item.objx = clamp(item.objx + xoffset, 0, 1024)
+                item.objy = clamp(item.objy + yoffset, 0, 512)
+                item.setPos(item.objx * 24, item.objy * 24)
+                item.LevelRect.moveTo(item.objx, item.objy)
 
         for item in entrances:
             item.setPos((item.objx + xpixeloffset) * 1.5, (item.objy + ypixeloffset) * 1.5)
             item.UpdateRects()
-            if select: item.setSelected(True)
 
         for item in locations:
             item.setPos((item.objx + xpixeloffset) * 1.5, (item.objy + ypixeloffset) * 1.5)
             item.UpdateRects()
-            if select: item.setSelected(True)
 
         for item in path_nodes:
             item.setPos((item.objx + xpixeloffset) * 1.5, (item.objy + ypixeloffset) * 1.5)
-            if select: item.setSelected(True)
+            item.path.node_moved(item)
+
+        globals_.DirtyOverride -= 1
+
+        # Add everything to the level in one batch
+        for layer in layers:
+            for item in layer:
+                self.AddObject(item)
+
+        self.spriteList.prepareBatchAdd()
+        for item in sprites:
+            self.AddSprite(item)
+            item.ImageObj.positionChanged()
+        self.spriteList.endBatchAdd()
+
+        for item in entrances:
+            self.AddEntrance(item)
+
+        for item in locations:
+            self.AddLocation(item)
+
+        for path in paths:
+            globals_.Area.paths.append(path)
+            path.add_to_scene()
+            path.add_to_list()
+
+        # Combine the sprites and layers
+        added = sprites + entrances + locations + path_nodes
+        for layer in layers:
+            added += layer
+
+        if select:
+            for item in added:
+                item.setSelected(True)
+
+        added += paths
 
         globals_.OverrideSnapping = False
 
@@ -2103,16 +2155,11 @@ class ReggieWindow(QtWidgets.QMainWindow):
         self.SelectionUpdateFlag = False
         self.ChangeSelectionHandler()
 
-        # Combine the sprites and layers
-        added = sprites + entrances + locations + paths + path_nodes
-        for layer in layers:
-            added += layer
-
         return added
 
-    def getEncodedObjects(self, encoded, add_to_scene=True):
+    def getEncodedObjects(self, clip, add_to_scene=True):
         """
-        Create the objects from a ReggieClip
+        Create the objects from a ClipData (or a ReggieClip string)
         """
 
         layers = ([], [], [])
@@ -2122,161 +2169,101 @@ class ReggieWindow(QtWidgets.QMainWindow):
         paths = []
         path_nodes = []
 
-        if not (encoded.startswith('ReggieClip|') and encoded.endswith('|%')):
+        if isinstance(clip, str):
+            clip = TextToClip(clip)
+
+        if clip is None:
             return layers, sprites, entrances, locations, paths, path_nodes
 
-        clip = encoded[11:-2].split('|')
+        # Objects
+        for tileset, type, layer, objx, objy, width, height in clip.objects:
+            # basic sanity checks
+            if tileset < 0 or tileset > 3: continue
+            if type < 0 or type > 255: continue
+            if layer < 0 or layer > 2: continue
+            if objx < 0 or objx > 1023: continue
+            if objy < 0 or objy > 511: continue
+            if width < 1 or width > 1023: continue
+            if height < 1 or height > 511: continue
 
-        self.spriteList.prepareBatchAdd()
-        for item in clip:
+            newitem = self.CreateObject(tileset, type, layer, objx, objy, width, height, add_to_scene)
 
-            try:
-                # Check to see the item type
-                # and add it to the correct stack
-                split = item.split(':')
-
-                # Object
-                if split[0] == '0':
-                    if len(split) != 8: continue
-
-                    tileset = int(split[1])
-                    type = int(split[2])
-                    layer = int(split[3])
-                    objx = int(split[4])
-                    objy = int(split[5])
-                    width = int(split[6])
-                    height = int(split[7])
-
-                    # basic sanity checks
-                    if tileset < 0 or tileset > 3: continue
-                    if type < 0 or type > 255: continue
-                    if layer < 0 or layer > 2: continue
-                    if objx < 0 or objx > 1023: continue
-                    if objy < 0 or objy > 511: continue
-                    if width < 1 or width > 1023: continue
-                    if height < 1 or height > 511: continue
-
-                    newitem = self.CreateObject(tileset, type, layer, objx, objy, width, height, add_to_scene)
-
-                    layers[layer].append(newitem)
-
-                # Sprite
-                elif split[0] == '1':
-                    if len(split) != 11: continue
-
-                    objx = int(split[2])
-                    objy = int(split[3])
-                    type = int(split[1])
-                    data = bytes(map(int, [split[4], split[5], split[6], split[7], split[8], split[9], '0', split[10]]))
-
-                    # Check if sprite data exists for this type
-                    if not (0 <= type < globals_.NumSprites) or globals_.Sprites[type] is None:
-                        # Unknown sprite, skip it
-                        continue
-
-                    newitem = self.CreateSprite(objx, objy, type, data, add_to_scene)
-                    sprites.append(newitem)
-
-                # Entrance
-                elif split[0] == '2':
-                    if len(split) != 13: continue
-
-                    objx = int(split[1])
-                    objy = int(split[2])
-                    entID = int(split[3])
-                    destArea = int(split[4])
-                    destEnt = int(split[5])
-                    entType = int(split[6])
-                    zone = int(split[7])
-                    settings = int(split[8])
-                    layer = int(split[9])
-                    path = int(split[10])
-                    exitLvl = int(split[11])
-                    cPipeDir = int(split[12])
-
-                    # Sanity check data
-                    if destArea < 0 or destArea > 4: print(destArea); continue
-                    if destEnt < 0 or destEnt > 255: print(destEnt); continue
-                    if entType < 0 or entType >= len(globals_.EntranceTypeNames): print(entType); continue
-                    if layer < 0 or layer > 2: print(layer); continue
-                    if path < 0 or path > 255: print(path); continue
-                    if cPipeDir < 0 or cPipeDir > 3: print(cPipeDir); continue
-
-                    newitem = self.CreateEntrance(objx, objy, entID, add_to_scene, True)
-                    if newitem is None:
-                        continue
-
-                    # Set entrance data
-                    newitem.destarea = destArea
-                    newitem.destentrance = destEnt
-                    newitem.enttype = entType
-                    newitem.entzone = zone
-                    newitem.entsettings = settings
-                    newitem.entlayer = layer
-                    newitem.entpath = path
-                    newitem.leave_level = exitLvl != 0
-                    newitem.cpdirection = cPipeDir
-
-                    # Update it
-                    newitem.TypeChange()
-                    newitem.UpdateTooltip()
-                    newitem.UpdateListItem(True)
-
-                    entrances.append(newitem)
-
-                # Location
-                elif split[0] == '3':
-                    if len(split) != 6: continue
-
-                    locID = int(split[1])
-                    objx = int(split[2])
-                    objy = int(split[3])
-                    width = int(split[4])
-                    height = int(split[5])
-
-                    newitem = self.CreateLocation(objx, objy, width, height, locID, add_to_scene)
-                    locations.append(newitem)
-
-                # Path
-                elif split[0] == '4':
-                    if len(split) != 3: continue
-
-                    pathID = int(split[1])
-                    loops = bool(split[2])
-
-                    if globals_.mainWindow is not None:
-                        path = Path(pathID, globals_.mainWindow.scene, loops)
-                        globals_.Area.paths.append(path)
-                        paths.append(path)
-
-                # Path Node
-                elif split[0] == '5':
-                    if len(split) != 8: continue
-
-                    pathID = int(split[1])
-                    nodeID = int(split[2])
-                    objx = int(split[3])
-                    objy = int(split[4])
-                    speed = float(split[5])
-                    accel = float(split[6])
-                    delay = int(split[7])
-
-                    # Make sure the clip has the parent path
-                    if paths is not None:
-                        path = paths[0]
-                        for p in paths:
-                            if pathID == p._id:
-                                path = p
-                                break
-
-                        node = path.add_node(objx, objy, speed, accel, delay, nodeID, add_to_scene, add_to_scene)
-                        path_nodes.append(node)
-
-            except ValueError:
-                # an int() probably failed somewhere
-                pass
+            layers[layer].append(newitem)
 
-        self.spriteList.endBatchAdd()
+        # Sprites
+        if add_to_scene:
+            self.spriteList.prepareBatchAdd()
+
+        for type, objx, objy, data in clip.sprites:
+            # Check if sprite data exists for this type
+            if not (0 <= type < globals_.NumSprites) or globals_.Sprites[type] is None:
+                # Unknown sprite, skip it
+                continue
+
+            newitem = self.CreateSprite(objx, objy, type, data, add_to_scene)
+            sprites.append(newitem)
+
+        if add_to_scene:
+            self.spriteList.endBatchAdd()
+
+        # Entrances
+        for objx, objy, entID, destArea, destEnt, entType, zone, settings, layer, path, exitLvl, cPipeDir in clip.entrances:
+            # Sanity check data
+            if destArea < 0 or destArea > 4: continue
+            if destEnt < 0 or destEnt > 255: continue
+            if entType < 0 or entType >= len(globals_.EntranceTypeNames): continue
+            if layer < 0 or layer > 2: continue
+            if path < 0 or path > 255: continue
+            if cPipeDir < 0 or cPipeDir > 3: continue
+
+            newitem = self.CreateEntrance(objx, objy, entID, add_to_scene, True)
+            if newitem is None:
+                continue
+
+            # Set entrance data
+            newitem.destarea = destArea
+            newitem.destentrance = destEnt
+            newitem.enttype = entType
+            newitem.entzone = zone
+            newitem.entsettings = settings
+            newitem.entlayer = layer
+            newitem.entpath = path
+            newitem.leave_level = exitLvl != 0
+            newitem.cpdirection = cPipeDir
+
+            # Update it
+            newitem.TypeChange()
+            newitem.UpdateTooltip()
+            newitem.UpdateListItem(True)
+
+            entrances.append(newitem)
+
+        # Locations
+        for locID, objx, objy, width, height in clip.locations:
+            newitem = self.CreateLocation(objx, objy, width, height, locID, add_to_scene)
+            locations.append(newitem)
+
+        # Paths
+        for pathID, loops in clip.paths:
+            path = Path(pathID, self.scene, loops != 0)
+            if add_to_scene:
+                globals_.Area.paths.append(path)
+            paths.append(path)
+
+        # Path Nodes
+        for pathID, nodeID, objx, objy, speed, accel, delay in clip.nodes:
+            # Make sure the clip has the parent path
+            if not paths:
+                break
+
+            path = paths[0]
+            for p in paths:
+                if pathID == p._id:
+                    path = p
+                    break
+
+            node = path.add_node(objx, objy, speed, accel, delay, nodeID, add_to_scene, add_to_scene)
+            path_nodes.append(node)
 
         return layers, sprites, entrances, locations, paths, path_nodes
 
@@ -2450,17 +2437,24 @@ class ReggieWindow(QtWidgets.QMainWindow):
         loc.listitem = ListWidgetItem_SortsByOther(loc)
 
         if add_to_scene:
-            self.locationList.addItem(loc.listitem)
-            self.scene.addItem(loc)
-            globals_.Area.locations.append(loc)
-
-            loc.UpdateListItem()
+            self.AddLocation(loc)
 
             # We've changed the level, so set the dirty flag
             SetDirty()
 
         return loc
 
+    def AddLocation(self, loc):
+        """
+        Adds a location that was created with 'add_to_scene' set to False to the
+        level. Does not set the dirty flag.
+        """
+        self.locationList.addItem(loc.listitem)
+        self.scene.addItem(loc)
+        globals_.Area.locations.append(loc)
+
+        loc.UpdateListItem()
+
     def CreateObject(self, tileset: int, object_num: int, layer: int, x: int, y: int,
                      width: int = 0, height: int = 0, add_to_scene = True):
         """
@@ -2488,14 +2482,25 @@ class ReggieWindow(QtWidgets.QMainWindow):
         obj = ObjectItem(tileset, object_num, layer, x, y, width, height, z)
 
         if add_to_scene:
-            layer_list.append(obj)
-            obj.positionChanged = self.HandleObjPosChange
-            self.scene.addItem(obj)
+            self.AddObject(obj)
 
             SetDirty()
 
         return obj
 
+    def AddObject(self, obj):
+        """
+        Adds an object that was created with 'add_to_scene' set to False to the
+        end of its layer. Does not set the dirty flag.
+        """
+        layer_list = globals_.Area.layers[obj.layer]
+        if layer_list:
+            obj.setZValue(layer_list[-1].zValue() + 1)
+
+        globals_.Area.AddToLayer(obj)
+        obj.positionChanged = self.HandleObjPosChange
+        self.scene.addItem(obj)
+
     def CreateEntrance(self, x, y, id_ = None, add_to_scene = True, allow_dupe_id = False):
         """
         Creates and returns a new entrance and makes sure it's added to the
@@ -2520,18 +2525,25 @@ class ReggieWindow(QtWidgets.QMainWindow):
         ent.listitem = ListWidgetItem_SortsByOther(ent)
 
         if add_to_scene:
-            # If it's the first available ID, all the other indices should match, so
-            # we can just use the ID to insert.
-            self.entranceList.insertItem(id_, ent.listitem)
-            globals_.Area.entrances.insert(id_, ent)
-
-            self.scene.addItem(ent)
-            ent.UpdateListItem()
+            self.AddEntrance(ent)
 
             SetDirty()
 
         return ent
 
+    def AddEntrance(self, ent):
+        """
+        Adds an entrance that was created with 'add_to_scene' set to False to the
+        level. Does not set the dirty flag.
+        """
+        # If it's the first available ID, all the other indices should match, so
+        # we can just use the ID to insert.
+        self.entranceList.insertItem(ent.entid, ent.listitem)
+        globals_.Area.entrances.insert(ent.entid, ent)
+
+        self.scene.addItem(ent)
+        ent.UpdateListItem()
+
     def CreateSprite(self, x, y, id_ = None, data = None, add_to_scene = True):
         """
         Creates and returns a new sprite and makes sure it's added to the right
@@ -2561,41 +2573,49 @@ class ReggieWindow(QtWidgets.QMainWindow):
                 # Unknown sprite, don't create
                 return
 
-            self.spriteList.addSprite(spr)
-            globals_.Area.sprites.append(spr)
+            self.AddSprite(spr)
 
-            # Add the ids for the idtype count
-            decoder = PropertyDecoder(SpriteField())
-            sdef = globals_.Sprites[id_]
+            SetDirty()
 
-            # Find what values are used by this sprite
-            for field in sdef.fields:
-                if not isinstance(field, (ListSpriteField, ValueSpriteField)):
-                    # Only values and lists can be idtypes
-                    continue
+        return spr
 
-                idtype = field.idtype
-                if idtype is None:
-                    # Only look at settings with idtypes
-                    continue
+    def AddSprite(self, spr):
+        """
+        Adds a sprite that was created with 'add_to_scene' set to False to the
+        level. The sprite data for its id has to exist. Does not set the dirty
+        flag.
+        """
+        self.spriteList.addSprite(spr)
+        globals_.Area.sprites.append(spr)
 
-                value = decoder.retrieve(data, field.bit)
+        # Add the ids for the idtype count
+        decoder = PropertyDecoder(SpriteField())
+        sdef = globals_.Sprites[spr.sprite_num]
 
-                # 3. Add the value to self.sprite_idtypes
-                try:
-                    counter = globals_.Area.sprite_idtypes[idtype]
-                except KeyError:
-                    globals_.Area.sprite_idtypes[idtype] = {value: 1}
-                    continue
+        # Find what values are used by this sprite
+        for field in sdef.fields:
+            if not isinstance(field, (ListSpriteField, ValueSpriteField)):
+                # Only values and lists can be idtypes
+                continue
 
-                counter[value] = counter.get(value, 0) + 1
+            idtype = field.idtype
+            if idtype is None:
+                # Only look at settings with idtypes
+                continue
 
-            self.scene.addItem(spr)
-            spr.UpdateListItem()
+            value = decoder.retrieve(spr.spritedata, field.bit)
 
-            SetDirty()
+            # 3. Add the value to self.sprite_idtypes
+            try:
+                counter = globals_.Area.sprite_idtypes[idtype]
+            except KeyError:
+                globals_.Area.sprite_idtypes[idtype] = {value: 1}
+                continue
 
-        return spr
+            counter[value] = counter.get(value, 0) + 1
+
+        self.scene.addItem(spr)
+        spr.UpdateListItem()
 
     def CreateZone(self, x, y, width = 408, height = 224, id_ = None, add_to_scene = True):
         """
@@ -3006,7 +3026,7 @@ class ReggieWindow(QtWidgets.QMainWindow):
         """
         Save a level back to the archive. Returns whether saving was successful.
         """
-        if not self.fileSavePath or self.fileSavePath.endswith('.arc.LH'):
+        if not self.fileSavePath:
             # Delegate save to HandleSaveAs function
             return self.HandleSaveAs()
 
@@ -3028,6 +3048,9 @@ class ReggieWindow(QtWidgets.QMainWindow):
 
             data = compressed
 
+        elif self.fileSavePath.endswith(".arc.LH"):
+            data = lh.CompressLH(data)
+
         # maybe pad with null bytes
         if globals_.EnablePadding:
             pad_length = globals_.PaddingLength - len(data)
@@ -3065,6 +3088,7 @@ class ReggieWindow(QtWidgets.QMainWindow):
             '',
             globals_.trans.string('FileDlgs', 1) + ' (*' + '.arc' + ');;' +
             globals_.trans.string('FileDlgs', 10) + ' (*' + '.arc.LZ'+ ');;' +
+            globals_.trans.string('FileDlgs', 5) + ' (*' + '.arc.LH'+ ');;' +
             globals_.trans.string('FileDlgs', 2) + ' (*)'
         )[0]
 
@@ -3098,6 +3122,9 @@ class ReggieWindow(QtWidgets.QMainWindow):
 
             data = compressed
 
+        elif fn.endswith(".arc.LH"):
+            data = lh.CompressLH(data)
+
         # maybe pad with null bytes
         if globals_.EnablePadding:
             pad_length = globals_.PaddingLength - len(data)
@@ -3200,9 +3227,10 @@ class ReggieWindow(QtWidgets.QMainWindow):
         """
         globals_.TilesetsAnimating = checked
 
-        for tile in globals_.Tiles:
-            if tile is not None: tile.resetAnimation()
+        for idx in globals_.TilesAnimated:
+            globals_.Tiles[idx].resetAnimation()
 
+        self.scene.invalidateTileChunks()
         self.scene.update()
 
     def HandleCollisionsToggle(self, checked):
@@ -3212,6 +3240,7 @@ class ReggieWindow(QtWidgets.QMainWindow):
         globals_.CollisionsShown = checked
 
         setSetting('ShowCollisions', globals_.CollisionsShown)
+        self.scene.invalidateTileChunks()
         self.scene.update()
 
     def HandleRealViewToggle(self, checked):
@@ -3605,6 +3634,10 @@ class ReggieWindow(QtWidgets.QMainWindow):
             name = checkname
             same = name == self.fileSavePath  # Just an area change
 
+        # Without unsaved changes, the current area can stay loaded when
+        # changing areas, which makes changing back to it fast
+        keep_area = same and not globals_.Dirty
+
         # Get the file path, if possible
         if new:
             # Set the filepath variables
@@ -3674,7 +3707,11 @@ class ReggieWindow(QtWidgets.QMainWindow):
         # First, clear out the existing level.
         self.scene.clearSelection()
         self.CurrentSelection = []
+        if keep_area:
+            self.scene.detachItems()
         self.scene.clear()
+        self.scene.invalidateTileChunks()
+        ClearSpriteRenders()
 
         # Clear out all level-thing lists
         for thingList in (self.spriteList, self.entranceList, self.locationList, self.pathList, self.commentList):
@@ -3708,7 +3745,7 @@ class ReggieWindow(QtWidgets.QMainWindow):
             # AbstractAreas in the Level. This means we do not have to open and
             # optionally decompress the level file. Hence, we can just relay
             # this to the level.
-            globals_.Level.changeArea(areaNum)
+            globals_.Level.changeArea(areaNum, keep_area)
             self.ResetPalette()
 
         # Fill up the area list
@@ -3890,6 +3927,7 @@ class ReggieWindow(QtWidgets.QMainWindow):
 
         for path in globals_.Area.paths:
             path.add_to_scene()
+            path.add_to_list()
 
         for com in globals_.Area.comments:
             com.positionChanged = self.HandleComPosChange
@@ -3899,16 +3937,32 @@ class ReggieWindow(QtWidgets.QMainWindow):
             self.scene.addItem(com)
             com.UpdateListItem()
 
+    def HandleTilesetProgress(self, done, total):
+        """
+        Shows how many tilesets have been loaded in the status bar
+        """
+        status_bar = self.statusBar()
+        if status_bar is None:
+            return
+
+        if done == total:
+            status_bar.clearMessage()
+        else:
+            status_bar.showMessage(globals_.trans.string('Statusbar', 34, '[x]', done, '[total]', total))
+            # The event loop isn't running while tilesets are being loaded
+            status_bar.repaint()
+
     def ReloadTilesets(self, soft=False):
         """
         Reloads all the tilesets. If soft is True, they will not be reloaded if the filepaths have not changed.
         """
         LoadTilesetInfo(True)
 
+        # The tilesets of the other areas that are still loaded may be outdated
+        globals_.Level.trimWarmAreas(0)
+
         tilesets = [globals_.Area.tileset0, globals_.Area.tileset1, globals_.Area.tileset2, globals_.Area.tileset3]
-        for idx, name in enumerate(tilesets):
-            if (name is not None) and (name != ''):
-                LoadTileset(idx, name, not soft)
+        LoadTilesets(dict(enumerate(tilesets)), not soft)
 
         self.objPicker.LoadFromTilesets()
 
@@ -4244,10 +4298,11 @@ class ReggieWindow(QtWidgets.QMainWindow):
         for item in change:
             area.RemoveFromLayer(item)
             item.layer = new_layer_id
-            new_layer.append(item)
+            area.AddToLayer(item)
 
             item.setZValue(z_value)
             item.setVisible(new_vis)
+            item.invalidateTiles()
             item.update()
             item.UpdateTooltip()
 
@@ -4650,6 +4705,7 @@ class ReggieWindow(QtWidgets.QMainWindow):
 
         # Tilesets
         tilesetNum = 0
+        tilesets = {}
         for idx, fname in enumerate(dlg.tilesetsTab.values()):
 
             if fname in ('', None):
@@ -4668,10 +4724,12 @@ class ReggieWindow(QtWidgets.QMainWindow):
 
             if fname != '':
                 tilesetNum += 1
-                LoadTileset(idx, fname)
+                tilesets[idx] = fname
             else:
                 UnloadTileset(idx)
 
+        LoadTilesets(tilesets)
+
         self.objPicker.LoadFromTilesets()
         self.objAllTab.setCurrentIndex(0)
         self.objAllTab.setTabEnabled(0, (globals_.Area.tileset0 != ''))
@@ -4930,8 +4988,17 @@ def main():
         ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID(app_id)
         del ctypes
 
+    # The batch mode doesn't need a window
+    if len(sys.argv) > 1 and sys.argv[1] == '-batch':
+        import batch
+        sys.exit(batch.main(sys.argv[2:]))
+
+    # Time the startup phases if requested (--profile-startup)
+    profiler.ParseArgs(sys.argv)
+
     # Create an application
-    globals_.app = QtWidgets.QApplication(sys.argv)
+    with profiler.Phase('QApplication'):
+        globals_.app = QtWidgets.QApplication(sys.argv)
 
     # Go to the script path
     path = module_path()
@@ -4949,7 +5016,8 @@ def main():
     import subprocess
 
     try:
-        commit_id = subprocess.check_output(["git", "describe", "--always"], stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL).decode('utf-8').strip()
+        with profiler.Phase('git describe'):
+            commit_id = subprocess.check_output(["git", "describe", "--always"], stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL).decode('utf-8').strip()
         globals_.ReggieVersionShort += f'-{commit_id}'
     except (FileNotFoundError, subprocess.CalledProcessError):
         pass
@@ -4972,29 +5040,38 @@ def main():
         sys.exit(1)
 
     # Load the translation (needs to happen first)
-    LoadTranslation()
+    with profiler.Phase('LoadTranslation'):
+        LoadTranslation()
 
     # Check if required files are missing
     if FilesAreMissing():
         sys.exit(1)
 
     # Load some requirements for spritelib
-    LoadTheme()
-    LoadOverrides()
+    with profiler.Phase('LoadTheme'):
+        LoadTheme()
+    with profiler.Phase('LoadOverrides'):
+        LoadOverrides()
 
     # Initialise spritelib
     SLib.OutlineColor = globals_.theme.color('smi')
     SLib.main()
 
     # Load the gamedef (including sprite image path, for which we need spritelib)
-    LoadGameDef(setting('LastGameDef'))
-    LoadBasics()
+    with profiler.Phase('LoadGameDef'):
+        LoadGameDef(setting('LastGameDef'))
+    with profiler.Phase('LoadBasics'):
+        LoadBasics()
 
     # Load remaining requirements
-    LoadActionsLists()
-    LoadDefaultKeybinds()
-    LoadNumberFont()
-    SetAppStyle()
+    with profiler.Phase('LoadActionsLists'):
+        LoadActionsLists()
+    with profiler.Phase('LoadDefaultKeybinds'):
+        LoadDefaultKeybinds()
+    with profiler.Phase('LoadNumberFont'):
+        LoadNumberFont()
+    with profiler.Phase('SetAppStyle'):
+        SetAppStyle()
 
     # Set the default window icon (used for random popups and stuff)
     globals_.app.setWindowIcon(GetIcon('reggie'))
@@ -5089,9 +5166,14 @@ def main():
     SetColorScheme()
 
     # Create and show the main window
-    globals_.mainWindow = ReggieWindow()
-    globals_.mainWindow.__init2__()  # fixes bugs
-    globals_.mainWindow.show()
+    with profiler.Phase('ReggieWindow'):
+        globals_.mainWindow = ReggieWindow()
+    with profiler.Phase('ReggieWindow.__init2__'):
+        globals_.mainWindow.__init2__()  # fixes bugs
+    with profiler.Phase('show'):
+        globals_.mainWindow.show()
+
+    profiler.Finish(version=globals_.ReggieVersionShort, gamedef=globals_.gamedef.name)
 
     if '-generatestringsxml' in sys.argv:
         globals_.trans.generateXML()
@@ -66,6 +66,8 @@ class SpriteImage_NewerSwitch(common.SpriteImage_Switch):
 ################################################################################
 
 class SpriteImage_Block(SLib.SpriteImage):  # 207, 208, 209, 221, 255, 256, 402, 403, 422, 423
+    drawsTiles = True
+
     def __init__(self, parent, scale=1.5):
         super().__init__(parent, scale)
         self.spritebox.shown = False
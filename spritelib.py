@@ -32,6 +32,7 @@
 
 # Imports
 import os.path
+from collections import OrderedDict
 
 from PyQt6 import QtCore, QtGui, QtWidgets
 
@@ -47,6 +48,14 @@ ImageCache: dict[str, QtGui.QPixmap] = {}
 Tiles: dict[int, TilesetTile | None] = {}
 SpriteImagesLoaded = set()
 
+# Decoded sprite image files, keyed by (path, kind). This cache is not cleared
+# when the game definition changes, so switching between patches only loads
+# the files that are different or have been modified since they were loaded.
+# The least recently used files are dropped once the budget is exceeded.
+FileCache: OrderedDict[tuple[str, str], tuple[float, int, QtGui.QPixmap | QtGui.QImage]] = OrderedDict()
+FileCacheBudget = 64 * 1024 * 1024  # bytes
+FileCacheSize = 0
+
 SpritesFolders = []
 RealViewEnabled = False
 Area = None
@@ -90,15 +99,51 @@ def GetSpriteImageFilePath(imgname: str) -> str:
 
     return path
 
+def GetCachedFile(path: str, kind: str, loader):
+    """
+    Returns a copy of the image file at 'path' from FileCache, loading it with
+    'loader' if it is not cached or has been modified. Returns None if the
+    file does not exist.
+    """
+    global FileCacheSize
+
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return None
+
+    key = (os.path.realpath(path), kind)
+    entry = FileCache.get(key)
+
+    if entry is not None and entry[0] == mtime:
+        FileCache.move_to_end(key)
+        return loader(entry[2])
+
+    if entry is not None:
+        FileCacheSize -= entry[1]
+
+    img = loader(path)
+    cost = img.width() * img.height() * max(img.depth(), 8) // 8
+    FileCache[key] = (mtime, cost, img)
+    FileCache.move_to_end(key)
+    FileCacheSize += cost
+
+    while FileCacheSize > FileCacheBudget and len(FileCache) > 1:
+        _, (_, cost, _) = FileCache.popitem(last=False)
+        FileCacheSize -= cost
+
+    return loader(img)
+
+
 def GetPixmap(imgname: str) -> QtGui.QPixmap:
     """
     Returns a QPixmap with the image 'imgname' from the first matching sprite image folder.
 
     :param imgname: The name of the image to load.
     """
-    path = GetSpriteImageFilePath(imgname)
-    if os.path.isfile(path):
-        return QtGui.QPixmap(path)
+    pix = GetCachedFile(GetSpriteImageFilePath(imgname), 'pixmap', QtGui.QPixmap)
+    if pix is not None:
+        return pix
 
     print(f'[Warning] Could not load sprite image ({imgname})!') # TODO probably raise an Exception instead
     return QtGui.QPixmap()
@@ -110,9 +155,9 @@ def GetImage(imgname: str) -> QtGui.QImage:
 
     :param imgname: The name of the image to load.
     """
-    path = GetSpriteImageFilePath(imgname)
-    if os.path.isfile(path):
-        return QtGui.QImage(path)
+    img = GetCachedFile(GetSpriteImageFilePath(imgname), 'image', QtGui.QImage)
+    if img is not None:
+        return img
 
     print(f'[Warning] Could not load sprite image ({imgname})!')
     return QtGui.QImage()
@@ -213,6 +258,9 @@ class SpriteImage:
     """
     Class that contains information about a sprite image
     """
+    # Set this to True if paint() draws tileset tiles, so that the cached
+    # render of the sprite is updated when the tiles animate
+    drawsTiles = False
 
     def __init__(self, parent: SpriteItem, scale=1.5):
         """
@@ -251,6 +299,14 @@ class SpriteImage:
         Paints the sprite
         """
 
+    def sceneRegion(self) -> QtCore.QRectF | None:
+        """
+        Returns the scene rect this image paints in outside of the sprite (for
+        example its zone), or None if it can paint anywhere. Only this region
+        is repainted when the parent calls updateScene().
+        """
+        return None
+
     def remove(self):
         """
         Called whenever the parent is removed
@@ -282,20 +282,53 @@ class SpriteImage_LiquidOrFog(SLib.SpriteImage):  # 53, 64, 138, 139, 216, 358,
         self.risingHeight = 0
 
         self.locId = 0
+        self.zoneId = -1
+        self.zone = None
         self.findZone()
 
     def findZone(self):
         if globals_.Area.areanum == -1:
             return
 
-        self.zoneId = SLib.MapPositionToZoneID(globals_.Area.zones, self.parent.objx, self.parent.objy, True)
+        zone_idx = SLib.MapPositionToZoneID(globals_.Area.zones, self.parent.objx, self.parent.objy)
+
+        self.zone = globals_.Area.zones[zone_idx] if zone_idx != -1 else None
+        self.zoneId = self.zone.id if self.zone is not None else -1
+
+    def getZone(self):
+        """
+        Returns the zone with id self.zoneId, or None if there is none. The
+        zone is cached until it is removed or its id changes.
+        """
+        zone = self.zone
+        if zone is not None and zone.id == self.zoneId and zone.scene() is not None:
+            return zone
+
+        if globals_.Area.areanum == -1:
+            return None
+
+        for zone in globals_.Area.zones:
+            if zone.id == self.zoneId:
+                self.zone = zone
+                return zone
+
+        return None
+
+    def sceneRegion(self):
+        # Liquids and fog are only painted in their zone, also when they are
+        # limited to a location
+        zone = self.getZone()
+        if zone is None:
+            return QtCore.QRectF()
+
+        return zone.mapRectToScene(zone.DrawRect)
 
     def positionChanged(self):
         self.findZone()
-        self.parent.scene().update()
+        self.parent.updateScene()
 
     def dataChanged(self):
-        self.parent.scene().update()
+        self.parent.updateScene()
 
     def paintZone(self):
         return self.locId == 0 and self.zoneId != -1
@@ -361,13 +394,11 @@ class SpriteImage_LiquidOrFog(SLib.SpriteImage):  # 53, 64, 138, 139, 216, 358,
         """
         Real view location painter for liquids/fog
         """
-        if self.paintZone() or globals_.Area.areanum == -1:
+        if self.paintZone():
             return
 
-        for zone in globals_.Area.zones:
-            if zone.id == self.zoneId:
-                break
-        else:
+        zone = self.getZone()
+        if zone is None:
             return
 
         # Only draw in the intersection of the location and the zone. The
@@ -716,6 +747,8 @@ class SpriteImage_GiantBubble(SLib.SpriteImage):  # 205, 226
 
 
 class SpriteImage_Block(SLib.SpriteImage):  # 207, 208, 209, 221, 255, 256, 402, 403, 422, 423
+    drawsTiles = True
+
     def __init__(self, parent, scale=1.5):
         super().__init__(parent, scale)
         self.spritebox.shown = False
@@ -6126,6 +6159,8 @@ class SpriteImage_DragonCoaster(SLib.SpriteImage):  # 297
 
 
 class SpriteImage_LongCannon(SLib.SpriteImage_StaticMultiple):  # 298
+    drawsTiles = True
+
     def __init__(self, parent):
         super().__init__(parent, 1.5)
 
@@ -6492,10 +6527,20 @@ class SpriteImage_BubbleGen(SLib.SpriteImage):  # 314
         SLib.loadIfNotInImageCache('BubbleGenEffect', 'bubble_gen.png')
 
     def dataChanged(self):
-        self.parent.scene().update()
+        self.parent.updateScene()
 
     def positionChanged(self):
-        self.parent.scene().update()
+        self.parent.updateScene()
+
+    def sceneRegion(self):
+        # The bubbles are painted in the zone the sprite was sorted into
+        zone_id = getattr(self.parent, 'zoneID', -1)
+
+        for zone in globals_.Area.zones:
+            if zone.id == zone_id:
+                return zone.mapRectToScene(zone.DrawRect)
+
+        return QtCore.QRectF()
 
     def realViewZone(self, painter, zoneRect):
 
@@ -1,3 +1,4 @@
+import mmap
 import os
 
 from src.data.common.wii import WiiArchive
@@ -41,6 +42,24 @@ class U8(WiiArchive):
         """
         super().__init__()
         self.files = []
+        self._index = {}  # {path: index in self.files}
+        self._children = {}  # {directory path: [paths of direct children]}
+
+    def _add(self, path, data):
+        """
+        Adds a new file or directory (if data is None) to the archive
+        """
+        self._index[path] = len(self.files)
+        self.files.append((path, data))
+        self._children.setdefault(path.rpartition('/')[0], []).append(path)
+
+    def _descendants(self, path):
+        """
+        Yields the paths of all files and directories inside a directory
+        """
+        for child in self._children.get(path, ()):
+            yield child
+            yield from self._descendants(child)
 
     def _dump(self):
         """
@@ -48,6 +67,7 @@ class U8(WiiArchive):
         """
         header = self.U8Header()
         rootnode = self.U8Node()
+        node_size = len(rootnode)
 
         # constants
         header.tag = b'U\xAA8-'
@@ -55,56 +75,86 @@ class U8(WiiArchive):
         header.zeroes = b'\x00' * 16
         rootnode.type = 0x0100
 
+        # Lay out the nodes, names and file data before writing anything
         nodes = []
-        strings = b'\x00'
-        data = b''
+        names = [b'']
+        strings_size = 1
+        data_size = 0
+
+        # Number of nodes inside every directory
+        counts = {}
+
+        def count(path):
+            if path not in counts:
+                counts[path] = sum(1 + count(child) for child in self._children.get(path, ()))
+            return counts[path]
 
         for item, value in self.files:
             node = self.U8Node()
 
             recursion = item.count('/')
-            if recursion < 0:
-                recursion = 0
-            name = item.split('/')[-1]
+            name = item.rpartition('/')[2].encode('latin-1')
 
-            node.name_offset = len(strings)
-            strings += name.encode('latin-1') + b'\x00'
+            node.name_offset = strings_size
+            names.append(name)
+            strings_size += len(name) + 1
 
             if value is None:  # directory
                 node.type = 0x0100
                 node.data_offset = recursion
 
-                node.size = len(nodes) + 1
-                for one, two in self.files:
-                    if one[:len(item)] == item:  # find nodes in the folder
-                        node.size += 1
+                # The size of a directory node is the index of the first node
+                # after its contents
+                node.size = len(nodes) + 2 + count(item)
             else:  # file
                 node.type = 0x0000
-                node.data_offset = len(data)
-                data += value + (b'\x00' * (
-                    align(len(value), 32) - len(
-                        value)))  # 32 seems to work best for fuzzyness? I'm still really not sure
+                node.data_offset = data_size
+                # 32 seems to work best for fuzzyness? I'm still really not sure
+                data_size += align(len(value), 32)
                 node.size = len(value)
             nodes.append(node)
 
-        header.header_size = ((len(nodes) + 1) * len(rootnode)) + len(strings)
+        header.header_size = (len(nodes) + 1) * node_size + strings_size
         header.data_offset = align(header.header_size + header.rootnode_offset, 64)
         rootnode.size = len(nodes) + 1
 
-        for i in range(len(nodes)):
-            if nodes[i].type == 0x0000:
-                nodes[i].data_offset += header.data_offset
+        fd = bytearray(header.data_offset + data_size)
+        fd[:len(header)] = header.pack()
+
+        offset = header.rootnode_offset
+        fd[offset:offset + node_size] = rootnode.pack()
+        offset += node_size
 
-        fd = b''
-        fd += header.pack()
-        fd += rootnode.pack()
         for node in nodes:
-            fd += node.pack()
-        fd += strings
-        fd += b'\x00' * (header.data_offset - header.rootnode_offset - header.header_size)
-        fd += data
+            if node.type == 0x0000:
+                node.data_offset += header.data_offset
+
+            fd[offset:offset + node_size] = node.pack()
+            offset += node_size
+
+        strings = b'\x00'.join(names) + b'\x00'
+        fd[offset:offset + len(strings)] = strings
+
+        for node, (_, value) in zip(nodes, self.files):
+            if value is not None:
+                fd[node.data_offset:node.data_offset + node.size] = value
 
-        return fd
+        return bytes(fd)
+
+    @classmethod
+    def loadFile(cls, filename, use_mmap=False):
+        """
+        Loads an archive from a file. If use_mmap is True, the file is mapped
+        into memory instead of read, and the files in the archive are slices
+        of that mapping. The file should not be changed while they are in use.
+        """
+        if not use_mmap:
+            return super().loadFile(filename)
+
+        with open(filename, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return cls.load(data, zerocopy=True)
 
     def _dumpDir(self, dir):
         if not os.path.isdir(dir):
@@ -129,41 +179,50 @@ class U8(WiiArchive):
         entries = os.listdir('.')
         for entry in entries:
             if os.path.isdir(entry):
-                self.files.append((self._tmpPath + entry, None))
+                self._add(self._tmpPath + entry, None)
                 self._tmpPath += entry + '/'
                 self._loadDir(entry)
             elif os.path.isfile(entry):
                 data = open(entry, 'rb').read()
-                self.files.append((self._tmpPath + entry, data))
+                self._add(self._tmpPath + entry, data)
         os.chdir(old)
         self._tmpPath = self._tmpPath[:self._tmpPath.find('/') + 1]
 
-    def _load(self, data):
-        offset = 0
+    def _load(self, data, zerocopy=False):
+        """
+        Loads the archive from bytes. If zerocopy is True, files are memoryview
+        slices of data instead of copies, so data should not be modified
+        afterwards.
+        """
         if isinstance(data, str):
             raise TypeError('This isn\'t Python 2 anymore. Only bytes, please.')
 
-        for i in range(len(data)):
-            header = self.U8Header()
-            header.unpack(data[offset:offset + len(header)])
-            if header.tag == b'U\xAA8-':
-                break
-            data = data[1:]
-        offset += len(header)
+        # Skip anything in front of the header
+        start = data.find(b'U\xAA8-')
+        if start == -1:
+            raise ValueError('Not a U8 archive')
+
+        if zerocopy:
+            data = memoryview(data)[start:]
+        elif start:
+            data = data[start:]
+
+        header = self.U8Header()
+        header.unpack(data)
         offset = header.rootnode_offset
 
         rootnode = self.U8Node()
-        rootnode.unpack(data[offset:offset + len(rootnode)])
+        rootnode.unpack(data, offset)
         offset += len(rootnode)
 
         nodes = []
         for i in range(rootnode.size - 1):
             node = self.U8Node()
-            node.unpack(data[offset:offset + len(node)])
+            node.unpack(data, offset)
             offset += len(node)
             nodes.append(node)
 
-        strings = data[offset:offset + header.data_offset - len(header) - (len(rootnode) * rootnode.size)]
+        strings = bytes(data[offset:offset + header.data_offset - len(header) - (len(rootnode) * rootnode.size)])
         offset += len(strings)
 
         recursion = [rootnode.size, ]
@@ -176,11 +235,10 @@ class U8(WiiArchive):
             if node.type == 0x0100:  # folder
                 recursion.append(node.size)
                 recursiondir.append(name)
-                self.files.append(('/'.join(recursiondir), None))
+                self._add('/'.join(recursiondir), None)
 
             elif node.type == 0:  # file
-                self.files.append(
-                    ('/'.join(recursiondir) + '/' + name, data[node.data_offset:node.data_offset + node.size]))
+                self._add('/'.join(recursiondir) + '/' + name, data[node.data_offset:node.data_offset + node.size])
                 offset += node.size
 
             else:  # unknown type -- wtf?
@@ -212,34 +270,23 @@ class U8(WiiArchive):
         """
         Returns the file requested when one indexes the archive
         """
-        for item, val in self.files:
-            if item == key:
-                if val is not None:
-                    return val
-                else:
-                    ret = []
-                    for item2, val2 in self.files:
-                        if item2.find(item) == 0:
-                            ret.append(item2[len(item) + 1:])
-                    return ret[1:]
-        raise KeyError
+        val = self.files[self._index[key]][1]
+        if val is not None:
+            return val
+
+        return [path[len(key) + 1:] for path in self._descendants(key)]
 
     def __contains__(self, key):
         """
         Returns whether the archive contains a file with a key
         """
-        for item, _ in self.files:
-            if item == key:
-                return True
-
-        return False
+        return key in self._index
 
     def __setitem__(self, key, val):
         """
         Handles the request to set a value to an index of the archive
         """
-        for i in range(len(self.files)):
-            if self.files[i][0] == key:
-                self.files[i] = (self.files[i][0], val)
-                return
-        self.files.append((key, val))
+        if key in self._index:
+            self.files[self._index[key]] = (key, val)
+        else:
+            self._add(key, val)
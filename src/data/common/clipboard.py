@@ -0,0 +1,184 @@
+import struct
+
+
+# MIME type of the binary clipboard format. The text format (ReggieClip) is
+# put on the clipboard as well, so clips can still be pasted into older
+# versions and shared as text.
+ClipMimeType = 'application/x-reggie-clip'
+
+ClipMagic = b'RCLP'
+ClipVersion = 1
+
+# Header: magic, version and the number of records of each type
+HeaderStruct = struct.Struct('>4sHxx6I')
+
+ObjectStruct = struct.Struct('>BBBxHHHH')  # tileset, type, layer, x, y, width, height
+SpriteStruct = struct.Struct('>HHH8s')  # type, x, y, data
+EntranceStruct = struct.Struct('>HHBBBBBHBBBB')  # x, y, id, dest. area, dest. entrance, type, zone, settings, layer, path, leave level, pipe direction
+LocationStruct = struct.Struct('>BHHHH')  # id, x, y, width, height
+PathStruct = struct.Struct('>BB')  # id, loops
+NodeStruct = struct.Struct('>BHHHffh')  # path id, node id, x, y, speed, accel, delay
+
+
+class ClipData:
+    """
+    A set of copied level items. Every item is stored as a tuple with the
+    fields of its record in the binary format.
+    """
+
+    def __init__(self):
+        self.objects = []
+        self.sprites = []
+        self.entrances = []
+        self.locations = []
+        self.paths = []
+        self.nodes = []
+
+    def __len__(self):
+        return (len(self.objects) + len(self.sprites) + len(self.entrances)
+                + len(self.locations) + len(self.paths) + len(self.nodes))
+
+    def records(self):
+        """
+        Returns the record lists and their structs, in the order they are
+        stored in the binary format
+        """
+        return (
+            (self.objects, ObjectStruct),
+            (self.sprites, SpriteStruct),
+            (self.entrances, EntranceStruct),
+            (self.locations, LocationStruct),
+            (self.paths, PathStruct),
+            (self.nodes, NodeStruct),
+        )
+
+
+def EncodeClip(clip):
+    """
+    Encodes a ClipData into the binary format
+    """
+    records = clip.records()
+    data = [HeaderStruct.pack(ClipMagic, ClipVersion, *(len(items) for items, _ in records))]
+
+    for items, struct_ in records:
+        pack = struct_.pack
+        data.extend(pack(*item) for item in items)
+
+    return b''.join(data)
+
+
+def DecodeClip(data):
+    """
+    Decodes the binary format into a ClipData. Returns None if the data is not
+    a valid clip.
+    """
+    data = bytes(data)
+
+    try:
+        magic, version, *counts = HeaderStruct.unpack_from(data)
+    except struct.error:
+        return None
+
+    if magic != ClipMagic or version != ClipVersion:
+        return None
+
+    clip = ClipData()
+    offset = HeaderStruct.size
+
+    for (items, struct_), count in zip(clip.records(), counts):
+        end = offset + count * struct_.size
+        if end > len(data):
+            return None
+
+        items.extend(struct_.iter_unpack(data[offset:end]))
+        offset = end
+
+    return clip
+
+
+def ClipToText(clip):
+    """
+    Encodes a ClipData into the text format (ReggieClip|...|%)
+    """
+    text = ['ReggieClip']
+
+    for item in clip.objects:
+        text.append('0:%d:%d:%d:%d:%d:%d:%d' % item)
+
+    for type_, x, y, data in clip.sprites:
+        text.append('1:%d:%d:%d:%d:%d:%d:%d:%d:%d:%d' % (
+            type_, x, y, data[0], data[1], data[2], data[3], data[4], data[5], data[7]))
+
+    for item in clip.entrances:
+        text.append('2:%d:%d:%d:%d:%d:%d:%d:%d:%d:%d:%d:%d' % item)
+
+    for item in clip.locations:
+        text.append('3:%d:%d:%d:%d:%d' % item)
+
+    # Every path is followed by its nodes
+    loops = dict(clip.paths)
+    curr_path = None
+
+    for item in clip.nodes:
+        if item[0] != curr_path:
+            curr_path = item[0]
+            text.append('4:%d:%d' % (curr_path, loops.get(curr_path, 0)))
+
+        text.append('5:%d:%d:%d:%d:%f:%f:%d' % item)
+
+    text.append('%')
+    return '|'.join(text)
+
+
+def TextToClip(text):
+    """
+    Decodes the text format into a ClipData. Returns None if the text is not a
+    valid clip. Items that cannot be parsed are skipped.
+    """
+    text = text.strip()
+    if not (text.startswith('ReggieClip|') and text.endswith('|%')):
+        return None
+
+    # Whitespace can be added when clips are shared as text
+    text = ''.join(text.split())
+
+    clip = ClipData()
+
+    for item in text[11:-2].split('|'):
+        split = item.split(':')
+
+        try:
+            # Object
+            if split[0] == '0' and len(split) == 8:
+                clip.objects.append(tuple(map(int, split[1:])))
+
+            # Sprite
+            elif split[0] == '1' and len(split) == 11:
+                values = list(map(int, split[1:]))
+                data = bytes(values[3:9] + [0, values[9]])
+                clip.sprites.append((values[0], values[1], values[2], data))
+
+            # Entrance
+            elif split[0] == '2' and len(split) == 13:
+                clip.entrances.append(tuple(map(int, split[1:])))
+
+            # Location
+            elif split[0] == '3' and len(split) == 6:
+                clip.locations.append(tuple(map(int, split[1:])))
+
+            # Path
+            elif split[0] == '4' and len(split) == 3:
+                clip.paths.append((int(split[1]), int(split[2])))
+
+            # Path Node
+            elif split[0] == '5' and len(split) == 8:
+                clip.nodes.append((
+                    int(split[1]), int(split[2]), int(split[3]), int(split[4]),
+                    float(split[5]), float(split[6]), int(split[7]),
+                ))
+
+        except ValueError:
+            # an int() probably failed somewhere
+            pass
+
+    return clip
@@ -0,0 +1,130 @@
+import hashlib
+import os
+import struct
+import zlib
+
+
+class DiskCache:
+    """
+    A directory of compressed cache entries that are pruned by least recent
+    use. Subclasses define the entry key and how the data is (de)serialized.
+    """
+    Magic = b''
+    Version = 0  # bump this whenever the data or its layout changes
+    Directory = ''
+    MaxEntries = 8
+
+    # Errors that mean an entry is corrupt, rather than a bug in unpack
+    CorruptErrors = (zlib.error, struct.error, EOFError, IndexError, ValueError, TypeError)
+
+    def key(self, *args):
+        """
+        Returns the strings identifying the cache entry for the given
+        arguments. Raises OSError if a source file cannot be accessed.
+        """
+        raise NotImplementedError
+
+    def pack(self, data):
+        """
+        Serializes the data of a cache entry to bytes
+        """
+        raise NotImplementedError
+
+    def unpack(self, raw):
+        """
+        Deserializes the data of a cache entry
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def fileKey(path):
+        """
+        Returns the key strings of a source file, which change whenever the
+        file does
+        """
+        st = os.stat(path)
+        return [os.path.abspath(path), str(st.st_mtime_ns), str(st.st_size)]
+
+    def path(self, *args):
+        """
+        Returns the file path of the cache entry for the given arguments
+        """
+        key = [str(self.Version), *self.key(*args)]
+        return os.path.join(self.Directory, hashlib.sha1('|'.join(key).encode('utf-8')).hexdigest() + '.bin')
+
+    def load(self, *args):
+        """
+        Returns the cached data for the given arguments, or None if there is
+        no (valid) cache entry for them
+        """
+        try:
+            path = self.path(*args)
+            with open(path, 'rb') as f:
+                raw = f.read()
+        except OSError:
+            return None
+
+        if raw[:4] != self.Magic or struct.unpack_from('>H', raw, 4)[0] != self.Version:
+            return None
+
+        try:
+            data = self.unpack(zlib.decompress(raw[6:]))
+        except self.CorruptErrors:
+            return None
+
+        # Mark the entry as recently used, so pruning removes it last
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return data
+
+    def save(self, *args):
+        """
+        Stores data in the cache. The data is the last argument, the others
+        are passed to key. Failing to write the cache is not an error.
+        """
+        *args, data = args
+
+        try:
+            path = self.path(*args)
+            os.makedirs(self.Directory, exist_ok=True)
+
+            # Several processes may write the same entry at once
+            tmp = '%s.%d.tmp' % (path, os.getpid())
+            with open(tmp, 'wb') as f:
+                f.write(self.Magic + struct.pack('>H', self.Version))
+                f.write(zlib.compress(self.pack(data), 1))
+
+            os.replace(tmp, path)
+            self.prune()
+        except (OSError, ValueError):
+            pass
+
+    def prune(self):
+        """
+        Removes the least recently used cache entries beyond MaxEntries. The
+        temporary files of other writers are left alone, and entries that
+        another process removes in the meantime are skipped.
+        """
+        entries = []
+        for fn in os.listdir(self.Directory):
+            if not fn.endswith('.bin'):
+                continue
+
+            path = os.path.join(self.Directory, fn)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except FileNotFoundError:
+                pass
+
+        if len(entries) <= self.MaxEntries:
+            return
+
+        entries.sort()
+        for _, path in entries[:len(entries) - self.MaxEntries]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
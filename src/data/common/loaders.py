@@ -1,4 +1,5 @@
 import collections
+import concurrent.futures
 import itertools
 import os
 import struct
@@ -14,9 +15,11 @@ from src.data.common import archive
 from src.data.common.keybind import Keybind
 from src.data.common.menu_action import MenuAction
 from src.data.level.sprite_definition import SpriteDefinition
+from src.data.sprite import sprite_data_cache
 from src.data.sprite.sprite_category import SpriteCategory, SpriteSubCategory
+from src.data.tileset import tileset_cache
 from src.data.tileset.object.object_def import ObjectDef
-from src.data.tileset.object.renderers import IncrementTilesetFrame
+from src.data.tileset.object.renderers import ClearRenderCache, IncrementTilesetFrame
 from src.data.tileset.tile.rand_tile_selection import RandTileSelection
 from src.data.tileset.tile.tileset_tile import TilesetTile
 from src.data.tileset.tileset_category import TilesetCategory, TilesetFileEntry
@@ -330,48 +333,73 @@ def LoadConfig():
                     globals_.AllowSizeHacks = value.strip().lower() == 'true'
 
 
+# SpriteDataEditor strings used in the compiled sprite data
+SpriteDataTranslationIDs = (1, 2, 8, 9, 11, 28)
+
+
 def LoadSpriteData():
     """
     Ensures that the sprite data info is loaded
     """
+    paths = [path if isinstance(path, str) else path.path for path in getResourcePaths('spritedata') if path]
+
+    # The compiled sprite data includes localized notes and comments, so the
+    # cache entry depends on the translation strings used for them
+    translation = [globals_.trans.string('SpriteDataEditor', i) for i in SpriteDataTranslationIDs]
+
+    data = sprite_data_cache.load(paths, translation)
+    if data is None:
+        data = CompileSpriteData(paths)
+        sprite_data_cache.save(paths, translation, data)
+
     errors = []
     errortext = []
-    sprite_ids = [-1]
 
-    # Convert the iterable to list, because we need to iterate over it twice
-    paths = list(getResourcePaths('spritedata'))
+    globals_.NumSprites = data.numSprites
+    globals_.Sprites = [SpriteDefinition()] * globals_.NumSprites
 
-    for path in paths:
-        if path is None:
-            continue
+    for attribs, compiled, error in data.sprites:
+        sdef = SpriteDefinition()
+        (sdef.id, sdef.name, sdef.notes, sdef.advNotes, sdef.relatedObjFiles,
+         sdef.yoshiNotes, sdef.noyoshi, sdef.asm, sdef.size, sdef.noLayer) = attribs
 
-        # Add XML sprite data, if there is any
-        if not isinstance(path, str):
-            path = path.path
+        for tag, args in compiled:
+            sdef.addCompiledField(tag, args)
 
-        tree = ElementTree.parse(path)
+        if error is not None:
+            errors.append(str(sdef.id))
+            errortext.append(error)
 
+        globals_.Sprites[sdef.id] = sdef
+
+    # Warn the user if errors occurred
+    if errors:
+        QtWidgets.QMessageBox.warning(None, globals_.trans.string('Err_BrokenSpriteData', 0),
+                                      globals_.trans.string('Err_BrokenSpriteData', 1, '[sprites]', ', '.join(errors)),
+                                      QtWidgets.QMessageBox.StandardButton.Ok)
+        QtWidgets.QMessageBox.warning(None, globals_.trans.string('Err_BrokenSpriteData', 2), repr(errortext))
+
+
+def CompileSpriteData(paths):
+    """
+    Parses the spritedata.xml files in 'paths' into a CompiledSpriteData
+    """
+    data = sprite_data_cache.CompiledSpriteData()
+    trees = [ElementTree.parse(path) for path in paths]
+    sprite_ids = [-1]
+
+    for tree in trees:
         for sprite in tree.iter("sprite"):
             id_text = sprite.get("id")
 
             if id_text is None:
                 continue
 
-            id_ = int(id_text)
-            sprite_ids.append(id_)
-
-    globals_.NumSprites = max(sprite_ids) + 1
-    globals_.Sprites = [SpriteDefinition()] * globals_.NumSprites
-
-    for sdpath in paths:
+            sprite_ids.append(int(id_text))
 
-        # Add XML sprite data, if there is any
-        if sdpath in (None, ''):
-            continue
-
-        path = sdpath if isinstance(sdpath, str) else sdpath.path
-        tree = ElementTree.parse(path)
+    data.numSprites = max(sprite_ids) + 1
 
+    for tree in trees:
         for sprite in tree.iter("sprite"):
             id_from_sprite = sprite.get("id")
 
@@ -410,34 +438,20 @@ def LoadSpriteData():
             size = sprite.get('sizehacks', 'False') == "True"
             noLayer = sprite.get('nolayer', 'False') == "True"
 
-            sdef = SpriteDefinition()
-            sdef.id = spriteid
-            sdef.name = spritename
-            sdef.notes = notes
-            sdef.advNotes = advNotes
-            sdef.relatedObjFiles = relatedObjFiles
-            sdef.yoshiNotes = yoshiNotes
-            sdef.noyoshi = noyoshi
-            sdef.asm = asm
-            sdef.size = size
-            sdef.noLayer = noLayer
-            sdef.dependencies = []
-            sdef.dependencynotes = None
+            compiled = []
+            error = None
 
             try:
-                sdef.loadFrom(sprite)
+                SpriteDefinition().loadFrom(sprite, compiled)
             except ValueError as e:
-                errors.append(str(spriteid))
-                errortext.append(str(e))
+                error = str(e)
 
-            globals_.Sprites[spriteid] = sdef
+            data.sprites.append((
+                (spriteid, spritename, notes, advNotes, relatedObjFiles, yoshiNotes, noyoshi, asm, size, noLayer),
+                compiled, error,
+            ))
 
-    # Warn the user if errors occurred
-    if errors:
-        QtWidgets.QMessageBox.warning(None, globals_.trans.string('Err_BrokenSpriteData', 0),
-                                      globals_.trans.string('Err_BrokenSpriteData', 1, '[sprites]', ', '.join(errors)),
-                                      QtWidgets.QMessageBox.StandardButton.Ok)
-        QtWidgets.QMessageBox.warning(None, globals_.trans.string('Err_BrokenSpriteData', 2), repr(errortext))
+    return data
 
 
 def LoadSpriteCategories(reload_=False):
@@ -1000,20 +1014,138 @@ def CreateTilesets():
     globals_.Tiles = [None] * 0x200 * 4
     globals_.Tiles += globals_.Overrides
     globals_.TilesetFilesLoaded = [None, None, None, None]
+    globals_.TilesAnimated = set()
     globals_.TilesetAnimTimer = QtCore.QTimer()
     globals_.TilesetAnimTimer.timeout.connect(IncrementTilesetFrame)
     globals_.TilesetAnimTimer.start(90)
     globals_.ObjectDefinitions = [None] * 4
     SLib.Tiles = globals_.Tiles
+    ClearRenderCache()
+
+    if globals_.mainWindow is not None:
+        globals_.mainWindow.scene.invalidateTileChunks()
+
+
+def SaveTilesetState():
+    """
+    Returns the currently loaded tilesets, so they can be put back later with
+    RestoreTilesetState. CreateTilesets replaces the arrays instead of clearing
+    them, so the returned state is not affected by loading other tilesets.
+    """
+    return globals_.Tiles, globals_.TilesetFilesLoaded, globals_.TilesAnimated, globals_.ObjectDefinitions
+
+
+def RestoreTilesetState(state):
+    """
+    Makes tilesets returned by SaveTilesetState the loaded tilesets again
+    """
+    globals_.Tiles, globals_.TilesetFilesLoaded, globals_.TilesAnimated, globals_.ObjectDefinitions = state
+    SLib.Tiles = globals_.Tiles
+    ClearRenderCache()
+
+    if globals_.mainWindow is not None:
+        globals_.mainWindow.scene.invalidateTileChunks()
+
+
+class TilesetLoadError(Exception):
+    """
+    Raised when a tileset archive cannot be decoded. The arguments are the
+    translation section and string number of the error message.
+    """
+
+
+class TilesetLoadSignals(QtCore.QObject):
+    """
+    Reports how many of the tilesets that are being loaded are done
+    """
+    progress = QtCore.pyqtSignal(int, int)
+
+
+TilesetSignals = TilesetLoadSignals()
+TilesetPool = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix='TilesetLoader')
 
 
 def LoadTileset(idx, name, reload_=False):
     """
     Load in a tileset into a specific slot
     """
-    if not name:
-        return False
+    LoadTilesets({idx: name}, reload_)
+
+
+def LoadTilesets(names, reload_=False):
+    """
+    Load in tilesets into several slots at once. names maps slot numbers to
+    tileset names.
+    """
+    FinishLoadingTilesets(StartLoadingTilesets(names, reload_))
+
+
+def StartLoadingTilesets(names, reload_=False):
+    """
+    Starts reading and decoding tilesets in the background. names maps slot
+    numbers to tileset names. The result should be passed to
+    FinishLoadingTilesets, which adds the tilesets to their slots.
+    """
+    pending = []
+    for idx, name in names.items():
+        if not name:
+            continue
+
+        found = FindTileset(name)
+        if found is None:
+            continue
+
+        arcname, compressed = found
+
+        # If this file's already loaded, it doesn't need to be decoded again
+        if globals_.TilesetFilesLoaded[idx] == arcname and not reload_:
+            future = None
+        else:
+            future = TilesetPool.submit(PrepareTileset, idx, name, arcname, compressed)
+
+        pending.append((idx, name, arcname, compressed, future))
+
+    return pending
+
+
+def FinishLoadingTilesets(pending):
+    """
+    Waits for the tilesets started by StartLoadingTilesets and adds them to
+    their slots, in the order in which they finish decoding
+    """
+    futures = {}
+    for idx, name, arcname, compressed, future in pending:
+        if future is None:
+            # The slot may have been cleared since loading started
+            if globals_.TilesetFilesLoaded[idx] == arcname:
+                continue
+
+            future = TilesetPool.submit(PrepareTileset, idx, name, arcname, compressed)
 
+        futures[future] = (idx, name, arcname)
+
+    done = 0
+    for future in concurrent.futures.as_completed(futures):
+        idx, name, arcname = futures[future]
+
+        try:
+            data = future.result()
+        except TilesetLoadError as e:
+            section, num = e.args
+            QtWidgets.QMessageBox.warning(None, globals_.trans.string(section, 0),
+                                          globals_.trans.string(section, num, '[file]', name))
+        else:
+            BuildTileset(idx, name, arcname, data)
+
+        done += 1
+        TilesetSignals.progress.emit(done, len(futures))
+
+
+def FindTileset(name):
+    """
+    Returns the path of a tileset archive and whether it is compressed, or
+    None if it cannot be found
+    """
     # find the tileset path
     tileset_paths = reversed(globals_.gamedef.GetTexturePaths())
 
@@ -1049,32 +1181,106 @@ def LoadTileset(idx, name, reload_=False):
     if not found:
         QtWidgets.QMessageBox.warning(None, globals_.trans.string('Err_MissingTileset', 0),
                                       globals_.trans.string('Err_MissingTileset', 1, '[file]', name))
-        return False
+        return None
 
-    # If this file's already loaded, return
-    if globals_.TilesetFilesLoaded[idx] == arcname and not reload_: return
+    return arcname, compressed
 
-    # Get the data
-    with open(arcname, 'rb') as fileobj:
-        arcdata = fileobj.read()
 
+def PrepareTileset(idx, name, arcname, compressed):
+    """
+    Returns the TilesetData of a tileset archive for a specific slot, using the
+    cache if possible. This doesn't create any Qt objects, so it can be run on
+    a worker thread.
+    """
+    # Decoding the archive is slow, so use the cached result if the archive
+    # hasn't changed since it was last decoded
+    data = tileset_cache.load(arcname, idx, name)
+    if data is None:
+        data = DecodeTileset(idx, name, arcname, compressed)
+        tileset_cache.save(arcname, idx, name, data)
+
+    return data
+
+
+def BuildTileset(idx, name, arcname, data):
+    """
+    Creates the tiles and object definitions of a slot from its TilesetData
+    """
+    # nsmblib returns the image data with premultiplied alpha, while the cython
+    # and python implementations do not. As such, we have to set the correct
+    # format for Qt - ARGB32 premultiplied if nsmblib is used, and ARGB32 by
+    # default.
+    if data.premultiplied:
+        data_format = QtGui.QImage.Format.Format_ARGB32_Premultiplied
+    else:
+        data_format = QtGui.QImage.Format.Format_ARGB32
+
+    img = QtGui.QImage(data.atlas, 1024, 256, 4096, data_format)
+
+    # Divide it into individual tiles and
+    # add collisions at the same time
+    dest = QtGui.QPixmap.fromImage(img)
+    sourcex = 4
+    sourcey = 4
+    tileoffset = idx * 256
+    for i in range(tileoffset, tileoffset + 256):
+        T = TilesetTile(dest.copy(sourcex, sourcey, 24, 24))
+        T.setCollisions(struct.unpack_from('>8B', data.colldata, (i - tileoffset) * 8))
+        globals_.Tiles[i] = T
+        sourcex += 32
+        if sourcex >= 1024:
+            sourcex = 4
+            sourcey += 32
+
+    # Load the tileset animations, if there are any
+    globals_.TilesAnimated.difference_update(range(tileoffset, tileoffset + 256))
+    for i, fn, reverse in data.tileAnims:
+        globals_.Tiles[i].setAnimationFrames(data.anims[fn], reverse)
+        globals_.TilesAnimated.add(i)
+
+    globals_.ObjectDefinitions[idx] = data.objects
+
+    ProcessOverrides(idx, name)
+    ClearRenderCache(idx)
+
+    # Keep track of this filepath
+    globals_.TilesetFilesLoaded[idx] = arcname
+
+    # Add Tiles to spritelib
+    SLib.Tiles = globals_.Tiles
+
+    # The cached tile chunks may use the old tiles
+    if globals_.mainWindow is not None:
+        globals_.mainWindow.scene.invalidateTileChunks()
+
+
+def DecodeTileset(idx, name, arcname, compressed):
+    """
+    Reads a tileset archive and decodes its texture, collisions, animations
+    and object definitions for a specific slot. Raises TilesetLoadError if the
+    archive cannot be decoded.
+    """
+    # Get the data
     if compressed:
+        with open(arcname, 'rb') as fileobj:
+            arcdata = fileobj.read()
+
         if (arcdata[0] & 0xF0) == 0x40:  # If LH-compressed
             try:
                 arcdata = lh.UncompressLH(arcdata)
             except IndexError:
-                QtWidgets.QMessageBox.warning(None, globals_.trans.string('Err_Decompress', 0),
-                                              globals_.trans.string('Err_Decompress', 1, '[file]', name))
-                return False
+                raise TilesetLoadError('Err_Decompress', 1)
         elif not arcdata.startswith(b"U\xAA8-"):  # If LZ-compressed
             try:
                 arcdata = lz77.UncompressLZ77(arcdata)
             except IndexError:
-                QtWidgets.QMessageBox.warning(None, globals_.trans.string('Err_Decompress', 0),
-                                                globals_.trans.string('Err_Decompress', 2, '[file]', name))
-                return False
+                raise TilesetLoadError('Err_Decompress', 2)
 
-    arc = archive.U8.load(arcdata)
+        arc = archive.U8.load(arcdata, zerocopy=True)
+
+    else:
+        # Uncompressed archives can be used straight from the disk
+        arc = archive.U8.loadFile(arcname, use_mmap=True)
 
     def exists(fn):
         nonlocal arc
@@ -1092,29 +1298,20 @@ def LoadTileset(idx, name, reload_=False):
         comptiledata = arc[f'BG_tex/{name}_tex.bin.LZ']
         colldata = bytes(arc[f'BG_chk/d_bgchk_{name}.bin'])
     else:
-        QtWidgets.QMessageBox.warning(None, globals_.trans.string('Err_CorruptedTilesetData', 0),
-                                      globals_.trans.string('Err_CorruptedTilesetData', 1, '[file]', name))
-        return False
+        raise TilesetLoadError('Err_CorruptedTilesetData', 1)
 
-    # Load in the textures
-    img = LoadTexture_NSMBW(lz77.UncompressLZ77(comptiledata))
+    data = tileset_cache.TilesetData()
+    data.atlas = tpl.decodeRGB4A3(lz77.UncompressLZ77(comptiledata), 1024, 256, False)
+    data.premultiplied = lib_versions["nsmblib"] is not None
+    data.colldata = colldata
 
-    # Divide it into individual tiles and
-    # add collisions at the same time
-    dest = QtGui.QPixmap.fromImage(img)
-    sourcex = 4
-    sourcey = 4
-    tileoffset = idx * 256
-    for i in range(tileoffset, tileoffset + 256):
-        T = TilesetTile(dest.copy(sourcex, sourcey, 24, 24))
-        T.setCollisions(struct.unpack_from('>8B', colldata, (i - tileoffset) * 8))
-        globals_.Tiles[i] = T
-        sourcex += 32
-        if sourcex >= 1024:
-            sourcex = 4
-            sourcey += 32
+    def addAnim(tile, fn, reverse=False):
+        # Animation files are shared between tiles, so decode each one once
+        if fn not in data.anims:
+            data.anims[fn] = TilesetTile.decodeAnimationData(arc[fn])
+        data.tileAnims.append((tile, fn, reverse))
 
-    # Load the tileset animations, if there are any
+    # Find the tileset animations, if there are any
     tileoffset = idx * 256
     row = 0
     col = 0
@@ -1124,31 +1321,27 @@ def LoadTileset(idx, name, reload_=False):
     isAnimated, prefix = CheckTilesetAnimated(arc)
 
     for i in range(tileoffset, tileoffset + 256):
-        current_tile = globals_.Tiles[i]
-        if current_tile is None:
-            continue
-
         if idx == 0:
-            if current_tile.collData[3] == 5:
+            if colldata[(i - tileoffset) * 8 + 3] == 5:
                 fn = 'BG_tex/hatena_anime.bin'
                 found = exists(fn)
 
                 if found:
-                    current_tile.addAnimationData(arc[fn])
+                    addAnim(i, fn)
 
-            elif current_tile.collData[3] == 0x10:
+            elif colldata[(i - tileoffset) * 8 + 3] == 0x10:
                 fn = 'BG_tex/block_anime.bin'
                 found = exists(fn)
 
                 if found:
-                    current_tile.addAnimationData(arc[fn])
+                    addAnim(i, fn)
 
-            elif current_tile.collData[7] == 0x28:
+            elif colldata[(i - tileoffset) * 8 + 7] == 0x28:
                 fn = 'BG_tex/tuka_coin_anime.bin'
                 found = exists(fn)
 
                 if found:
-                    current_tile.addAnimationData(arc[fn])
+                    addAnim(i, fn)
 
         # TODO: Dehardcode this?
         elif idx == 1 and name in containsConveyor:
@@ -1158,41 +1351,41 @@ def LoadTileset(idx, name, reload_=False):
                     found = exists(fn)
 
                     if found:
-                        current_tile.addAnimationData(arc[fn], True)
+                        addAnim(i, fn, True)
 
                 elif i == 321+x*16:
                     fn = 'BG_tex/belt_conveyor_M_anime.bin'
                     found = exists(fn)
 
                     if found:
-                        current_tile.addAnimationData(arc[fn], True)
+                        addAnim(i, fn, True)
 
                 elif i == 322+x*16:
                     fn = 'BG_tex/belt_conveyor_R_anime.bin'
                     found = exists(fn)
 
                     if found:
-                        current_tile.addAnimationData(arc[fn], True)
+                        addAnim(i, fn, True)
 
                 elif i == 323+x*16:
                     fn = 'BG_tex/belt_conveyor_L_anime.bin'
                     found = exists(fn)
 
                     if found:
-                        current_tile.addAnimationData(arc[fn])
+                        addAnim(i, fn)
 
                 elif i == 324+x*16:
                     fn = 'BG_tex/belt_conveyor_M_anime.bin'
                     found = exists(fn)
 
                     if found:
-                        current_tile.addAnimationData(arc[fn])
+                        addAnim(i, fn)
 
                 elif i == 325+x*16:
                     fn = 'BG_tex/belt_conveyor_R_anime.bin'
                     found = exists(fn)
                     if found:
-                        current_tile.addAnimationData(arc[fn])
+                        addAnim(i, fn)
 
         # Setup Newer-style animated tiles
         if isAnimated:
@@ -1210,7 +1403,7 @@ def LoadTileset(idx, name, reload_=False):
                 found = exists(fn)
 
                 if found:
-                    current_tile.addAnimationData(arc[fn])
+                    addAnim(i, fn)
 
         col += 1
 
@@ -1227,39 +1420,16 @@ def LoadTileset(idx, name, reload_=False):
     indexstruct = struct.Struct('>HBB')
 
     for i in range(objcount):
-        data = indexstruct.unpack_from(indexfile, i << 2)
+        header = indexstruct.unpack_from(indexfile, i << 2)
         obj = ObjectDef()
-        obj.width = data[1]
-        obj.height = data[2]
-        obj.load(deffile, data[0], tileoffset)
+        obj.width = header[1]
+        obj.height = header[2]
+        obj.load(deffile, header[0], tileoffset)
         defs[i] = obj
 
-    globals_.ObjectDefinitions[idx] = defs
-
-    ProcessOverrides(idx, name)
-
-    # Keep track of this filepath
-    globals_.TilesetFilesLoaded[idx] = arcname
-
-    # Add Tiles to spritelib
-    SLib.Tiles = globals_.Tiles
-
-    return True
-
+    data.objects = defs
 
-def LoadTexture_NSMBW(tiledata):
-    data = tpl.decodeRGB4A3(tiledata, 1024, 256, False)
-
-    # nsmblib returns the image data with premultiplied alpha, while the cython
-    # and python implementations do not. As such, we have to set the correct
-    # format for Qt - ARGB32 premultiplied if nsmblib is used, and ARGB32 by
-    # default.
-    if lib_versions["nsmblib"] is not None:
-        data_format = QtGui.QImage.Format.Format_ARGB32_Premultiplied
-    else:
-        data_format = QtGui.QImage.Format.Format_ARGB32
-
-    return QtGui.QImage(data, 1024, 256, 4096, data_format)
+    return data
 
 
 def UnloadTileset(idx):
@@ -1268,8 +1438,13 @@ def UnloadTileset(idx):
     """
     tileoffset = idx * 256
     globals_.Tiles[tileoffset:tileoffset + 256] = [None] * 256
+    globals_.TilesAnimated.difference_update(range(tileoffset, tileoffset + 256))
     globals_.ObjectDefinitions[idx] = [None] * 256
     globals_.TilesetFilesLoaded[idx] = None
+    ClearRenderCache(idx)
+
+    if globals_.mainWindow is not None:
+        globals_.mainWindow.scene.invalidateTileChunks()
 
 
 def ProcessOverrides(idx, name):
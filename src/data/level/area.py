@@ -19,7 +19,140 @@ from src.data.sprite.spritefield.value import ValueSpriteField
 from src.ui.widgets.spriteeditor.propertydecoders.property_decoder import (
     PropertyDecoder,
 )
-from src.data.common.loaders import CreateTilesets, LoadTileset
+from src.data.common.loaders import CreateTilesets, FinishLoadingTilesets, LoadTilesets, StartLoadingTilesets
+
+
+class ObjectGrid:
+    """
+    Uniform grid over the objects of a single layer, used to quickly find all
+    objects that intersect a rectangle. Rectangles are measured in tiles.
+    """
+    CellSize = 16
+
+    def __init__(self):
+        self.cells = {}  # {(cx, cy): set of objects}
+        self.entries = {}  # {object: (order, cx1, cy1, cx2, cy2)}
+        self.next_order = 0
+
+    def _cell_range(self, obj):
+        """
+        Returns the (inclusive) range of cells covered by an object
+        """
+        size = self.CellSize
+        x, y, w, h = obj.LevelRect.getRect()
+        x = int(x)
+        y = int(y)
+
+        return (
+            x // size, y // size,
+            (x + max(int(w), 1) - 1) // size, (y + max(int(h), 1) - 1) // size
+        )
+
+    def _insert(self, obj, cx1, cy1, cx2, cy2):
+        cells = self.cells
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                cell = cells.get((cx, cy))
+                if cell is None:
+                    cells[(cx, cy)] = {obj}
+                else:
+                    cell.add(obj)
+
+    def _discard(self, obj, cx1, cy1, cx2, cy2):
+        cells = self.cells
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                cell = cells[(cx, cy)]
+                cell.discard(obj)
+                if not cell:
+                    del cells[(cx, cy)]
+
+    def add(self, obj):
+        """
+        Adds an object to the grid. Objects are returned by queries in the
+        order they were added, which matches the order of the layer list.
+        """
+        cell_range = self._cell_range(obj)
+        self.entries[obj] = (self.next_order,) + cell_range
+        self.next_order += 1
+        self._insert(obj, *cell_range)
+
+    def remove(self, obj):
+        """
+        Removes an object from the grid
+        """
+        entry = self.entries.pop(obj, None)
+        if entry is not None:
+            self._discard(obj, *entry[1:])
+
+    def move(self, obj):
+        """
+        Updates the cells of an object after its position or size changed.
+        Objects that are not in the grid are ignored.
+        """
+        entry = self.entries.get(obj)
+        if entry is None:
+            return
+
+        cell_range = self._cell_range(obj)
+        if cell_range == entry[1:]:
+            return
+
+        self._discard(obj, *entry[1:])
+        self._insert(obj, *cell_range)
+        self.entries[obj] = (entry[0],) + cell_range
+
+    def query(self, x, y, width, height):
+        """
+        Returns a list of the objects intersecting the given rectangle, in
+        layer order
+        """
+        size = self.CellSize
+        right = x + width
+        bottom = y + height
+        cells = self.cells
+        found = set()
+
+        for cx in range(x // size, (right - 1) // size + 1):
+            for cy in range(y // size, (bottom - 1) // size + 1):
+                cell = cells.get((cx, cy))
+                if cell is not None:
+                    found.update(cell)
+
+        result = []
+        for obj in found:
+            ox, oy, ow, oh = obj.LevelRect.getRect()
+            if ow > 0 and oh > 0 and ox < right and ox + ow > x and oy < bottom and oy + oh > y:
+                result.append(obj)
+
+        entries = self.entries
+        result.sort(key=lambda obj: entries[obj][0])
+        return result
+
+    def extent(self):
+        """
+        Returns the (right, bottom) edges of the bounding rectangle of all
+        objects, or None if the grid is empty
+        """
+        if not self.cells:
+            return None
+
+        cells = self.cells
+        max_cx = max(cx for cx, _ in cells)
+        max_cy = max(cy for _, cy in cells)
+
+        right = max(
+            obj.LevelRect.right()
+            for (cx, _), cell in cells.items() if cx == max_cx
+            for obj in cell
+        )
+        bottom = max(
+            obj.LevelRect.bottom()
+            for (_, cy), cell in cells.items() if cy == max_cy
+            for obj in cell
+        )
+
+        return right, bottom
 
 
 class Area:
@@ -73,9 +206,11 @@ class Area:
         self.paths = []
         self.comments = []
         self.layers = [[], [], []]
+        self.object_grids = [ObjectGrid(), ObjectGrid(), ObjectGrid()]
         self.loaded_sprites = set()
         self.force_loaded_sprites = set()
         self.sprite_idtypes = {}  # {idtype: {id: number of usages of id}}
+        self.item_index = {}  # {item id: level item}, see GetItemById
 
         self.MetaData = None
         self._is_loaded = False
@@ -99,10 +234,7 @@ class Area:
 
         # Load tilesets
         CreateTilesets()
-        LoadTileset(0, self.tileset0)
-        LoadTileset(1, self.tileset1)
-        LoadTileset(2, self.tileset2)
-        LoadTileset(3, self.tileset3)
+        LoadTilesets({0: self.tileset0, 1: self.tileset1, 2: self.tileset2, 3: self.tileset3})
 
         # Mark the area as loaded
         self._is_loaded = True
@@ -124,6 +256,7 @@ class Area:
 
         del self.blocks
         del self.layers
+        del self.object_grids
         del self.Metadata
         del self.tileset0
         del self.tileset1
@@ -162,7 +295,7 @@ class Area:
 
         # Load the editor metadata
         if self.course is not None and self.block1pos[0] != 0x70:
-            rddata = self.course[0x70:self.block1pos[0]]
+            rddata = bytes(self.course[0x70:self.block1pos[0]])
             self.LoadReggieInfo(rddata)
         else:
             self.LoadReggieInfo(None)
@@ -172,6 +305,17 @@ class Area:
 
         # Load stuff from individual blocks
         self.LoadTilesetNames()  # block 1
+
+        # Reset the tilesets if this is not the first load
+        if not globals_.firstLoad:
+            CreateTilesets()
+        else:
+            globals_.firstLoad = False
+
+        # Start decoding the tilesets in the background while the rest of the
+        # blocks are loaded
+        tilesets = StartLoadingTilesets({0: self.tileset0, 1: self.tileset1, 2: self.tileset2, 3: self.tileset3})
+
         self.LoadOptions()  # block 2
         self.LoadEntrances()  # block 7
         self.LoadLoadedSprites()  # block 9
@@ -183,20 +327,12 @@ class Area:
         # Now, load the comments
         self.LoadComments()
 
-        # Reset the tilesets if this is not the first load
-        if not globals_.firstLoad:
-            CreateTilesets()
-        else:
-            globals_.firstLoad = False
-
         # Load the tilesets
-        LoadTileset(0, self.tileset0)
-        LoadTileset(1, self.tileset1)
-        LoadTileset(2, self.tileset2)
-        LoadTileset(3, self.tileset3)
+        FinishLoadingTilesets(tilesets)
 
         # Load the object layers
         self.layers = [[], [], []]
+        self.object_grids = [ObjectGrid(), ObjectGrid(), ObjectGrid()]
 
         if self.L0 is not None:
             self.LoadLayer(0, self.L0)
@@ -271,6 +407,50 @@ class Area:
 
         return (self.course, self.L0, self.L1, self.L2)
 
+    def AddToLayer(self, obj):
+        """
+        Adds an object to the end of its layer
+        """
+        self.layers[obj.layer].append(obj)
+        self.object_grids[obj.layer].add(obj)
+
+    def GetItemById(self, item_id):
+        """
+        Returns the object, sprite, entrance, location, path node or comment
+        in this area with the specified item id, or None if there is none. The
+        index is rebuilt when the item is missing from it. Items are removed
+        from the index with ForgetItem when they are deleted.
+        """
+        item = self.item_index.get(item_id)
+        if item is not None:
+            return item
+
+        self.RebuildItemIndex()
+        return self.item_index.get(item_id)
+
+    def RebuildItemIndex(self):
+        """
+        Rebuilds the index used by GetItemById
+        """
+        index = {}
+
+        for items in (*self.layers, self.sprites, self.entrances, self.locations, self.comments):
+            for item in items:
+                index[item.itemId] = item
+
+        for path in self.paths:
+            for node in path._nodes:
+                index[node.itemId] = node
+
+        self.item_index = index
+
+    def ForgetItem(self, item):
+        """
+        Removes an item that is being deleted from the index used by
+        GetItemById
+        """
+        self.item_index.pop(item.itemId, None)
+
     def RemoveFromLayer(self, obj):
         """
         Removes a specific object from the level and updates Z-indices accordingly
@@ -278,6 +458,8 @@ class Area:
         layer = self.layers[obj.layer]
         idx = layer.index(obj)
         del layer[idx]
+        self.object_grids[obj.layer].remove(obj)
+        self.ForgetItem(obj)
 
         for upd in layer[idx:]:
             upd.setZValue(upd.zValue() - 1)
@@ -311,7 +493,7 @@ class Area:
         getblock = struct.Struct('>II')
         for i in range(14):
             start, length = getblock.unpack_from(course, i * 8)
-            self.blocks[i] = course[start:start + length]
+            self.blocks[i] = bytes(course[start:start + length])
 
         self.block1pos = getblock.unpack_from(course, 0)
 
@@ -481,13 +663,16 @@ class Area:
         z = (2 - idx) * 8192
 
         append = self.layers[idx].append
+        add = self.object_grids[idx].add
         obj = ObjectItem
         unpack = objstruct.unpack_from
 
         # Ignore the last 2 bytes, because they are always 0xFFFF.
         for offset in range(0, len(layerdata) - 2, 10):
             data = unpack(layerdata, offset)
-            append(obj(data[0] >> 12, data[0] & 4095, idx, *data[1:], z))
+            item = obj(data[0] >> 12, data[0] & 4095, idx, *data[1:], z)
+            append(item)
+            add(item)
             z += 1
 
     def LoadCamProfiles(self):
@@ -518,14 +703,16 @@ class Area:
 
         from levelitems import Path
 
+        scene = globals_.mainWindow.scene if globals_.mainWindow is not None else None
+
         for offset in range(0, len(pathdata), 8):
             data = unpack(pathdata, offset)
             nodes = self.LoadPathNodes(data[1], data[2])
 
-            path = Path(int(data[0]), globals_.mainWindow.scene, data[3] == 2)
+            path = Path(int(data[0]), scene, data[3] == 2)
 
             for node in nodes:
-                path.add_node(node['x'], node['y'], node['speed'], node['accel'], node['delay'], add_to_scene=False)
+                path.add_node(node['x'], node['y'], node['speed'], node['accel'], node['delay'], add_to_list=False, add_to_scene=False)
 
             paths.append(path)
 
@@ -917,6 +1104,7 @@ class Area:
         """
         # Remove the sprite from the sprites list
         self.sprites.remove(sprite)
+        self.ForgetItem(sprite)
 
         # Skip unknown sprites
         if sprite.sprite_num >= globals_.NumSprites or globals_.Sprites[sprite.sprite_num] is None:
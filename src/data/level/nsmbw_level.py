@@ -1,9 +1,18 @@
 import globals_
 import spritelib as SLib
 from src.data.common import archive
+from src.data.common.loaders import RestoreTilesetState, SaveTilesetState
 from src.data.level.abstract_level import AbstractLevel
 from src.data.level.area import Area
 
+# Areas that were switched away from stay loaded until their estimated memory
+# use exceeds this many bytes, so switching back to them is fast
+WarmAreaBudget = 256 * 1024 * 1024
+
+# Rough memory estimates used for the budget
+WarmItemCost = 4 * 1024          # per level item, including its cached images
+WarmTilesetCost = 2 * 1024 * 1024  # per loaded tileset slot
+
 
 class NSMBWLevel(AbstractLevel):
     """
@@ -15,6 +24,11 @@ class NSMBWLevel(AbstractLevel):
         Initializes the level with default settings
         """
         super().__init__()
+
+        # (area, tileset state, estimated size) of the areas that stay loaded
+        # while another area is shown, least recently used first
+        self.warm_areas = []
+
         self.new(False)
 
     def new(self, load=True):
@@ -40,7 +54,8 @@ class NSMBWLevel(AbstractLevel):
         """
         super().load(data, areaToLoad)
 
-        arc = archive.U8.load(data)
+        # The area files are only read, so they don't need to be copied
+        arc = archive.U8.load(data, zerocopy=True)
 
         if "course" not in arc:
             return False
@@ -133,21 +148,68 @@ class NSMBWLevel(AbstractLevel):
         new_area.set_data(course_new, L0_new, L1_new, L2_new)
         self.areas.append(new_area)
 
-    def changeArea(self, number):
+    def deleteArea(self, number):
+        """
+        Removes the area specified. Number is a 1-based value, not 0-based.
+        """
+        self.warm_areas = [entry for entry in self.warm_areas if entry[0] is not self.areas[number - 1]]
+
+        return super().deleteArea(number)
+
+    def changeArea(self, number, keep_current=False):
         """
         Changes the current area to the specified area in the loaded level
-        archive. Note that number is 1-based, not 0-based.
+        archive. Note that number is 1-based, not 0-based. If keep_current is
+        True, the current area stays loaded (within WarmAreaBudget), so
+        changing back to it doesn't have to load it again. The caller must
+        make sure its items still exist in that case.
         """
-        current_num = globals_.Area.areanum
+        current = globals_.Area
+        target = self.areas[number - 1]
 
-        # self.areas[current_num - 1] should be unloaded.
-        self.areas[current_num - 1].unload()
+        if keep_current:
+            self.warm_areas.append((current, SaveTilesetState(), self.estimateAreaSize(current)))
+            self.trimWarmAreas()
+        else:
+            current.unload()
 
         # Set the globals properly
-        globals_.Area = self.areas[number - 1]
-        SLib.Area = self.areas[number - 1]
+        globals_.Area = target
+        SLib.Area = target
+
+        for i, (area, tilesets, _) in enumerate(self.warm_areas):
+            if area is target:
+                # The area is still loaded, so only its tilesets are needed
+                del self.warm_areas[i]
+                RestoreTilesetState(tilesets)
+                return True
 
-        # self.areas[number - 1] should be loaded.
-        self.areas[number - 1].load()
+        target.load()
 
         return True
+
+    def trimWarmAreas(self, budget=WarmAreaBudget):
+        """
+        Unloads the least recently used areas that stayed loaded until their
+        estimated size fits in the budget
+        """
+        total = sum(size for _, _, size in self.warm_areas)
+
+        while self.warm_areas and total > budget:
+            area, _, size = self.warm_areas.pop(0)
+            area.unload()
+            total -= size
+
+    @staticmethod
+    def estimateAreaSize(area):
+        """
+        Returns a rough estimate of the memory used by a loaded area and its
+        tilesets, in bytes
+        """
+        items = sum(map(len, area.layers))
+        items += len(area.sprites) + len(area.entrances) + len(area.zones)
+        items += len(area.locations) + len(area.comments) + len(area.paths)
+
+        tilesets = sum(arcname is not None for arcname in globals_.TilesetFilesLoaded)
+
+        return items * WarmItemCost + tilesets * WarmTilesetCost
@@ -9,6 +9,20 @@ from src.data.sprite.spritefield.sprite_field import SpriteField
 from src.data.sprite.spritefield.sprite_tex import SpriteTexSpriteField
 from src.data.sprite.spritefield.value import ValueSpriteField
 
+# Field classes by XML tag. The compiled form of a field is (tag, args), where
+# args are the arguments for the field class. For lists and sprite textures,
+# the model argument holds the list entries instead.
+FieldClasses = {
+    'checkbox': CheckBoxSpriteField,
+    'list': ListSpriteField,
+    'value': ValueSpriteField,
+    'dualbox': DualBoxSpriteField,
+    'external': ExternalSpriteField,
+    'multidualbox': MultiDualBoxSpriteField,
+    'spritetex': SpriteTexSpriteField,
+}
+ModelArgIndex = 6
+
 
 class SpriteDefinition:
     """
@@ -31,11 +45,17 @@ class SpriteDefinition:
         self.fields: list[SpriteField] = []
 
 
-    def loadFrom(self, elem):
+    def loadFrom(self, elem, compiled=None):
         """
-        Loads in all the field data from an XML node
+        Loads in all the field data from an XML node. If 'compiled' is a list,
+        the compiled form of every field is appended to it.
         """
-        fields = self.fields
+        if compiled is None:
+            compiled = []
+
+        def addField(tag, *args):
+            self.addCompiledField(tag, args, compiled)
+
         allowed = ['checkbox', 'list', 'value', 'dualbox', 'dependency', 'external', 'multidualbox', 'spritetex']
 
         for field in elem:
@@ -117,7 +137,7 @@ class SpriteDefinition:
                 mask = int(attribs.get('mask', 1))
                 fullNybble = attribs.get('fullnybble', 'False') == "True"
 
-                fields.append(CheckBoxSpriteField(attribs['title'], comment, comment2, advancedcomment, required, bit, mask, fullNybble))
+                addField('checkbox', attribs['title'], comment, comment2, advancedcomment, required, bit, mask, fullNybble)
 
             elif field.tag == 'list':
                 bit, _ = self.parseBits(attribs.get("nybble"))
@@ -128,8 +148,7 @@ class SpriteDefinition:
 
                     entries.append((int(e.attrib['value']), e.text))
 
-                model = ListPropertyModel(entries)
-                fields.append(ListSpriteField(title, comment, comment2, advancedcomment, required, bit, model, idtype))
+                addField('list', title, comment, comment2, advancedcomment, required, bit, entries, idtype)
 
             elif field.tag == 'value':
                 bit, max_ = self.parseBits(attribs.get("nybble"))
@@ -140,24 +159,25 @@ class SpriteDefinition:
 
                     overrides.append((int(o.attrib['index']), int(o.attrib['value'])))
 
-                fields.append(ValueSpriteField(attribs['title'], comment, comment2, advancedcomment, required, bit, max_, start, increment, overrides, idtype))
+                addField('value', attribs['title'], comment, comment2, advancedcomment, required, bit, max_, start, increment, overrides, idtype)
 
             elif field.tag == 'dualbox':
                 bit, _ = self.parseBits(attribs.get("nybble"))
                 fullNybble = attribs.get('fullnybble', 'False') == "True"
 
-                fields.append(DualBoxSpriteField(attribs['title1'], comment, comment2, advancedcomment, required, bit, attribs['title2'], fullNybble))
+                addField('dualbox', attribs['title1'], comment, comment2, advancedcomment, required, bit, attribs['title2'], fullNybble)
 
             elif field.tag == 'dependency':
                 type_dict = {'required': 0, 'suggested': 1, 'resource': 2, 'suggestedresource': 3}
+                dependencies = []
 
                 for entry in field:
                     if entry.attrib['sprite'] == "":
                         continue
 
-                    self.dependencies.append((int(entry.attrib['sprite']), type_dict[entry.tag]))
+                    dependencies.append((int(entry.attrib['sprite']), type_dict[entry.tag]))
 
-                self.dependencynotes = attribs.get('notes')
+                addField('dependency', dependencies, attribs.get('notes'))
 
             elif field.tag == 'external':
                 # Uses a list from an external resource. This is used for big
@@ -165,13 +185,13 @@ class SpriteDefinition:
                 bit, _ = self.parseBits(attribs.get("nybble"))
                 type_ = attribs['type']
 
-                fields.append(ExternalSpriteField(title, comment, comment2, advancedcomment, required, bit, type_))
+                addField('external', title, comment, comment2, advancedcomment, required, bit, type_)
 
             elif field.tag == 'multidualbox':
                 # multibox but with dualboxes instead of checkboxes
                 bit, _ = self.parseBits(attribs.get("nybble"))
 
-                fields.append(MultiDualBoxSpriteField(attribs['title1'], comment, comment2, advancedcomment, required, bit, attribs['title2']))
+                addField('multidualbox', attribs['title1'], comment, comment2, advancedcomment, required, bit, attribs['title2'])
 
             elif field.tag == 'spritetex':
                 bit, max_ = self.parseBits(attribs.get("nybble"))
@@ -182,8 +202,26 @@ class SpriteDefinition:
 
                     entries.append((int(e.attrib['value']), e.text))
 
-                model = ListPropertyModel(entries)
-                fields.append(SpriteTexSpriteField(title, comment, comment2, advancedcomment, required, bit, model, max_))
+                addField('spritetex', title, comment, comment2, advancedcomment, required, bit, entries, max_)
+
+    def addCompiledField(self, tag, args, compiled=None):
+        """
+        Adds a field from its compiled form. If 'compiled' is a list, the
+        compiled form is appended to it.
+        """
+        if compiled is not None:
+            compiled.append((tag, args))
+
+        if tag == 'dependency':
+            dependencies, self.dependencynotes = args
+            self.dependencies.extend(dependencies)
+            return
+
+        if tag in ('list', 'spritetex'):
+            args = list(args)
+            args[ModelArgIndex] = ListPropertyModel(args[ModelArgIndex])
+
+        self.fields.append(FieldClasses[tag](*args))
 
     def parseBits(self, nybble_val) -> tuple[list[tuple[int, int]], int]:
         """
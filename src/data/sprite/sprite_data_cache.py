@@ -0,0 +1,60 @@
+import marshal
+import os
+
+from src.data.common.disk_cache import DiskCache
+
+
+class CompiledSpriteData:
+    """
+    The resolved contents of all spritedata.xml layers of a game definition,
+    in a form that can be stored without any Qt objects
+    """
+
+    def __init__(self):
+        """
+        Initializes the CompiledSpriteData
+        """
+        self.numSprites = 0
+        self.sprites = []  # (attributes, compiled fields, error) in load order
+
+
+class SpriteDataCache(DiskCache):
+    """
+    Caches the CompiledSpriteData of a set of spritedata.xml files
+    """
+    Magic = b'RSDC'
+    Version = 1
+    Directory = os.path.join('cache', 'spritedata')
+    MaxEntries = 8
+
+    def key(self, paths, translation):
+        """
+        The entry changes whenever any of the files or the translation strings
+        used in the compiled data change
+        """
+        key = [str(marshal.version)]
+
+        for path in paths:
+            key += self.fileKey(path)
+
+        key += map(str, translation)
+        return key
+
+    def pack(self, data):
+        """
+        Serializes a CompiledSpriteData
+        """
+        return marshal.dumps((data.numSprites, data.sprites))
+
+    def unpack(self, raw):
+        """
+        Deserializes a CompiledSpriteData
+        """
+        data = CompiledSpriteData()
+        data.numSprites, data.sprites = marshal.loads(raw)
+        return data
+
+
+Cache = SpriteDataCache()
+load = Cache.load
+save = Cache.save
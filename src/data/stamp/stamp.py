@@ -8,12 +8,12 @@ class Stamp:
     Class that represents a stamp in the list
     """
 
-    def __init__(self, ReggieClip=None, Name=''):
+    def __init__(self, clip=None, Name=''):
         """
-        Initializes the stamp
+        Initializes the stamp from a ClipData
         """
 
-        self.ReggieClip = ReggieClip
+        self.clip = clip
         self.Name = Name
         self.Icon = self.render()
 
@@ -24,7 +24,7 @@ class Stamp:
 
         minX, minY, maxX, maxY = 24576, 12288, 0, 0
 
-        layers, sprites, _, _, _, _ = globals_.mainWindow.getEncodedObjects(self.ReggieClip, False)
+        layers, sprites, _, _, _, _ = globals_.mainWindow.getEncodedObjects(self.clip, False)
 
         # Go through the sprites and find the maxs and mins
         for spr in sprites:
@@ -1,10 +1,51 @@
+import collections
+
 import globals_
 
+# Many objects share the same definition and size, so rendered objects are
+# cached. The cached arrays are tuples, so they can't be changed by accident.
+RenderCache = collections.OrderedDict()
+RenderCacheSize = 1024
+
 
 def RenderObject(tileset, objnum, width, height, fullslope=False):
     """
     Render a tileset object into an array
     """
+    key = (tileset, objnum, width, height, fullslope)
+
+    try:
+        rendered = RenderCache[key]
+    except KeyError:
+        rendered = tuple(map(tuple, RenderObjectUncached(tileset, objnum, width, height, fullslope)))
+        RenderCache[key] = rendered
+
+        if len(RenderCache) > RenderCacheSize:
+            RenderCache.popitem(last=False)
+    else:
+        RenderCache.move_to_end(key)
+
+    # The caller may change the array, e.g. to randomise it
+    return [list(row) for row in rendered]
+
+
+def ClearRenderCache(tileset=None):
+    """
+    Forget the rendered objects of a tileset slot, or of all slots if tileset
+    is None. This must be called whenever object definitions change.
+    """
+    if tileset is None:
+        RenderCache.clear()
+        return
+
+    for key in [key for key in RenderCache if key[0] == tileset]:
+        del RenderCache[key]
+
+
+def RenderObjectUncached(tileset, objnum, width, height, fullslope=False):
+    """
+    Render a tileset object into an array, without using the cache
+    """
     # allocate an array
     dest = [[0] * width for _ in range(height)]
 
@@ -249,19 +290,14 @@ def CountTiles(row):
 
 def IncrementTilesetFrame():
     """
-    Moves each tileset to the next frame
+    Moves each animated tile to the next frame
     """
     if not globals_.TilesetsAnimating: return
-    for tile in globals_.Tiles:
-        if tile is not None: tile.nextFrame()
 
-    # TODO: Test if this is more efficient over updating the entire scene
-    # (seems obvious on paper, but tests are wildly inconsistent and give no answer)
-    # for layer in globals_.Area.layers:
-    #     for obj in layer:
-    #         obj.update()
+    tiles = globals_.Tiles
+    for idx in globals_.TilesAnimated:
+        tiles[idx].nextFrame()
 
     main_window = globals_.mainWindow
     if main_window is not None:
-        main_window.scene.update()
-        main_window.objPicker.update()
+        main_window.scene.advanceTileAnimations()
@@ -13,24 +13,52 @@ class TilesetTile:
         """
         Initializes the TilesetTile
         """
-        self.main = main
+        self._main = main
         self.isAnimated = False
         self.animFrame = 0
         self.animTiles = []
         self.collData = (0, 0, 0, 0, 0, 0, 0, 0)
         self.collOverlay = None
 
+        # Frames with the collision overlay painted on, keyed by animation
+        # frame (None for the main tile). They are created when first needed.
+        self.collFrames = {}
+
+    @property
+    def main(self) -> QtGui.QPixmap:
+        """
+        The image of this tile when it is not animating
+        """
+        return self._main
+
+    @main.setter
+    def main(self, main: QtGui.QPixmap):
+        self._main = main
+        self.collFrames = {}
+
     def addAnimationData(self, data, reverse=False):
         """
         Applies Newer-style animation data to the tile
         """
-        animTiles = []
+        self.setAnimationFrames(TilesetTile.decodeAnimationData(data), reverse)
+
+    @staticmethod
+    def decodeAnimationData(data):
+        """
+        Decodes Newer-style animation data into 32x32 ARGB32 frames
+        """
         numberOfFrames = len(data) // 2048
+        return [tpl.decodeRGB4A3(data[frame * 2048: (frame * 2048) + 2048], 32, 32, False)
+                for frame in range(numberOfFrames)]
 
-        for frame in range(numberOfFrames):
-            framedata = data[frame * 2048: (frame * 2048) + 2048]
-            newdata = tpl.decodeRGB4A3(framedata, 32, 32, False)
-            img = QtGui.QImage(newdata, 32, 32, 128, QtGui.QImage.Format.Format_ARGB32)
+    def setAnimationFrames(self, frames, reverse=False):
+        """
+        Applies decoded animation frames to the tile
+        """
+        animTiles = []
+
+        for framedata in frames:
+            img = QtGui.QImage(framedata, 32, 32, 128, QtGui.QImage.Format.Format_ARGB32)
             pix = QtGui.QPixmap.fromImage(img.copy(4, 4, 24, 24))
             animTiles.append(pix)
 
@@ -39,6 +67,7 @@ class TilesetTile:
 
         self.animTiles = animTiles
         self.isAnimated = True
+        self.collFrames = {}
 
     def nextFrame(self):
         """
@@ -60,21 +89,29 @@ class TilesetTile:
 
     def getCurrentTile(self, showCollision = False):
         """
-        Returns the current tile based on the current animation frame
+        Returns the current tile based on the current animation frame. The
+        returned pixmap is shared, so it should not be painted on.
         """
-        result = None
         if (not globals_.TilesetsAnimating) or (not self.isAnimated):
+            frame = None
             result = self.main
         else:
-            result = self.animTiles[self.animFrame]
-        result = QtGui.QPixmap(result)
+            frame = self.animFrame
+            result = self.animTiles[frame]
+
+        if not (globals_.CollisionsShown and showCollision and (self.collOverlay is not None)):
+            return result
 
-        if globals_.CollisionsShown and showCollision and (self.collOverlay is not None):
-            p = QtGui.QPainter(result)
+        composed = self.collFrames.get(frame)
+        if composed is None:
+            composed = QtGui.QPixmap(result)
+            p = QtGui.QPainter(composed)
             p.drawPixmap(0, 0, self.collOverlay)
             del p
 
-        return result
+            self.collFrames[frame] = composed
+
+        return composed
 
     def setCollisions(self, colldata: tuple[int, int, int, int, int, int, int, int]):
         """
@@ -365,3 +402,4 @@ class TilesetTile:
             painter.drawRect(0, 0, 24, 24)
 
         self.collOverlay = collPix
+        self.collFrames = {}
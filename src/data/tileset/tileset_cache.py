@@ -0,0 +1,167 @@
+import os
+import struct
+
+from libs import lib_versions
+from src.data.common.disk_cache import DiskCache
+from src.data.tileset.object.object_def import ObjectDef
+
+
+class TilesetData:
+    """
+    The decoded contents of a tileset archive, without any Qt objects
+    """
+
+    def __init__(self):
+        """
+        Initializes the TilesetData
+        """
+        self.atlas = b''              # 1024x256 ARGB32 texture
+        self.premultiplied = False    # whether the atlas has premultiplied alpha
+        self.colldata = b''           # 8 collision bytes per tile
+        self.anims = {}               # animation file name -> 32x32 ARGB32 frames
+        self.tileAnims = []           # (tile number, animation file name, reverse)
+        self.objects = [None] * 256   # ObjectDefs, with the slot's tile offset applied
+
+
+class TilesetCache(DiskCache):
+    """
+    Caches the TilesetData of tileset archives loaded into a slot
+    """
+    Magic = b'RTSC'
+    Version = 1
+    Directory = os.path.join('cache', 'tilesets')
+    MaxEntries = 32
+
+    def key(self, arcname, idx, name):
+        """
+        The entry changes whenever the archive or the decoder changes
+        """
+        return self.fileKey(arcname) + [str(idx), name, str(lib_versions['nsmblib'])]
+
+    def pack(self, data):
+        """
+        Serializes a TilesetData
+        """
+        return pack(data)
+
+    def unpack(self, raw):
+        """
+        Deserializes a TilesetData
+        """
+        return unpack(raw)
+
+
+Cache = TilesetCache()
+load = Cache.load
+save = Cache.save
+
+
+def pack(data):
+    """
+    Serializes a TilesetData
+    """
+    out = bytearray()
+    out += struct.pack('>?I', data.premultiplied, len(data.atlas))
+    out += data.atlas
+    out += struct.pack('>H', len(data.colldata))
+    out += data.colldata
+
+    anim_names = list(data.anims)
+    out += struct.pack('>H', len(anim_names))
+    for fn in anim_names:
+        encoded = fn.encode('utf-8')
+        frames = data.anims[fn]
+        out += struct.pack('>BH', len(encoded), len(frames))
+        out += encoded
+        for frame in frames:
+            out += frame
+
+    anim_ids = {fn: i for i, fn in enumerate(anim_names)}
+    out += struct.pack('>H', len(data.tileAnims))
+    for tile, fn, reverse in data.tileAnims:
+        out += struct.pack('>HH?', tile, anim_ids[fn], reverse)
+
+    out += struct.pack('>H', len(data.objects))
+    for obj in data.objects:
+        if obj is None:
+            out += b'\0'
+            continue
+
+        out += struct.pack('>BBBH', 1, obj.width, obj.height, len(obj.rows))
+        for row in obj.rows:
+            out += struct.pack('>H', len(row))
+            for tile in row:
+                out += struct.pack(f'>B{len(tile)}H', len(tile), *tile)
+
+    return bytes(out)
+
+
+def unpack(raw):
+    """
+    Deserializes a TilesetData
+    """
+    data = TilesetData()
+    view = memoryview(raw)
+
+    data.premultiplied, size = struct.unpack_from('>?I', raw, 0)
+    pos = 5
+    data.atlas = bytes(view[pos:pos + size])
+    pos += size
+
+    size, = struct.unpack_from('>H', raw, pos)
+    pos += 2
+    data.colldata = bytes(view[pos:pos + size])
+    pos += size
+
+    anim_count, = struct.unpack_from('>H', raw, pos)
+    pos += 2
+    anim_names = []
+    for _ in range(anim_count):
+        name_len, frame_count = struct.unpack_from('>BH', raw, pos)
+        pos += 3
+        fn = bytes(view[pos:pos + name_len]).decode('utf-8')
+        pos += name_len
+
+        frames = []
+        for _ in range(frame_count):
+            frames.append(bytes(view[pos:pos + 4096]))
+            pos += 4096
+
+        data.anims[fn] = frames
+        anim_names.append(fn)
+
+    count, = struct.unpack_from('>H', raw, pos)
+    pos += 2
+    for _ in range(count):
+        tile, anim_id, reverse = struct.unpack_from('>HH?', raw, pos)
+        pos += 5
+        data.tileAnims.append((tile, anim_names[anim_id], reverse))
+
+    count, = struct.unpack_from('>H', raw, pos)
+    pos += 2
+    data.objects = [None] * count
+    for i in range(count):
+        if not raw[pos]:
+            pos += 1
+            continue
+
+        obj = ObjectDef()
+        obj.width, obj.height, row_count = struct.unpack_from('>BBH', raw, pos + 1)
+        pos += 5
+
+        for _ in range(row_count):
+            tile_count, = struct.unpack_from('>H', raw, pos)
+            pos += 2
+            row = []
+            for _ in range(tile_count):
+                tile_len = raw[pos]
+                row.append(list(struct.unpack_from(f'>{tile_len}H', raw, pos + 1)))
+                pos += 1 + tile_len * 2
+            obj.rows.append(row)
+
+        data.objects[i] = obj
+
+    if pos != len(raw):
+        raise struct.error('trailing data in tileset cache entry')
+
+    return data
@@ -11,33 +11,31 @@ class MoveItemUndoAction(UndoAction):
         """
         Initializes the undo action
         """
-        defType = target.instanceDef
-        self.origDef = defType(target)
-        self.finalDef = defType(target)
-        self.origDef.objx = origX
-        self.origDef.objy = origY
-        self.finalDef.objx = finalX
-        self.finalDef.objy = finalY
+        self.itemId = target.itemId
+        self.origX = origX
+        self.origY = origY
+        self.finalX = finalX
+        self.finalY = finalY
 
     def undo(self):
         """
         Sets the target object's position to the original position
         """
-        instance = self.finalDef.findInstance()
+        instance = globals_.Area.GetItemById(self.itemId)
         if instance:
-            self.changeObjectPos(instance, self.origDef.objx, self.origDef.objy)
+            self.changeObjectPos(instance, self.origX, self.origY)
         else:
-            print('Undo Move Item: Cannot find item instance! ' + str(self.finalDef))
+            print('Undo Move Item: Cannot find item instance! ' + str(self.itemId))
 
     def redo(self):
         """
         Sets the target object's position to the final position
         """
-        instance = self.origDef.findInstance()
+        instance = globals_.Area.GetItemById(self.itemId)
         if instance:
-            self.changeObjectPos(instance, self.finalDef.objx, self.finalDef.objy)
+            self.changeObjectPos(instance, self.finalX, self.finalY)
         else:
-            print('Redo Move Item: Cannot find item instance! ' + str(self.origDef))
+            print('Redo Move Item: Cannot find item instance! ' + str(self.itemId))
 
     @staticmethod
     def changeObjectPos(obj, newX, newY):
@@ -81,22 +79,28 @@ class MoveItemUndoAction(UndoAction):
         if main_window is not None:
             main_window.level_overview.update()
 
+    def targetKey(self):
+        """
+        Returns the id of the moved item
+        """
+        return self.itemId
+
     def isExtentionOf(self, other):
         """
         Returns True if this MoveItemUndoAction extends another
         """
-        return hasattr(other, 'origDef') and self.origDef.defMatchesData(other.origDef)
+        return isinstance(other, MoveItemUndoAction) and self.itemId == other.itemId
 
     def extend(self, other):
         """
         Extends this MoveItemUndoAction with the data from an extention of it.
         isExtentionOf must have returned True first!
         """
-        self.finalDef.objx = other.finalDef.objx
-        self.finalDef.objy = other.finalDef.objy
+        self.finalX = other.finalX
+        self.finalY = other.finalY
 
     def isNull(self):
         """
         Returns True if this action is effectively a no-op
         """
-        return self.origDef.objx == self.finalDef.objx and self.origDef.objy == self.finalDef.objy
+        return self.origX == self.finalX and self.origY == self.finalY
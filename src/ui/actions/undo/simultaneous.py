@@ -26,37 +26,52 @@ class SimultaneousUndoAction(UndoAction):
         for c in self.children:
             c.redo()
 
+    def matchChildren(self, other):
+        """
+        Pairs every child of this action with a distinct child of another
+        SimultaneousUndoAction that extends it. Returns a list of
+        (child, other child) tuples, or None if not every child has a match.
+        Children with a target key are looked up by that key, so this takes
+        linear time for moves of many items.
+        """
+        keyed = {}
+        unkeyed = []
+        for searchAgainstObj in other.children:
+            key = searchAgainstObj.targetKey()
+            if key is None:
+                unkeyed.append(searchAgainstObj)
+            else:
+                keyed.setdefault(key, []).append(searchAgainstObj)
+
+        pairs = []
+        for searchInObj in self.children:
+            key = searchInObj.targetKey()
+            candidates = unkeyed if key is None else keyed.get(key, [])
+
+            for searchAgainstObj in candidates:
+                if searchAgainstObj.isExtentionOf(searchInObj):
+                    candidates.remove(searchAgainstObj)
+                    pairs.append((searchInObj, searchAgainstObj))
+                    break  # only breaks out of inner loop
+            else:
+                return None
+
+        return pairs
+
     def isExtentionOf(self, other):
         """
         Returns True if this SinultaneousUndoAction and another one have equivalent children
         """
         if not hasattr(other, 'children'): return False
-        searchIn = set(self.children)
-        searchAgainst = set(other.children)
-        for searchInObj in searchIn:
-            found = False
-            for searchAgainstObj in searchAgainst:
-                if searchAgainstObj.isExtentionOf(searchInObj):
-                    found = True
-                    searchAgainst.remove(searchAgainstObj)
-                    break  # only breaks out of inner loop
-            if not found:
-                return False
-        return True
+        return self.matchChildren(other) is not None
 
     def extend(self, other):
         """
         Extend this SimultaneousUndoAction with the data from an extention of it.
         isExtentionOf must have returned True first!
         """
-        searchMine = set(self.children)
-        searchOther = set(other.children)
-        for searchMineObj in searchMine:
-            for searchOtherObj in searchOther:
-                if searchOtherObj.isExtentionOf(searchMineObj):
-                    searchMineObj.extend(searchOtherObj)
-                    searchOther.remove(searchOtherObj)
-                    break  # only breaks out of inner loop
+        for searchMineObj, searchOtherObj in self.matchChildren(other) or ():
+            searchMineObj.extend(searchOtherObj)
 
     def isNull(self):
         """
@@ -13,6 +13,13 @@ class UndoAction:
         Sets the target to its final state
         """
 
+    def targetKey(self):
+        """
+        Returns a hashable key for the thing this action changes, or None.
+        Actions with the same key can extend each other.
+        """
+        return None
+
     def isExtentionOf(self, other):
         """
         Returns True if this action extends another, else False
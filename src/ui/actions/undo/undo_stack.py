@@ -1,4 +1,5 @@
 import globals_
+from dirty import SetDirty
 
 
 class UndoStack:
@@ -45,6 +46,10 @@ class UndoStack:
         act.undo()
         self.futureActions.append(act)
 
+        # Not every action goes through SetDirty by itself (e.g. moving an
+        # item back), but the level has changed either way
+        SetDirty()
+
         self.enableOrDisableMenuItems()
 
     def redo(self):
@@ -60,6 +65,7 @@ class UndoStack:
 
         act.redo()
         self.pastActions.append(act)
+        SetDirty()
 
         self.enableOrDisableMenuItems()
 
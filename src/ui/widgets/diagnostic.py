@@ -6,6 +6,108 @@ from ui import GetIcon
 
 from src.ui.dialogs.diagnostic_tool import DiagnosticToolDialog
 
+class DiagnosticEngine:
+    """
+    Runs the checks of the diagnostic tool and caches their results. A check
+    only runs again when the items it looks at have changed.
+    """
+    # The kinds of items each check looks at. Checks that are not listed here
+    # only look at the kind of item that matches their icon.
+    Dependencies = {
+        'check_entrance_near_edge': ('entrances', 'zones'),
+        'check_entrance_out_zone': ('entrances', 'zones'),
+    }
+
+    def __init__(self, diag_tool: DiagnosticToolDialog):
+        """
+        Creates the engine for the checks of a diagnostic tool
+        """
+        self.checks = []
+        for icon, _, func, critical in diag_tool.check_functions:
+            self.checks.append((func, critical, self.Dependencies.get(func.__name__, (icon,))))
+
+        self.reset()
+
+    def reset(self):
+        """
+        Forgets all cached results, so every check runs again
+        """
+        self.change_count = None
+        self.area = None
+        self.signatures = {}
+        self.results = {}
+
+    @staticmethod
+    def signature(kind: str):
+        """
+        Returns a value that changes whenever something the checks look at
+        changes for a kind of item
+        """
+        area = globals_.Area
+
+        if kind == 'objects':
+            return (
+                tuple(globals_.TilesetFilesLoaded),
+                tuple(map(id, globals_.ObjectDefinitions)),
+                tuple((obj.tileset, obj.object_num) for layer in area.layers for obj in layer),
+            )
+
+        if kind == 'sprites':
+            return tuple((spr.sprite_num, spr.objx, spr.objy, bytes(spr.spritedata)) for spr in area.sprites)
+
+        if kind == 'entrances':
+            return (
+                area.areanum,
+                area.startEntrance,
+                tuple((ent.entid, ent.objx, ent.objy) for ent in area.entrances),
+            )
+
+        # Zones
+        return tuple(
+            (zone.objx, zone.objy, zone.width, zone.height, zone.cammode, zone.camzoom) for zone in area.zones
+        )
+
+    def evaluate(self) -> tuple[DiagnosticToolDialog.Result, int]:
+        """
+        Runs the checks whose items have changed since the last evaluation, and
+        returns the overall result and the number of problems
+        """
+        # Every change to the level goes through SetDirty, so if it wasn't
+        # called, the cached results are still valid.
+        if self.change_count != globals_.ChangeCount or self.area is not globals_.Area:
+            if self.area is not globals_.Area:
+                self.signatures = {}
+                self.results = {}
+
+            self.change_count = globals_.ChangeCount
+            self.area = globals_.Area
+
+            changed = set()
+            for kind in ('objects', 'sprites', 'entrances', 'zones'):
+                sig = self.signature(kind)
+                if self.signatures.get(kind) != sig:
+                    self.signatures[kind] = sig
+                    changed.add(kind)
+
+            for func, _, kinds in self.checks:
+                if func not in self.results or changed.intersection(kinds):
+                    self.results[func] = bool(func('c'))
+
+        num_errors = 0
+        is_critical = False
+        for func, critical, _ in self.checks:
+            if self.results[func]:
+                num_errors += 1
+                is_critical = is_critical or critical
+
+        if is_critical:
+            return DiagnosticToolDialog.Result.CRITICAL, num_errors
+        elif num_errors:
+            return DiagnosticToolDialog.Result.WARNING, num_errors
+
+        return DiagnosticToolDialog.Result.NO_ERROR, 0
+
+
 # TODO:
 # Add some proper functionality for this
 # Make it check for issues every 5 (or 10?) seconds
@@ -21,6 +123,7 @@ class DiagnosticWidget(QtWidgets.QWidget):
         """
         super().__init__()
         self.diag_tool = DiagnosticToolDialog()
+        self.engine = DiagnosticEngine(self.diag_tool)
 
         # Button with icon and "X errors found" text
         self.status_button = QtWidgets.QToolButton()
@@ -68,7 +171,7 @@ class DiagnosticWidget(QtWidgets.QWidget):
         """
         Checks for errors and updates the widget accordingly
         """
-        result, error_num = self.diag_tool.populate_list()
+        result, error_num = self.engine.evaluate()
 
         icons = [
             'good', 'warning', 'bad'
@@ -93,7 +196,8 @@ class DiagnosticWidget(QtWidgets.QWidget):
         """
         Handles the manual update button being pressed
         """
-        result, error_num = self.diag_tool.populate_list()
+        self.engine.reset()
+        result, error_num = self.engine.evaluate()
 
         # Figure out which string to show
         if result != DiagnosticToolDialog.Result.NO_ERROR:
@@ -154,9 +154,15 @@ class LevelOverviewWidget(QtWidgets.QWidget):
         for zone in globals_.Area.zones:
             rect |= transform.mapRect(zone.sceneBoundingRect())
 
-        for layer in globals_.Area.layers:
-            for obj in layer:
-                rect |= obj.LevelRect
+        _, _, max_x, max_y = rect.getCoords()
+
+        # The object grids know the extent of each layer, so there is no need
+        # to look at every single object.
+        for grid in globals_.Area.object_grids:
+            extent = grid.extent()
+            if extent is not None:
+                max_x = max(max_x, extent[0])
+                max_y = max(max_y, extent[1])
 
         for sprite in globals_.Area.sprites:
             rect |= sprite.LevelRect
@@ -171,7 +177,9 @@ class LevelOverviewWidget(QtWidgets.QWidget):
             for node in path._nodes:
                 rect |= node.LevelRect
 
-        _, _, self.max_x, self.max_y = rect.getCoords()
+        _, _, x, y = rect.getCoords()
+        self.max_x = max(max_x, x)
+        self.max_y = max(max_y, y)
 
     def rescale(self):
         """
@@ -1,10 +1,38 @@
 import os
+import re
 from xml.etree import ElementTree
 
 import globals_
 from dirty import setting
 
 
+# Markup that is converted in every string, in this order
+Markup = (
+    ('[br]', '<br>'),
+    ('[b]', '<b>'),
+    ('[/b]', '</b>'),
+    ('[i]', '<i>'),
+    ('[/i]', '</i>'),
+    ('[a', '<a'),
+    ('"]', '">'),  # workaround
+    ('[/a]', '</a>'),
+    ('\\n', '\n'),
+    ('//n', '\n'),
+    ('[tm]', '™'),
+)
+MarkupRegex = re.compile('|'.join(re.escape(old) for old, _ in Markup))
+
+
+def ApplyMarkup(text):
+    """
+    Converts the markup in a string
+    """
+    for old, new in Markup:
+        text = text.replace(old, new)
+
+    return text
+
+
 def LoadTranslation():
     """
     Loads the translation
@@ -35,6 +63,8 @@ class ReggieTranslation:
         if not ok:
             self.InitAsEnglish()
 
+        self.CompileStrings()
+
     def InitAsEnglish(self):
         """
         Initializes the ReggieTranslation as the English translation
@@ -924,6 +954,7 @@ class ReggieTranslation:
                 31: '1 comment',
                 32: '[x] comments',
                 33: '- Comment under mouse: [xpos], [ypos]; "[text]"',
+                34: 'Loading tilesets... ([x]/[total])',
             },
             'Themes': {
                 0: 'Classic',
@@ -1269,50 +1300,88 @@ class ReggieTranslation:
 
             return text
 
-    def string_(self, *args) -> str | None:
+    def CompileStrings(self):
         """
-        Gets a string from the translation and returns it
+        Prepares the strings for string(). The markup of strings without
+        replacements is converted here. Strings with replacements are compiled
+        into templates when they are first used (see compileTemplate).
         """
+        self.compiled = {
+            section: {
+                numcode: ApplyMarkup(astring) if isinstance(astring, str) else astring
+                for numcode, astring in strings.items()
+            }
+            for section, strings in self.strings.items()
+        }
+        self.templates = {}
 
-        # Get the string
-        astring = self.strings[args[0]][args[1]]
+    def compileTemplate(self, section, numcode, dummies) -> str | None:
+        """
+        Compiles a string into a str.format() template, where the n-th
+        replacement dummy becomes {n}. The markup in the rest of the string is
+        converted.
+        """
+        astring = self.strings[section][numcode]
         if astring is None:
             return None
         if isinstance(astring, tuple):
-            raise TypeError(f"String {args[0]}/{args[1]} is a tuple: {astring}. Use stringList() instead")
+            raise TypeError(f"String {section}/{numcode} is a tuple: {astring}. Use stringList() instead")
 
-        # Perform any replacements
-        i = 2
-        while i < len(args):
-            # Get the old string
-            old = str(args[i])
+        # Split the string into literal text and replacement indices, in the
+        # same order as the replacements used to be done
+        pieces = [astring]
+        for index, dummy in enumerate(dummies):
+            split = []
+            for piece in pieces:
+                if isinstance(piece, int) or dummy not in piece:
+                    split.append(piece)
+                    continue
 
-            # Get the new string
-            new = str(args[i + 1])
+                for i, part in enumerate(piece.split(dummy)):
+                    if i:
+                        split.append(index)
+                    split.append(part)
 
-            # Replace
-            astring = astring.replace(old, new)
-            i += 2
+            pieces = split
 
-        # Do some automatic replacements
-        replace = {
-            '[br]': '<br>',
-            '[b]': '<b>',
-            '[/b]': '</b>',
-            '[i]': '<i>',
-            '[/i]': '</i>',
-            '[a': '<a',
-            '"]': '">',  # workaround
-            '[/a]': '</a>',
-            '\\n': '\n',
-            '//n': '\n',
-            '[tm]': '™',
-        }
-        for old in replace:
-            astring = astring.replace(old, replace[old])
+        template = []
+        for piece in pieces:
+            if isinstance(piece, int):
+                template.append('{%d}' % piece)
+            else:
+                template.append(ApplyMarkup(piece).replace('{', '{{').replace('}', '}}'))
+
+        return ''.join(template)
+
+    def string_(self, *args) -> str | None:
+        """
+        Gets a string from the translation and returns it
+        """
+        # Strings without replacements are ready to use
+        if len(args) == 2:
+            astring = self.compiled[args[0]][args[1]]
+            if isinstance(astring, tuple):
+                raise TypeError(f"String {args[0]}/{args[1]} is a tuple: {astring}. Use stringList() instead")
+
+            return astring
+
+        if len(args) % 2:
+            raise IndexError(f'No replacement given for {args[-1]!r}')
+
+        # Get the template
+        key = args[:2] + args[2::2]
+        template = self.templates.get(key)
+        if template is None:
+            template = self.templates[key] = self.compileTemplate(args[0], args[1], [str(dummy) for dummy in key[2:]])
+            if template is None:
+                return None
+
+        # Perform the replacements. Markup in them is converted as well.
+        values = [str(value) for value in args[3::2]]
+        if MarkupRegex.search(''.join(values)):
+            values = [ApplyMarkup(value) for value in values]
 
-        # Return it
-        return astring
+        return template.format(*values)
 
     def stringOneLine(self, *args) -> str | None:
         """